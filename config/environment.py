@@ -4,65 +4,147 @@ Environment configuration module for managing test environments and settings.
 
 import yaml
 import os
+import threading
 from pathlib import Path
+from types import MappingProxyType
+
+CONFIG_PATH = Path(__file__).parent / 'config.yaml'
+
+# Environment variables starting with this prefix override config.yaml; the rest of
+# the name is the key path joined by double underscores, and the value is parsed
+# as YAML, e.g. FRAMEWORK__BROWSER__PAGE_LOAD_TIMEOUT=90 or FRAMEWORK__BROWSER__HEADLESS=true.
+OVERRIDE_PREFIX = 'FRAMEWORK__'
+
+_config = None
+_config_lock = threading.Lock()
+
+
+def _freeze(value):
+    """Turns parsed YAML into read-only mappings and tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _apply_overrides(config, environ):
+    """Applies FRAMEWORK__* environment variables to the parsed (still mutable) config."""
+    for name, raw_value in environ.items():
+        if not name.startswith(OVERRIDE_PREFIX):
+            continue
+        path = [part for part in name[len(OVERRIDE_PREFIX):].split('__') if part]
+        if not path:
+            continue
+        section = config
+        for part in path[:-1]:
+            key = _match_key(section, part)
+            if not isinstance(section.get(key), dict):
+                section[key] = {}
+            section = section[key]
+        section[_match_key(section, path[-1])] = yaml.safe_load(raw_value)
+
+
+def _match_key(section, name):
+    """Finds the existing key matching an override path part case-insensitively."""
+    for key in section:
+        if str(key).lower() == name.lower():
+            return key
+    return name.lower()
+
+
+def _load_config():
+    """
+    Load configuration from YAML file and apply environment-variable overrides.
+
+    Returns:
+        dict: Configuration dictionary
+    """
+    try:
+        with open(CONFIG_PATH, 'r') as file:
+            config = yaml.safe_load(file)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Configuration file not found at {CONFIG_PATH}")
+    except yaml.YAMLError as e:
+        raise ValueError(f"Error parsing configuration file: {e}")
+    _apply_overrides(config, os.environ)
+    return config
+
+
+def get_config():
+    """
+    Returns the process-wide, read-only configuration snapshot.
+    config.yaml is parsed once per process; use `reload_config()` to pick up changes.
+
+    Returns:
+        Mapping: The frozen configuration.
+    """
+    global _config
+    if _config is None:
+        with _config_lock:
+            if _config is None:
+                _config = _freeze(_load_config())
+    return _config
+
+
+def reload_config():
+    """
+    Re-reads config.yaml and the FRAMEWORK__* overrides, for long-lived sessions.
+    Environment objects created before the reload keep the snapshot they were built with.
+
+    Returns:
+        Mapping: The new frozen configuration.
+    """
+    global _config
+    with _config_lock:
+        _config = _freeze(_load_config())
+    return _config
 
 
 class Environment:
     """
     Environment configuration class to manage different test environments.
+    Every instance shares one frozen configuration snapshot, so constructing one is cheap.
     """
-    
+
     def __init__(self, env_name=None):
         """
         Initialize environment configuration.
-        
+
         Args:
             env_name: Environment name (dev, staging, prod). If None, uses ENV environment variable or defaults to 'dev'
         """
         self.env_name = env_name or os.getenv('ENV', 'dev')
-        self.config = self._load_config()
+        self.config = get_config()
         self.current_env = self.config['environments'][self.env_name]
         self.current_browser = self.config['browser']['default']
-    
-    def _load_config(self):
+
+    def get_base_url(self):
         """
-        Load configuration from YAML file.
-        
-        Returns:
-            dict: Configuration dictionary
+        Get base URL for current environment.
+        <ENV_NAME>_BASE_URL (e.g. SUPERTAILS_BASE_URL) overrides config.yaml; the
+        record/replay network stand-in uses it to point tests at itself.
         """
-        config_path = Path(__file__).parent / 'config.yaml'
-        try:
-            with open(config_path, 'r') as file:
-                return yaml.safe_load(file)
-        except FileNotFoundError:
-            raise FileNotFoundError(f"Configuration file not found at {config_path}")
-        except yaml.YAMLError as e:
-            raise ValueError(f"Error parsing configuration file: {e}")
-    
-    def get_base_url(self):
-        """Get base URL for current environment."""
-        return self.current_env['base_url']
-    
+        return os.getenv(f"{self.env_name.upper()}_BASE_URL", self.current_env['base_url'])
+
     def get_username(self):
         """Get username for current environment."""
         return self.current_env['username']
-    
+
     def get_password(self):
         """Get password for current environment."""
         return self.current_env['password']
-    
+
     def get_browser_config(self):
         """Get browser configuration."""
         return self.config['browser']
-    
+
     def get_logging_config(self):
         """Get logging configuration."""
         return self.config['logging']
 
     def set_browser(self, browser_name):
-        """Set the active browser dynamically (e.g., chrome or edge)."""
+        """Set the active browser for this instance only (e.g., chrome or edge); shared config is untouched."""
         if browser_name.lower() not in ['chrome', 'edge', 'firefox']:
             raise ValueError(f"Unsupported browser: {browser_name}")
         self.current_browser = browser_name.lower()
-        self.config['browser']['default'] = self.current_browser
\ No newline at end of file
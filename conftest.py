@@ -5,10 +5,20 @@ import logging
 import colorlog
 from datetime import datetime
 import os
-import time
 from pathlib import Path
 import pytest_html  # <-- The required import
 from config.environment import Environment
+from utils.browser_pool import BrowserPool
+from utils.duration_history import (DurationHistory, DurationRecorder, order_longest_first, parse_shard,
+                                    plan_shards, split_nodeid)
+from utils.failure_artifacts import failure_artifacts
+from utils.action_trace import start_trace, stop_trace
+from utils.logger import start_async_logging, stop_async_logging
+from utils.network_replay import MODES as NETWORK_MODES, NetworkStandIn
+from utils.shared_test_data import publish_store, unpublish_store
+
+# Framework tests under tests/unit run pytest in-process or in a subprocess via pytester.
+pytest_plugins = ["pytester"]
 
 def pytest_addoption(parser):
     parser.addoption(
@@ -17,6 +27,51 @@ def pytest_addoption(parser):
         default=None,
         help="Browser to run tests: chrome or edge. If not set, tests will run on both."
     )
+    parser.addoption(
+        "--fresh-browser",
+        action="store_true",
+        default=False,
+        help="Launch a new browser for every test instead of reusing warm browsers from the pool."
+    )
+    parser.addoption(
+        "--no-prelaunch",
+        action="store_true",
+        default=False,
+        help="With --fresh-browser, launch and quit browsers inline instead of in the background."
+    )
+    parser.addoption(
+        "--preset",
+        action="store",
+        default=None,
+        help="Browser performance preset from config.yaml (e.g. default, throughput, fidelity)."
+    )
+    parser.addoption(
+        "--network-mode",
+        action="store",
+        default="live",
+        choices=NETWORK_MODES,
+        help="live: use the real site. record: go through a local stand-in that saves every response "
+             "to HAR files. replay: serve the site offline from those HAR files."
+    )
+    parser.addoption(
+        "--browser-slots",
+        action="store",
+        default=None,
+        help="With -n, the most workers each browser may use at once, e.g. chrome=3,edge=1 "
+             "(default: no cap)."
+    )
+    parser.addoption(
+        "--shard",
+        action="store",
+        default=None,
+        help="Run only shard I of N (e.g. 2/4), balanced by the recorded test durations."
+    )
+    parser.addoption(
+        "--no-browser-scheduling",
+        action="store_true",
+        default=False,
+        help="With -n, use pytest-xdist's stock scheduler instead of the browser-aware one."
+    )
 
 
 def pytest_generate_tests(metafunc):
@@ -55,7 +110,6 @@ def session_logger(request):
     file_handler = logging.FileHandler(log_file_path)
     file_handler.setLevel(logging.DEBUG)
     file_handler.setFormatter(logging.Formatter(log_format))
-    logger.addHandler(file_handler)
 
     # Console Handler
     console_handler = colorlog.StreamHandler()
@@ -68,11 +122,81 @@ def session_logger(request):
         }
     )
     console_handler.setFormatter(console_formatter)
-    logger.addHandler(console_handler)
+
+    # Both handlers run on a background writer thread; tests only enqueue records.
+    start_async_logging([file_handler, console_handler], logger)
 
     logger.info(f"--- Test run started. Logging to {log_file_path} ---")
     yield
     logger.info("--- Test run finished. ---")
+    stop_async_logging(logger)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def action_trace(request, session_logger):
+    """
+    Writes every BasePage action of the run to reports/traces as JSON lines.
+    Summarise with: python -m utils.action_trace [--by locator|page|action]
+    """
+    trace_path = start_trace(request.config.rootpath / "reports" / "traces")
+    logging.getLogger("MyFrameworkLogger").info(f"Action trace: {trace_path}")
+    yield trace_path
+    stop_trace()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def network_stand_in(request, session_logger):
+    """
+    With --network-mode record or replay, serves the supertails environment from a
+    local stand-in for the whole session and points its base URL at it.
+    Under pytest-xdist every worker runs its own stand-in and records its own HAR file.
+    """
+    mode = request.config.getoption("network_mode")
+    if mode == "live":
+        yield None
+        return
+
+    env = Environment("supertails")
+    settings = env.current_env.get("stand_in", {})
+    stand_in = NetworkStandIn(env.current_env["base_url"], mode,
+                              settings.get("archive_dir", "test_data/network_archive/supertails"),
+                              settings.get("hosts", [])).start()
+    overrides = {"SUPERTAILS_BASE_URL": stand_in.base_url, "NETWORK_MODE": mode}
+    previous = {name: os.environ.get(name) for name in overrides}
+    os.environ.update(overrides)
+    yield stand_in
+    stand_in.stop()
+    for name, value in previous.items():
+        if value is None:
+            os.environ.pop(name, None)
+        else:
+            os.environ[name] = value
+
+
+@pytest.fixture(autouse=True)
+def network_stand_in_test(request, network_stand_in):
+    """Records or replays each test's exchanges under its own node id (see NetworkStandIn)."""
+    if network_stand_in is None:
+        yield
+        return
+    network_stand_in.set_current_test(split_nodeid(request.node.nodeid)[0])
+    yield
+    network_stand_in.set_current_test(None)
+
+
+@pytest.fixture(scope="session")
+def browser_pool(request, session_logger):
+    """
+    A session-scoped pool of warm browsers, shared by every test in this process.
+    Under pytest-xdist each worker is its own process and gets its own pool.
+    With --fresh-browser the pool launches each next browser in the background instead.
+    """
+    pool = BrowserPool(
+        reuse=not request.config.getoption("fresh_browser"),
+        prelaunch=not request.config.getoption("no_prelaunch")
+    )
+    yield pool
+    pool.shutdown()
 
 
 def pytest_configure(config):
@@ -87,22 +211,160 @@ def pytest_configure(config):
         if not html_path.is_absolute():
             config.option.htmlpath = Path(config.rootpath) / html_path
 
+    try:
+        config.shard = parse_shard(config.getoption("shard")) if config.getoption("shard") else None
+    except ValueError as e:
+        raise pytest.UsageError(str(e))
+    config.duration_history = DurationHistory()
+    if getattr(config, "workerinput", {}).get("browser_scheduling"):
+        # xdist only tags xdist_group items with "@group" under --dist loadgroup; the
+        # browser scheduler needs the tags to keep each batch_rows group on one worker.
+        config.option.loadgroup = True
+    if not hasattr(config, "workerinput"):
+        # The only process, or the xdist controller, sees every test report.
+        config.pluginmanager.register(DurationRecorder(config.duration_history), "duration_recorder")
+
+    # Under pytest-xdist workers inherit TEST_DATA_STORE: each workbook a test reads is
+    # compiled once into that directory and memory-mapped by every worker.
+    if getattr(config.option, "numprocesses", None) and not hasattr(config, "workerinput"):
+        config.test_data_store = publish_store()
+        if _uses_browser_scheduling(config):
+            from utils.browser_scheduler import parse_browser_slots
+            try:
+                config.browser_slots = parse_browser_slots(config.getoption("browser_slots"))
+            except ValueError as e:
+                raise pytest.UsageError(str(e))
+
+
+def _uses_browser_scheduling(config):
+    """Whether this xdist run uses the browser-aware scheduler (plain -n / --dist load or loadgroup)."""
+    return (not config.getoption("no_browser_scheduling")
+            and config.getoption("dist", "no") in ("load", "loadgroup"))
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node):
+    """Tells each xdist worker, through its workerinput, that the browser scheduler is in use."""
+    if _uses_browser_scheduling(node.config):
+        node.workerinput["browser_scheduling"] = True
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_xdist_make_scheduler(config, log):
+    """
+    Gives every xdist worker a home browser, with per-browser caps from --browser-slots,
+    and hands out each browser's tests longest-expected first (see utils/browser_scheduler.py).
+    """
+    if not _uses_browser_scheduling(config):
+        return None
+    from utils.browser_scheduler import BrowserScheduling
+    return BrowserScheduling(config, log, slots=getattr(config, "browser_slots", None),
+                             durations=config.duration_history.expected_durations())
+
+
+def pytest_itemcollected(item):
+    """
+    Tags the rows of every @pytest.mark.batch_rows test with a `batch_key` so they
+    run back to back on one shared browser session (per browser). Each row stays its
+    own test item and report entry. Under pytest-xdist the rows are also pinned to
+    one worker through an xdist_group mark, added here so it exists before xdist's
+    own hook turns group marks into "@group" node id suffixes.
+    """
+    if item.get_closest_marker("batch_rows") is None:
+        return
+    callspec = getattr(item, "callspec", None)
+    browser = callspec.params.get("browser", "") if callspec else ""
+    base_id = item.nodeid.split("[", 1)[0]
+    item.batch_key = f"{base_id}[{browser}]"
+    if item.config.pluginmanager.hasplugin("xdist"):
+        # xdist only treats "@name" as a group when no "]" follows the "@".
+        item.add_marker(pytest.mark.xdist_group(name=f"{base_id}:{browser}"))
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_collection_modifyitems(session, config, items):
+    """
+    Orders the tests that survived -m/-k deselection longest-expected first from
+    the duration history, keeping each batch together, and with --shard I/N keeps
+    only this shard's share of them. This runs last so shards split the selected
+    tests rather than the whole collection.
+    """
+    batches = {}
+    ordered = []
+    for item in items:
+        batch_key = getattr(item, "batch_key", None)
+        if batch_key is None:
+            ordered.append([item])
+            continue
+        if batch_key not in batches:
+            batches[batch_key] = []
+            ordered.append(batches[batch_key])
+        batches[batch_key].append(item)
+
+    durations = config.duration_history.expected_durations()
+    nodeid_of = lambda item: split_nodeid(item.nodeid)[0]
+    if config.shard:
+        index, total = config.shard
+        shards = plan_shards(ordered, durations, total, key=nodeid_of)
+        selected = set(shards[index - 1]["tests"])
+        ordered = [group for group in ordered if group[0] in selected]
+        deselected = [item for item in items if item not in selected]
+        if deselected:
+            config.hook.pytest_deselected(items=deselected)
+    items[:] = [item for _, group in order_longest_first(ordered, durations, key=nodeid_of) for item in group]
+
+
+def pytest_collection_finish(session):
+    """
+    Sets `item.has_later_test_on_browser` on the final (deselected, ordered) items:
+    whether a test outside the item's batch runs on the same browser after it, so
+    --fresh-browser knows when prelaunching the next browser pays off. Batches are
+    contiguous, so the browser's last item answers it. Under xdist a worker cannot
+    know which tests it gets next, so no item is marked and nothing is prelaunched.
+    """
+    if hasattr(session.config, "workerinput"):
+        return
+    items = session.items
+    browsers = [item.callspec.params.get("browser") if hasattr(item, "callspec") else None for item in items]
+    last_on_browser = {browser: index for index, browser in enumerate(browsers)}
+    for item, browser in zip(items, browsers):
+        last = items[last_on_browser[browser]]
+        batch_key = getattr(item, "batch_key", None)
+        item.has_later_test_on_browser = (browser is not None and last is not item
+                                          and not (batch_key and getattr(last, "batch_key", None) == batch_key))
+
+
+def pytest_unconfigure(config):
+    """Waits for failure artifacts to be written and removes the shared test data store."""
+    failure_artifacts.shutdown()
+    store = getattr(config, "test_data_store", None)
+    if store:
+        unpublish_store(store)
+
 
 @pytest.hookimpl(hookwrapper=True)
 def pytest_runtest_makereport(item, call):
     """
     Pytest hook that runs after each test phase.
-    Handles attaching screenshots to the pytest-html report on failure.
+    Captures failure artifacts once and links them from the pytest-html report.
     """
     outcome = yield
     report = outcome.get_result()
     report.extra = getattr(report, "extra", [])
 
     if report.when == "call" and report.failed:
-        driver = getattr(item, "driver", None)
+        driver = getattr(item.instance, "driver", None)
         if driver:
-            time.sleep(1)
-            screenshot = driver.get_screenshot_as_base64()
-            report.extra.append(pytest_html.extras.image(screenshot, 'Screenshot on Failure'))
+            # One capture feeds pytest-html here and Allure in BaseTest's teardown; both
+            # reference the content-addressed store instead of embedding the bytes.
+            item.failure_capture = failure_artifacts.capture(item.nodeid, driver)
+            html_path = item.config.getoption("htmlpath") or Path(item.config.rootpath) / "reports" / "html_report.html"
+            report_dir = Path(html_path).parent
+            screenshot = item.failure_capture.link("screenshot", report_dir)
+            if screenshot:
+                report.extra.append(pytest_html.extras.image(screenshot, 'Screenshot on Failure'))
+            page_source = item.failure_capture.link("page_source", report_dir)
+            if page_source:
+                report.extra.append(pytest_html.extras.url(page_source, 'Page Source on Failure'))
 
     setattr(item, "rep_" + report.when, report)
\ No newline at end of file
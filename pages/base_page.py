@@ -3,11 +3,48 @@ Base Page class containing common, reusable methods for all page objects.
 This class is the foundation of the Page Object Model pattern.
 """
 
+import re
+import time
+from dataclasses import dataclass
+
 import allure
+from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from pages.browser_scripts import BULK_EXTRACT_SCRIPT, ELEMENT_STATE_PREDICATE, WAIT_SCRIPT_TEMPLATE
+from utils.action_trace import traced_action
 from utils.logger import get_logger  # Import our central logger utility
+from utils.network_tracker import NETWORK_IDLE_PREDICATE
+
+DEFAULT_TIMEOUT = 20
+# How long listing reads wait for their first entry; the old implicit wait.
+LISTING_TIMEOUT = 10
+
+# Error fragments Chrome/Edge report when a page navigates away while an async
+# wait script is running. The wait is simply re-armed on the new document.
+NAVIGATION_ERRORS = ("document unloaded", "navigated or closed", "execution context was destroyed")
+
+# Locator strategies that can be resolved in the page with querySelectorAll or XPath.
+# Link-text strategies have no direct equivalent and fall back to find_elements.
+IN_PAGE_SELECTORS = {
+    By.CSS_SELECTOR: lambda value: value,
+    By.ID: lambda value: f'[id="{value}"]',
+    By.NAME: lambda value: f'[name="{value}"]',
+    By.CLASS_NAME: lambda value: f'[class~="{value}"]',
+    By.TAG_NAME: lambda value: value,
+}
+
+PRICE_PATTERN = re.compile(r"(?:₹|Rs\.?|INR)\s?[\d,]+(?:\.\d+)?")
+
+
+@dataclass(frozen=True)
+class ListingRecord:
+    """One entry of a product or cart listing, read in bulk by BasePage.get_listing_records."""
+    name: str
+    price: str
+    variant: str
+    text: str
 
 
 class BasePage:
@@ -16,13 +53,21 @@ class BasePage:
     across all page objects to maintain the DRY (Don't Repeat Yourself) principle.
     """
 
+    # Named readiness conditions for wait_until(): JavaScript predicate bodies
+    # evaluated in the page. Subclasses extend this with page-specific states.
+    READY_CONDITIONS = {
+        'document_ready': "return document.readyState === 'complete';",
+        'dom_ready': "return document.readyState !== 'loading';",
+    }
+
     def __init__(self, driver):
         """
         Initialize BasePage with the WebDriver instance and our central logger.
         """
         self.driver = driver
-        self.wait = WebDriverWait(driver, 20)
+        self.wait = WebDriverWait(driver, DEFAULT_TIMEOUT)
         self.logger = get_logger()
+        self.browser = (getattr(driver, 'capabilities', None) or {}).get('browserName')
 
     @allure.step("Clicking Element: {locator}")
     def click(self, locator):
@@ -31,8 +76,10 @@ class BasePage:
         Fails the test immediately if the element is not clickable within the timeout.
         """
         try:
-            element = self.wait.until(EC.element_to_be_clickable(locator))
-            element.click()
+            with self._traced('click', locator) as span:
+                element = self.wait_for_element_state(locator, 'clickable')
+                span.waited()
+                element.click()
             self.logger.info(f"Successfully clicked element: {locator}")
         except TimeoutException:
             self.logger.error(f"Timeout: Element not clickable: {locator}")
@@ -45,10 +92,12 @@ class BasePage:
         Fails the test immediately if the element is not found within the timeout.
         """
         try:
-            element = self.wait.until(EC.visibility_of_element_located(locator))
-            if clear_first:
-                element.clear()
-            element.send_keys(text)
+            with self._traced('send_keys', locator) as span:
+                element = self.wait_for_element_state(locator, 'visible')
+                span.waited()
+                if clear_first:
+                    element.clear()
+                element.send_keys(text)
             self.logger.info(f"Successfully entered text into element: {locator}")
         except TimeoutException:
             self.logger.error(f"Timeout: Element not visible for text entry: {locator}")
@@ -60,15 +109,18 @@ class BasePage:
         Checks if an element is visible on the page within a given timeout.
         Returns True or False. Does not fail the test.
         """
-        try:
-            WebDriverWait(self.driver, timeout).until(
-                EC.visibility_of_element_located(locator)
-            )
+        with self._traced('is_visible', locator) as span:
+            try:
+                self.wait_for_element_state(locator, 'visible', timeout)
+                span.result = True
+            except TimeoutException:
+                span.result = False
+            span.waited()
+        if span.result:
             self.logger.info(f"Element is visible: {locator}")
-            return True
-        except TimeoutException:
+        else:
             self.logger.info(f"Element is not visible within {timeout}s: {locator}")
-            return False
+        return span.result
 
     @allure.step("Getting text from Element: {locator}")
     def get_text(self, locator):
@@ -76,8 +128,10 @@ class BasePage:
         Gets text from an element. Fails test if element not found.
         """
         try:
-            element = self.wait.until(EC.visibility_of_element_located(locator))
-            text = element.text
+            with self._traced('get_text', locator) as span:
+                element = self.wait_for_element_state(locator, 'visible')
+                span.waited()
+                text = element.text
             self.logger.info(f"Retrieved text '{text}' from element: {locator}")
             return text
         except TimeoutException:
@@ -95,36 +149,267 @@ class BasePage:
     def navigate_to(self, url):
         """Navigates to a specific URL."""
         try:
-            self.driver.get(url)
+            with self._traced('navigate_to', None):
+                self.driver.get(url)
             self.logger.info(f"Successfully navigated to: {url}")
         except Exception as e:
             self.logger.error(f"Failed to navigate to {url}. Error: {e}")
             raise
 
     @allure.step("Wait for element to be present: {locator}")
-    def wait_for_element(self, locator, timeout=20):
+    def wait_for_element(self, locator, timeout=DEFAULT_TIMEOUT):
         """
         Wait for an element to be present in the DOM.
         """
         try:
-            element = WebDriverWait(self.driver, timeout).until(
-                EC.presence_of_element_located(locator)
-            )
+            with self._traced('wait_for_element', locator) as span:
+                element = self.wait_for_element_state(locator, 'present', timeout)
+                span.waited()
             self.logger.info(f"Element found: {locator}")
             return element
         except TimeoutException:
             self.logger.error(f"Timeout: Element was not present within {timeout}s: {locator}")
             raise
 
+    @allure.step("Wait for elements to be present: {locator}")
+    def wait_for_elements(self, locator, timeout=LISTING_TIMEOUT):
+        """
+        Waits for the first element matching a locator, then returns every match.
+        Returns an empty list if none appears within the timeout. Does not fail the test.
+        """
+        with self._traced('wait_for_elements', locator) as span:
+            try:
+                self.wait_for_element_state(locator, 'present', timeout)
+            except TimeoutException:
+                self.logger.info(f"No element appeared within {timeout}s: {locator}")
+                span.waited()
+                return []
+            span.waited()
+            elements = self.driver.find_elements(*locator)
+        self.logger.info(f"Found {len(elements)} element(s): {locator}")
+        return elements
+
     @allure.step("Scroll to element: {locator}")
     def scroll_to_element(self, locator):
         """
         Scrolls to an element on the page to ensure it's in the viewport.
         """
         try:
-            element = self.driver.find_element(*locator)
-            self.driver.execute_script("arguments[0].scrollIntoView(true);", element)
+            with self._traced('scroll_to_element', locator) as span:
+                element = self.wait_for_element_state(locator, 'present')
+                span.waited()
+                self.driver.execute_script("arguments[0].scrollIntoView(true);", element)
             self.logger.info(f"Scrolled to element: {locator}")
         except Exception as e:
             self.logger.error(f"Error scrolling to element {locator}: {e}")
             raise
+
+    @allure.step("Wait for element to disappear: {locator}")
+    def wait_for_invisibility(self, locator, timeout=DEFAULT_TIMEOUT):
+        """
+        Wait until an element is hidden or removed from the DOM.
+        Returns True or False. Does not fail the test.
+        """
+        try:
+            self.wait_for_element_state(locator, 'invisible', timeout)
+            self.logger.info(f"Element is not visible: {locator}")
+            return True
+        except TimeoutException:
+            self.logger.info(f"Element still visible after {timeout}s: {locator}")
+            return False
+
+    @allure.step("Wait for network idle ({quiet_ms} ms quiet)")
+    def wait_for_network_idle(self, quiet_ms=500, timeout=DEFAULT_TIMEOUT):
+        """
+        Waits until no fetch/XHR request has been in flight for `quiet_ms` milliseconds.
+        Returns True or False. Does not fail the test.
+
+        Args:
+            quiet_ms (int): How long the network must stay quiet to count as idle.
+            timeout (float): Maximum seconds to wait.
+        """
+        try:
+            result = self.wait_for_condition(NETWORK_IDLE_PREDICATE, [quiet_ms], timeout,
+                                             description=f"network idle for {quiet_ms} ms")
+            self.logger.info(f"Network idle ({result['total']} request(s) tracked on this page)")
+            return True
+        except TimeoutException:
+            self.logger.warning(f"Network did not go idle for {quiet_ms} ms within {timeout}s")
+            return False
+
+    @allure.step("Wait until '{name}'")
+    def wait_until(self, name, *args, timeout=DEFAULT_TIMEOUT):
+        """
+        Waits for a named readiness condition from READY_CONDITIONS.
+
+        Page objects add their own conditions (e.g. "cart updated") by extending
+        READY_CONDITIONS, so tests wait for a meaningful state instead of sleeping.
+
+        Args:
+            name (str): Key in READY_CONDITIONS.
+            *args: Values passed to the condition as `args`.
+            timeout (float): Maximum seconds to wait.
+
+        Returns:
+            The truthy value the condition returned.
+        """
+        if name not in self.READY_CONDITIONS:
+            raise ValueError(f"Unknown readiness condition '{name}'. Available: {sorted(self.READY_CONDITIONS)}")
+        return self.wait_for_condition(self.READY_CONDITIONS[name], list(args), timeout, description=name)
+
+    def wait_for_condition(self, predicate, args=None, timeout=DEFAULT_TIMEOUT, description="condition"):
+        """
+        Waits for a JavaScript predicate to become truthy, evaluated inside the page.
+
+        The predicate runs once immediately and then on every DOM mutation (with
+        a 100 ms fallback interval), so the wait ends as soon as the page reaches
+        the desired state rather than on the next polling tick. No implicit wait
+        is involved. If the page navigates while waiting, the wait is re-armed on
+        the new document.
+
+        Args:
+            predicate (str): JavaScript function body; receives `args` and returns
+                a truthy value when the condition is met.
+            args (list): JSON-serialisable values or WebElements passed as `args`.
+            timeout (float): Maximum seconds to wait.
+            description (str): Used in log and error messages.
+
+        Returns:
+            The truthy value returned by the predicate (elements come back as WebElements).
+
+        Raises:
+            TimeoutException: If the predicate is not met within `timeout` seconds.
+        """
+        script = WAIT_SCRIPT_TEMPLATE.replace("PREDICATE_BODY", predicate)
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                result = self.driver.execute_async_script(script, args or [], int(remaining * 1000))
+            except WebDriverException as e:
+                if any(fragment in str(e.msg) for fragment in NAVIGATION_ERRORS):
+                    continue
+                raise
+            if result and result.get('ok'):
+                return result.get('value')
+            break
+        raise TimeoutException(f"Timed out after {timeout}s waiting for {description}")
+
+    def wait_for_element_state(self, locator, state, timeout=DEFAULT_TIMEOUT):
+        """
+        Waits for the first element matching a locator to reach a state.
+
+        Args:
+            locator (tuple): (By, value) locator.
+            state (str): 'present', 'visible', 'clickable' or 'invisible'.
+            timeout (float): Maximum seconds to wait.
+
+        Returns:
+            WebElement for present/visible/clickable, True for invisible.
+
+        Raises:
+            TimeoutException: If the state is not reached within `timeout` seconds.
+        """
+        in_page = self._in_page_locator(locator)
+        if in_page is None:
+            # Link-text locators cannot be resolved in the page; poll them instead.
+            conditions = {
+                'present': EC.presence_of_element_located,
+                'visible': EC.visibility_of_element_located,
+                'clickable': EC.element_to_be_clickable,
+                'invisible': EC.invisibility_of_element_located,
+            }
+            return WebDriverWait(self.driver, timeout, poll_frequency=0.1).until(conditions[state](locator))
+        strategy, selector = in_page
+        return self.wait_for_condition(ELEMENT_STATE_PREDICATE, [strategy, selector, state], timeout,
+                                       description=f"{locator} to be {state}")
+
+    @allure.step("Reading data from all elements: {locator}")
+    def get_elements_data(self, locator, fields=None, attributes=None, timeout=LISTING_TIMEOUT):
+        """
+        Reads text, attributes and bounding data of every element matching a locator
+        in one execute_script call, instead of one WebDriver round trip per element.
+
+        Waits up to `timeout` seconds for the first matching element before reading,
+        so listings rendered asynchronously (search results, cart lines) are not read
+        while still empty. Returns an empty list if none appears in time.
+
+        Args:
+            locator (tuple): (By, value) locator matching the elements to read.
+            fields (dict): Optional {field_name: css_selector} map. Each selector is
+                evaluated inside every matched element and its text returned.
+            attributes (list): Optional attribute names to read from each element.
+            timeout (float): Maximum seconds to wait for the first element.
+
+        Returns:
+            list[dict]: One dict per element with keys text, attributes, fields,
+                rect and visible.
+        """
+        fields = fields or {}
+        attributes = list(attributes or [])
+        with self._traced('get_elements_data', locator) as span:
+            try:
+                self.wait_for_element_state(locator, 'present', timeout)
+            except TimeoutException:
+                self.logger.info(f"No element appeared within {timeout}s: {locator}")
+                span.waited()
+                return []
+            span.waited()
+            in_page = self._in_page_locator(locator)
+            if in_page is not None:
+                strategy, selector = in_page
+                data = self.driver.execute_script(BULK_EXTRACT_SCRIPT, strategy, selector, attributes, fields, None)
+            else:
+                elements = self.driver.find_elements(*locator)
+                data = self.driver.execute_script(BULK_EXTRACT_SCRIPT, None, None, attributes, fields, elements)
+        self.logger.info(f"Read data from {len(data)} element(s) in one call: {locator}")
+        return data
+
+    def get_listing_records(self, locator, fields, timeout=LISTING_TIMEOUT):
+        """
+        Builds ListingRecord objects for every element of a listing in one round trip.
+
+        Missing names and prices are recovered from the element text: the name
+        falls back to its first line and the price to the first rupee amount.
+
+        Args:
+            locator (tuple): (By, value) locator of the listing entries (cards, rows).
+            fields (dict): CSS selectors for 'name', 'price' and 'variant' inside an entry.
+            timeout (float): Maximum seconds to wait for the first entry.
+
+        Returns:
+            list[ListingRecord]: One record per listing entry, in page order.
+        """
+        records = []
+        for data in self.get_elements_data(locator, fields=fields, timeout=timeout):
+            text = data['text'] or ''
+            lines = [line.strip() for line in text.splitlines() if line.strip()]
+            price_match = PRICE_PATTERN.search(text)
+            records.append(ListingRecord(
+                name=data['fields'].get('name') or (lines[0] if lines else ''),
+                price=data['fields'].get('price') or (price_match.group(0) if price_match else ''),
+                variant=data['fields'].get('variant') or '',
+                text=text
+            ))
+        return records
+
+    def _traced(self, action, locator):
+        """Records a primitive in the action trace (see utils/action_trace.py)."""
+        return traced_action(self, action, locator, self.browser)
+
+    @staticmethod
+    def _in_page_locator(locator):
+        """
+        Translates a (By, value) locator into ('xpath' | 'css', selector) for in-page scripts.
+
+        Returns:
+            tuple: The in-page strategy and selector, or None for link-text locators.
+        """
+        strategy, value = locator
+        if strategy == By.XPATH:
+            return 'xpath', value
+        if strategy in IN_PAGE_SELECTORS:
+            return 'css', IN_PAGE_SELECTORS[strategy](value)
+        return None
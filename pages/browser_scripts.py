@@ -0,0 +1,111 @@
+"""
+JavaScript snippets executed in the browser by BasePage.
+Kept in one module so page objects stay readable and every in-page script
+can be reviewed in one place.
+"""
+
+# Finds every element matching a locator and reads text, attributes, bounding
+# box and optional child-field texts for all of them in a single round trip.
+BULK_EXTRACT_SCRIPT = """
+var strategy = arguments[0], value = arguments[1], attributeNames = arguments[2],
+    fields = arguments[3], elements = arguments[4];
+if (!elements) {
+    elements = [];
+    if (strategy === 'xpath') {
+        var snapshot = document.evaluate(value, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        for (var i = 0; i < snapshot.snapshotLength; i++) { elements.push(snapshot.snapshotItem(i)); }
+    } else {
+        elements = Array.prototype.slice.call(document.querySelectorAll(value));
+    }
+}
+function readText(node) { return node ? (node.innerText || node.textContent || '').trim() : null; }
+return elements.map(function (element) {
+    var rect = element.getBoundingClientRect();
+    var attributes = {};
+    attributeNames.forEach(function (name) { attributes[name] = element.getAttribute(name); });
+    var fieldTexts = {};
+    Object.keys(fields).forEach(function (name) { fieldTexts[name] = readText(element.querySelector(fields[name])); });
+    return {
+        text: readText(element),
+        attributes: attributes,
+        fields: fieldTexts,
+        rect: {x: rect.x, y: rect.y, width: rect.width, height: rect.height},
+        visible: rect.width > 0 && rect.height > 0
+    };
+});
+"""
+
+# Generic event-driven wait, run with execute_async_script. The predicate body
+# (PREDICATE_BODY placeholder) is evaluated immediately, on every DOM mutation
+# and on a short interval for state the DOM does not reflect (readyState,
+# layout). The script resolves the moment the predicate returns a truthy value,
+# or with {ok: false} once the in-page timeout expires.
+# Arguments: predicate args (array), timeout in ms.
+WAIT_SCRIPT_TEMPLATE = """
+var done = arguments[arguments.length - 1];
+var args = arguments[0], timeoutMs = arguments[1];
+var predicate = function (args) { PREDICATE_BODY };
+var finished = false, observer = null, poller = null, timer = null;
+function finish(result) {
+    if (finished) { return; }
+    finished = true;
+    if (observer) { observer.disconnect(); }
+    clearInterval(poller);
+    clearTimeout(timer);
+    done(result);
+}
+function check() {
+    if (finished) { return; }
+    try {
+        var value = predicate(args);
+        if (value) { finish({ok: true, value: value}); }
+    } catch (e) { /* keep waiting: the DOM may be mid-update */ }
+}
+check();
+if (!finished) {
+    observer = new MutationObserver(check);
+    observer.observe(document.documentElement || document,
+        {childList: true, subtree: true, attributes: true, characterData: true});
+    poller = setInterval(check, 100);
+    timer = setTimeout(function () { finish({ok: false}); }, timeoutMs);
+}
+"""
+
+# Predicate body for element waits. args: [strategy ('xpath' or 'css'), selector, state].
+# Like find_element, only the first match is considered. Returns the element for
+# present/visible/clickable and true for invisible.
+ELEMENT_STATE_PREDICATE = """
+var strategy = args[0], selector = args[1], state = args[2];
+var element = strategy === 'xpath'
+    ? document.evaluate(selector, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue
+    : document.querySelector(selector);
+function isVisible(node) {
+    var rect = node.getBoundingClientRect();
+    if (rect.width === 0 && rect.height === 0) { return false; }
+    if (node.checkVisibility) {
+        return node.checkVisibility({checkOpacity: true, checkVisibilityCSS: true});
+    }
+    var style = window.getComputedStyle(node);
+    return style.visibility !== 'hidden' && style.display !== 'none' && style.opacity !== '0';
+}
+if (state === 'invisible') { return !element || !isVisible(element); }
+if (!element) { return false; }
+if (state === 'present') { return element; }
+if (!isVisible(element)) { return false; }
+if (state === 'clickable' && element.disabled) { return false; }
+return element;
+"""
+
+# Number of items the storefront currently shows in the cart: the header
+# count bubble or the rendered cart lines, whichever is higher.
+CART_COUNT_EXPRESSION = """
+(function () {
+    var bubble = document.querySelector('[data-cart-count], .cart-link__bubble-num, #CartCount, .cart-count');
+    var bubbleCount = 0;
+    if (bubble) {
+        var raw = bubble.getAttribute('data-cart-count') || bubble.textContent || '';
+        bubbleCount = parseInt(raw.replace(/[^0-9]/g, ''), 10) || 0;
+    }
+    return Math.max(bubbleCount, document.querySelectorAll('div.cart__item').length);
+})()
+"""
@@ -1,4 +1,5 @@
 from pages.base_page import BasePage
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
 
 class CartPage(BasePage):
@@ -7,6 +8,19 @@ class CartPage(BasePage):
     TRASH_BUTTON_XPATH = './/div[@class="cart__remove"]'
     REMOVE_BUTTON = (By.XPATH,'//span[contains(text(),"Remove")]')
     EMPTY_CART = (By.CSS_SELECTOR,'div[class="rte text-spacing"]')
+    CART_ITEM_FIELDS = {
+        'name': '.cart__item-name, [class*="item-name"], [class*="title"]',
+        'price': '.cart__price, [class*="price"]',
+        'variant': '.cart__item--variants, [class*="variant"]',
+    }
+
+    READY_CONDITIONS = {
+        **BasePage.READY_CONDITIONS,
+        'cart_contents_rendered': (
+            "return document.querySelector('div.cart__item') || "
+            "document.querySelector('div[class=\"rte text-spacing\"]');"
+        ),
+    }
 
     def __init__(self,driver):
         super().__init__(driver)
@@ -14,16 +28,33 @@ class CartPage(BasePage):
     def open_cart(self):
         self.logger.info('opening cart')
         self.click(self.CART_ICON)
+        self.wait_for_network_idle()
+        self.wait_for_cart_contents()
+
+    def wait_for_cart_contents(self, timeout=10):
+        """
+        Waits until the opened cart shows either its items or the empty-cart message.
+        Returns True or False. Does not fail the test.
+        """
+        try:
+            self.wait_until('cart_contents_rendered', timeout=timeout)
+            return True
+        except TimeoutException:
+            self.logger.warning(f"Cart contents did not render within {timeout}s")
+            return False
 
     def get_items_in_cart(self):
         self.logger.info('getting items in cart')
-        cart_items_list = self.driver.find_elements(*self.CART_ITEMS)
-        cart_items = [item.text for item in cart_items_list]
-        return cart_items
+        return [item.text for item in self.get_cart_item_records()]
+
+    def get_cart_item_records(self):
+        """Returns a ListingRecord (name, price, variant) per cart line, read in one call."""
+        self.logger.info('getting cart item records')
+        return self.get_listing_records(self.CART_ITEMS, self.CART_ITEM_FIELDS)
 
     def remove_cart_item_by_index(self,index=0):
         self.logger.info('removing the product to cart')
-        cart_items_list = self.driver.find_elements(*self.CART_ITEMS)
+        cart_items_list = self.wait_for_elements(self.CART_ITEMS)
         if index<len(cart_items_list):
             remove_button = cart_items_list[index].find_element(By.XPATH,self.TRASH_BUTTON_XPATH)
             remove_button.click()
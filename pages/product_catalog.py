@@ -1,6 +1,7 @@
-from selenium.common import ElementClickInterceptedException
+from selenium.common import ElementClickInterceptedException, TimeoutException
 
 from pages.base_page import BasePage
+from pages.browser_scripts import CART_COUNT_EXPRESSION
 from selenium.webdriver.common.by import By
 
 class ProductCatalog(BasePage):
@@ -9,9 +10,20 @@ class ProductCatalog(BasePage):
     PRODUCT_CARDS = (By.XPATH,'//div[@id="searchResultsWrapper"]//li')
     ADD_TO_CART= (By.XPATH,'//span[contains(text(),"Add to Cart")]/..')
     NO_RESULT = (By.XPATH,'//div[@class="search-not-found noResult"]')
+    PRODUCT_CARD_FIELDS = {
+        'name': '[class*="title"], [class*="name"], h3, h2',
+        'price': '[class*="price"]:not([class*="compare"])',
+        'variant': '[class*="variant"], select option:checked',
+    }
+
+    READY_CONDITIONS = {
+        **BasePage.READY_CONDITIONS,
+        'cart_updated': f"var count = {CART_COUNT_EXPRESSION}; return count > args[0] ? count : false;",
+    }
 
     def __init__(self,driver):
         super().__init__(driver)
+        self._cart_count_before_add = 0
 
     def search_product(self,name):
         self.logger.info(f'searching for product f{name}')
@@ -20,18 +32,21 @@ class ProductCatalog(BasePage):
             self.click(self.SEARCH_BUTTON)
         except ElementClickInterceptedException:
             self.logger.warning("Search button click intercepted, retrying with JS click")
-            btn = self.driver.find_element(*self.SEARCH_BUTTON)
+            btn = self.wait_for_element(self.SEARCH_BUTTON)
             self.driver.execute_script("arguments[0].click();", btn)
 
     def get_list_products(self):
         self.logger.info(f'getting for products')
-        products_list = self.driver.find_elements(*self.PRODUCT_CARDS)
-        products = [product.text for product in products_list]
-        return products
+        return [product.text for product in self.get_product_records()]
+
+    def get_product_records(self):
+        """Returns a ListingRecord (name, price, variant) per search result, read in one call."""
+        self.logger.info('getting product records')
+        return self.get_listing_records(self.PRODUCT_CARDS, self.PRODUCT_CARD_FIELDS)
 
     def click_product_by_index(self,index=0):
         self.logger.info('clicking the product')
-        products_list = self.driver.find_elements(*self.PRODUCT_CARDS)
+        products_list = self.wait_for_elements(self.PRODUCT_CARDS)
         if index<len(products_list):
             products_list[index].click()
         else:
@@ -40,15 +55,32 @@ class ProductCatalog(BasePage):
     def add_to_cart(self):
         """Clicks the Add to Cart button on the product detail page."""
         self.logger.info("Clicking Add to Cart button on product detail page")
+        self._cart_count_before_add = self.driver.execute_script(f"return {CART_COUNT_EXPRESSION};")
         try:
             self.click(self.ADD_TO_CART)
             self.logger.info("Add to Cart button clicked successfully")
-        except Exception:
+        except (ElementClickInterceptedException, TimeoutException):
+            # Only a click that did not happen is retried; retrying after the add went
+            # through (e.g. when the network wait timed out) would add the product twice.
             self.logger.warning("Normal click failed, retrying with JS click")
             add_button = self.wait_for_element(self.ADD_TO_CART)
             self.driver.execute_script("arguments[0].scrollIntoView();",add_button)
             self.driver.execute_script("arguments[0].click();", add_button)
+        self.wait_for_network_idle()
 
     def no_result(self):
         self.logger.info('no result is found')
-        return self.get_text(self.NO_RESULT)
\ No newline at end of file
+        return self.get_text(self.NO_RESULT)
+
+    def wait_for_cart_update(self, timeout=10):
+        """
+        Waits until the storefront shows more cart items than before the last add_to_cart().
+        Returns True once the cart count went up, False on timeout. Does not fail the test.
+        """
+        try:
+            count = self.wait_until('cart_updated', self._cart_count_before_add, timeout=timeout)
+            self.logger.info(f"Cart updated: {self._cart_count_before_add} -> {count} item(s)")
+            return True
+        except TimeoutException:
+            self.logger.warning(f"Cart count did not change within {timeout}s after Add to Cart")
+            return False
@@ -36,7 +36,6 @@ class TestCart(BaseTest):
                 allure.attach(str(items), name="Cart Items", attachment_type=allure.attachment_type.TEXT)
             except Exception as e:
                 self.logger.error(f"Error opening or reading cart: {e}")
-                allure.attach(self.driver.page_source, name="Cart Failure Page", attachment_type=allure.attachment_type.HTML)
                 pytest.fail(f"Test failed: {e}")
 
     @allure.title("TC_CART_002 - Verify user can remove an item from the cart")
@@ -71,5 +70,4 @@ class TestCart(BaseTest):
                     self.logger.warning("Cart already empty; skipping removal check.")
             except Exception as e:
                 self.logger.error(f"Error while removing cart item: {e}")
-                allure.attach(self.driver.page_source, name="Cart Remove Failure", attachment_type=allure.attachment_type.HTML)
                 pytest.fail(f"Test failed due to exception: {e}")
@@ -1,6 +1,5 @@
 import allure
 import pytest
-import time
 from pages.product_catalog import ProductCatalog
 from pages.cart import CartPage
 from tests.base_test import BaseTest
@@ -38,17 +37,15 @@ class TestIntegrationCartCatalog(BaseTest):
                 catalog.click_product_by_index(2)  # 🔹 Changed: Open product page first instead of direct add_to_cart_by_index
                 self.logger.info("Opened 3rd product from search results successfully.")
                 catalog.add_to_cart()
+                catalog.wait_for_cart_update()
                 self.logger.info("Product added to cart successfully.")
-                time.sleep(5)
             except Exception as e:
                 self.logger.error(f"Error adding product to cart: {e}")
-                allure.attach(self.driver.page_source, name="Add to Cart Failure", attachment_type=allure.attachment_type.HTML)
                 pytest.fail(f"Failed during add-to-cart: {e}")
 
         with allure.step("Open cart and verify added product"):
             try:
                 cart.open_cart()
-                time.sleep(3)
                 items = cart.get_items_in_cart()
                 self.logger.info(f"Cart contents: {items}")
 
@@ -61,5 +58,4 @@ class TestIntegrationCartCatalog(BaseTest):
 
             except Exception as e:
                 self.logger.error(f"Error verifying cart after add: {e}")
-                allure.attach(self.driver.page_source, name="Cart Verification Failure",attachment_type=allure.attachment_type.HTML)
                 pytest.fail(f"Cart verification failed: {e}")
@@ -36,7 +36,6 @@ class TestProductCatalog(BaseTest):
                 allure.attach(str(products), name="Search Results", attachment_type=allure.attachment_type.TEXT)
             except Exception as e:
                 self.logger.error(f"Error during product search: {e}")
-                allure.attach(self.driver.page_source, name="Search Failure Page", attachment_type=allure.attachment_type.HTML)
                 pytest.fail(f"Test failed due to exception: {e}")
 
     @allure.title("TC_PC_002 - Verify 'No Results' message is displayed for invalid product search")
@@ -65,5 +64,4 @@ class TestProductCatalog(BaseTest):
                 assert "no" in message.lower(), "Expected 'No Results' message not displayed."
             except Exception as e:
                 self.logger.error(f"Error during invalid product search: {e}")
-                allure.attach(self.driver.page_source, name="Invalid Search Failure", attachment_type=allure.attachment_type.HTML)
                 pytest.fail(f"Test failed due to exception: {e}")
@@ -0,0 +1,34 @@
+# tests/unit/test_action_trace.py
+"""Checks that the trace files of every xdist worker in one run count as a single run."""
+import time
+
+import utils.action_trace
+from utils.action_trace import load_events, start_trace, stop_trace, summarize, traced_action
+
+
+class CartPage:
+    pass
+
+
+def test_workers_started_at_different_seconds_share_one_run(tmp_path, monkeypatch):
+    # Leave the session's own trace writer open and restore it afterwards.
+    monkeypatch.setattr(utils.action_trace, "_writer", None)
+    monkeypatch.setenv("PYTEST_XDIST_TESTRUNUID", "5b1f0c2e9d7a4e3f8c6b2a1d0e9f8a7b")
+    clock = iter(["20261017_101500", "20261017_101503"])
+    monkeypatch.setattr(time, "strftime", lambda fmt: next(clock))
+    paths = []
+    try:
+        for worker in ("gw0", "gw1"):
+            monkeypatch.setenv("PYTEST_XDIST_WORKER", worker)
+            paths.append(start_trace(tmp_path))
+            with traced_action(CartPage(), "click", ("css selector", "#add"), "chrome") as span:
+                span.waited()
+    finally:
+        stop_trace()
+
+    assert [path.name for path in paths] == ["trace_20261017_101500_5b1f0c2e9d7a_gw0.jsonl",
+                                             "trace_20261017_101503_5b1f0c2e9d7a_gw1.jsonl"]
+    events = list(load_events([tmp_path]))
+    assert {event["run"] for event in events} == {"5b1f0c2e9d7a4e3f8c6b2a1d0e9f8a7b"}
+    row, = summarize(events, ("page", "action"))
+    assert (row["count"], row["runs"]) == (2, 1)
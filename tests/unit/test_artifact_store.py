@@ -0,0 +1,75 @@
+# tests/unit/test_artifact_store.py
+"""Checks that the artifact store keeps one object per distinct content and reads it back intact."""
+from utils.artifact_store import ArtifactStore, load_index
+from utils.failure_artifacts import FailureArtifactPipeline
+
+PAGE = "<html><body>" + "<div class='product'>Dog food</div>" * 200 + "</body></html>"
+
+
+class FakeDriver:
+    """Answers the two calls the failure pipeline makes."""
+
+    def __init__(self, screenshot, page_source):
+        self.screenshot = screenshot
+        self.page_source = page_source
+
+    def get_screenshot_as_png(self):
+        return self.screenshot
+
+
+def test_identical_content_is_stored_once(tmp_path):
+    store = ArtifactStore(tmp_path)
+    first = store.put(PAGE.encode(), "html")
+    second = store.plan(PAGE.encode(), "html")
+    assert second == first
+    assert store.write(PAGE.encode(), second) is False
+    assert len([path for path in (tmp_path / "objects").rglob("*") if path.is_file()]) == 1
+
+
+def test_images_are_stored_as_is_and_html_is_compressed(tmp_path):
+    store = ArtifactStore(tmp_path)
+    page = store.put(PAGE.encode(), "html")
+    image = store.put(b"\x89PNG fake", "png")
+    assert page.path.name == f"{page.sha256}.html{store.codec}"
+    assert page.path.stat().st_size < len(PAGE)
+    assert image.path.read_bytes() == b"\x89PNG fake"
+    assert store.view_path(image) == image.path
+
+
+def test_plain_copy_is_written_only_when_a_report_links_to_it(tmp_path):
+    pipeline = FailureArtifactPipeline(ArtifactStore(tmp_path))
+    capture = pipeline.capture("tests/test_cart.py::test_add[chrome]", FakeDriver(b"\x89PNG screen", PAGE))
+    pipeline.shutdown()
+    assert not (tmp_path / "view").exists()
+
+    link = capture.link("page_source", tmp_path / "html")
+    pipeline.shutdown()
+    page = capture.artifacts["page_source"]
+    assert link == f"../view/{page.sha256}.html"
+    assert (tmp_path / "view" / f"{page.sha256}.html").read_text() == PAGE
+    assert capture.link("screenshot", tmp_path) == capture.artifacts["screenshot"].path.relative_to(tmp_path).as_posix()
+
+
+def test_text_artifacts_are_compressed_and_read_back(tmp_path):
+    store = ArtifactStore(tmp_path)
+    log = ("INFO step passed\n" * 500).encode()
+    artifact = store.put(log, "log")
+    assert artifact.path.suffix == store.codec
+    assert artifact.path.stat().st_size < len(log)
+    assert store.read(artifact.path.relative_to(tmp_path)) == log
+
+
+def test_pipeline_dedups_across_tests_and_indexes_each_reference(tmp_path):
+    pipeline = FailureArtifactPipeline(ArtifactStore(tmp_path))
+    driver = FakeDriver(b"\x89PNG same screen", PAGE)
+    captures = [pipeline.capture(f"tests/test_cart.py::test_add[{browser}]", driver) for browser in ("chrome", "edge")]
+    pipeline.shutdown()
+
+    assert captures[0].artifacts == captures[1].artifacts
+    assert captures[0].uri("screenshot") == captures[0].artifacts["screenshot"].path.resolve().as_uri()
+    entries = load_index(tmp_path)
+    assert len(entries) == 4
+    assert sorted(entry["new"] for entry in entries) == [False, False, True, True]
+    store = ArtifactStore(tmp_path)
+    page_entry = next(entry for entry in entries if entry["name"] == "page_source")
+    assert store.read(page_entry["path"]).decode() == PAGE
@@ -0,0 +1,67 @@
+# tests/unit/test_base_page.py
+"""Checks that BasePage reads wait for their elements, with a fake driver standing in for the browser."""
+from selenium.webdriver.common.by import By
+
+from pages.base_page import BasePage, ListingRecord
+from pages.browser_scripts import BULK_EXTRACT_SCRIPT
+
+CARDS = (By.XPATH, '//div[@id="searchResultsWrapper"]//li')
+
+
+class FakeDriver:
+    """Answers in-page waits from `rendered` and bulk reads from `cards`, logging every call."""
+
+    capabilities = {"browserName": "chrome"}
+
+    def __init__(self, rendered=True, cards=()):
+        self.rendered = rendered
+        self.cards = list(cards)
+        self.calls = []
+
+    def execute_async_script(self, script, args, timeout_ms):
+        self.calls.append(("wait", args[-1]))
+        return {"ok": self.rendered, "value": "element" if self.rendered else None}
+
+    def execute_script(self, script, *args):
+        self.calls.append(("bulk" if script == BULK_EXTRACT_SCRIPT else "script", args))
+        return self.cards
+
+    def find_elements(self, by, value):
+        self.calls.append(("find", value))
+        return list(self.cards)
+
+
+def card(text, **fields):
+    return {"text": text, "attributes": {}, "fields": fields, "rect": {}, "visible": True}
+
+
+def test_listing_waits_for_the_first_entry_before_reading():
+    driver = FakeDriver(cards=[card("Dog food\n₹499", name="Dog food", price="₹499")])
+    records = BasePage(driver).get_listing_records(CARDS, {"name": "h3"})
+    assert [kind for kind, _ in driver.calls] == ["wait", "bulk"]
+    assert driver.calls[0][1] == "present"
+    assert records == [ListingRecord(name="Dog food", price="₹499", variant="", text="Dog food\n₹499")]
+
+
+def test_listing_that_never_renders_is_empty_without_a_bulk_read():
+    driver = FakeDriver(rendered=False)
+    assert BasePage(driver).get_elements_data(CARDS, timeout=0.5) == []
+    assert [kind for kind, _ in driver.calls] == ["wait"]
+
+
+def test_listing_records_fall_back_to_the_entry_text():
+    driver = FakeDriver(cards=[card("Cat litter 5kg\nRs. 1,299\nAdd to cart")])
+    record, = BasePage(driver).get_listing_records(CARDS, {})
+    assert (record.name, record.price) == ("Cat litter 5kg", "Rs. 1,299")
+
+
+def test_wait_for_elements_waits_before_finding():
+    driver = FakeDriver(cards=["first", "second"])
+    assert BasePage(driver).wait_for_elements(CARDS) == ["first", "second"]
+    assert [kind for kind, _ in driver.calls] == ["wait", "find"]
+
+
+def test_wait_for_elements_is_empty_when_nothing_renders():
+    driver = FakeDriver(rendered=False)
+    assert BasePage(driver).wait_for_elements(CARDS, timeout=0.5) == []
+    assert [kind for kind, _ in driver.calls] == ["wait"]
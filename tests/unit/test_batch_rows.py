@@ -0,0 +1,59 @@
+# tests/unit/test_batch_rows.py
+"""
+Runs the project conftest under pytest-xdist (through pytester) and checks that the
+rows of a @pytest.mark.batch_rows test stay together on one worker per browser.
+"""
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+
+ROWS_TEST = """
+import os
+import pytest
+
+LOG = {log!r}
+
+def record(kind, browser, row):
+    with open(LOG, "a") as log:
+        log.write(f"{{kind}} {{browser}} {{row}} {{os.environ['PYTEST_XDIST_WORKER']}}\\n")
+
+@pytest.mark.batch_rows
+@pytest.mark.parametrize("row", range(4))
+def test_batched(browser, row):
+    record("batched", browser, row)
+
+@pytest.mark.parametrize("row", range(4))
+def test_plain(browser, row):
+    record("plain", browser, row)
+"""
+
+
+def run_rows(pytester, monkeypatch, workers, *args):
+    monkeypatch.setenv("PYTHONPATH", str(PROJECT_ROOT))
+    monkeypatch.setenv("TEST_HISTORY_DB", str(pytester.path / "history.sqlite"))
+    pytester.makeini("[pytest]\nmarkers =\n    batch_rows: rows share one browser session\n")
+    pytester.makeconftest((PROJECT_ROOT / "conftest.py").read_text())
+    log = pytester.path / "rows.log"
+    pytester.makepyfile(test_rows=ROWS_TEST.format(log=str(log)))
+    result = pytester.runpytest_subprocess("-n", str(workers), "-p", "no:cacheprovider", *args)
+    result.assert_outcomes(passed=16)
+    used = {}
+    for line in log.read_text().splitlines():
+        kind, browser, row, worker = line.split()
+        if kind == "batched":
+            used.setdefault(browser, set()).add(worker)
+    return used
+
+
+def test_batch_rows_stay_together_with_stock_loadgroup(pytester, monkeypatch):
+    workers = run_rows(pytester, monkeypatch, 2, "--dist", "loadgroup", "--no-browser-scheduling")
+    assert set(workers) == {"chrome", "edge"}
+    assert all(len(used) == 1 for used in workers.values()), workers
+
+
+def test_batch_rows_stay_together_with_browser_scheduling(pytester, monkeypatch):
+    # Three workers for two browsers: one browser gets two workers, so only
+    # the group keeps its rows together.
+    workers = run_rows(pytester, monkeypatch, 3)
+    assert set(workers) == {"chrome", "edge"}
+    assert all(len(used) == 1 for used in workers.values()), workers
@@ -0,0 +1,281 @@
+# tests/unit/test_browser_pool.py
+"""Drives BrowserPool with fake drivers: reuse, health checks, batches, prelaunching and shutdown."""
+import itertools
+import threading
+import time
+
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+from utils.browser_pool import BrowserPool
+
+_handles = itertools.count()
+
+
+class FakeSwitchTo:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def new_window(self, kind):
+        handle = f"tab-{next(_handles)}"
+        self.driver.tabs.append(handle)
+        self.driver.current_window_handle = handle
+
+    def window(self, handle):
+        self.driver.current_window_handle = handle
+
+
+class FakeDriver:
+    """A browser session that can be made to crash, hang or refuse to reset."""
+
+    def __init__(self, name):
+        self.name = name
+        self.state = "ok"  # ok, dead (commands fail) or hung (commands never return)
+        self.cookies = {"session": name}
+        self.tabs = ["tab-start"]
+        self.current_window_handle = "tab-start"
+        self.url = "https://supertails.com/cart"
+        self.switch_to = FakeSwitchTo(self)
+        self.quit_calls = 0
+        self.cleaned = []
+        self.cleanup_callbacks = [lambda: self.cleaned.append(True)]
+
+    @property
+    def window_handles(self):
+        return list(self.tabs)
+
+    def _command(self):
+        if self.state == "hung":
+            time.sleep(1)
+        if self.state != "ok":
+            raise WebDriverException("invalid session id")
+
+    def execute_script(self, script):
+        self._command()
+        return "complete"
+
+    def delete_all_cookies(self):
+        self._command()
+        self.cookies.clear()
+
+    def close(self):
+        self.tabs.remove(self.current_window_handle)
+
+    def get(self, url):
+        self.url = url
+
+    def quit(self):
+        self.quit_calls += 1
+
+
+class FakeCdpDriver(FakeDriver):
+    """A Chromium session: per-tab navigation history and cookies answered over DevTools."""
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.history = {"tab-start": ["https://supertails.com/", "https://supertails.com/cart"]}
+        self.cookie_domains = [".supertails.com"]
+        self.cleared_origins = []
+
+    def execute_cdp_cmd(self, command, params):
+        self._command()
+        if command == "Page.getNavigationHistory":
+            urls = self.history.get(self.current_window_handle, ["about:blank"])
+            return {"currentIndex": len(urls) - 1, "entries": [{"url": url} for url in urls]}
+        if command == "Network.getAllCookies":
+            return {"cookies": [{"domain": domain} for domain in self.cookie_domains]}
+        if command == "Storage.clearDataForOrigin":
+            self.cleared_origins.append(params["origin"])
+        elif command == "Network.clearBrowserCookies":
+            self.cookies.clear()
+        return {}
+
+
+class Launcher:
+    """A factory that counts launches and can be slowed down or made to fail."""
+
+    def __init__(self, delay=0.0, error=None):
+        self.delay = delay
+        self.error = error
+        self.drivers = []
+        self.threads = []
+
+    def __call__(self):
+        self.threads.append(threading.current_thread().name)
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        driver = FakeDriver(f"driver-{len(self.drivers)}")
+        self.drivers.append(driver)
+        return driver
+
+
+@pytest.fixture
+def make_pool():
+    pools = []
+
+    def make(**kwargs):
+        pool = BrowserPool(**kwargs)
+        pool.HEALTH_CHECK_TIMEOUT = 0.2
+        pool.RESET_TIMEOUT = 0.2
+        pools.append(pool)
+        return pool
+
+    yield make
+    for pool in pools:
+        pool.shutdown()
+
+
+def test_released_driver_is_reset_and_reused(make_pool):
+    pool, launch = make_pool(), Launcher()
+    driver = pool.acquire("Chrome", launch)
+    driver.switch_to.new_window("tab")
+    pool.release("chrome", driver)
+
+    assert driver.cookies == {} and driver.url == "about:blank"
+    assert len(driver.window_handles) == 1 and driver.window_handles == [driver.current_window_handle]
+    assert pool.acquire("chrome", launch) is driver
+    assert len(launch.drivers) == 1
+
+
+def test_pools_are_kept_per_browser(make_pool):
+    pool, launch = make_pool(), Launcher()
+    chrome = pool.acquire("chrome", launch)
+    pool.release("chrome", chrome)
+    assert pool.acquire("edge", launch) is not chrome
+    assert pool.acquire("chrome", launch) is chrome
+
+
+@pytest.mark.parametrize("state", ["dead", "hung"])
+def test_unhealthy_pooled_driver_is_replaced(make_pool, state):
+    pool, launch = make_pool(), Launcher()
+    driver = pool.acquire("chrome", launch)
+    pool.release("chrome", driver)
+    driver.state = state
+
+    replacement = pool.acquire("chrome", launch)
+    assert replacement is not driver and len(launch.drivers) == 2
+    assert driver.quit_calls == 1 and driver.cleaned == [True]
+
+
+def test_driver_that_cannot_be_reset_is_discarded(make_pool):
+    pool, launch = make_pool(), Launcher()
+    driver = pool.acquire("chrome", launch)
+    driver.state = "dead"
+    pool.release("chrome", driver)
+    assert driver.quit_calls == 1
+    assert pool.acquire("chrome", launch) is not driver
+
+
+def test_is_healthy(make_pool):
+    pool, driver = make_pool(), FakeDriver("d")
+    assert pool.is_healthy(driver)
+    driver.execute_script = lambda script: None
+    assert not pool.is_healthy(driver)
+    driver.execute_script = lambda script: 1 / 0
+    assert not pool.is_healthy(driver)
+
+
+def test_without_reuse_released_drivers_are_quit_inline(make_pool):
+    pool, launch = make_pool(reuse=False, prelaunch=False), Launcher()
+    driver = pool.acquire("chrome", launch)
+    pool.prelaunch("chrome", launch)
+    pool.release("chrome", driver)
+    assert driver.quit_calls == 1
+    assert pool.acquire("chrome", launch) is not driver
+    assert len(launch.drivers) == 2
+
+
+def test_prelaunch_launches_the_next_driver_in_the_background(make_pool):
+    pool, launch = make_pool(reuse=False), Launcher(delay=0.05)
+    first = pool.acquire("chrome", launch)
+    pool.prelaunch("chrome", launch)
+    pool.prelaunch("chrome", launch)  # Already pending: no second launch.
+    pool.release("chrome", first)
+
+    second = pool.acquire("chrome", launch)
+    assert second is not first and len(launch.drivers) == 2
+    assert launch.threads[1].startswith("browser-pool")
+    pool.shutdown()
+    assert first.quit_calls == 1
+    assert pool.hidden_launch_seconds >= 0.0 and pool.hidden_teardown_seconds >= 0.0
+
+
+def test_failed_prelaunch_falls_back_to_an_inline_launch(make_pool):
+    pool = make_pool(reuse=False)
+    pool.prelaunch("edge", Launcher(error=WebDriverException("no edge")))
+    launch = Launcher()
+    driver = pool.acquire("edge", launch)
+    assert driver is launch.drivers[0]
+
+
+def test_prelaunch_is_a_no_op_when_drivers_are_reused(make_pool):
+    pool, launch = make_pool(), Launcher()
+    pool.prelaunch("chrome", launch)
+    pool.shutdown()
+    assert launch.drivers == []
+
+
+def test_batch_keeps_its_driver_until_another_test_starts(make_pool):
+    pool, launch = make_pool(reuse=False, prelaunch=False), Launcher()
+    driver, started = pool.acquire_batched("Chrome", "test_rows[chrome]", launch)
+    assert started
+    driver.cookies["row"] = "0"
+    again, started = pool.acquire_batched("chrome", "test_rows[chrome]", launch)
+    assert (again, started) == (driver, False)
+    assert driver.cookies == {} and driver.quit_calls == 0
+
+    # The same batch key on another browser is another batch.
+    edge, started = pool.acquire_batched("edge", "test_rows[chrome]", launch)
+    assert started and edge is not driver
+    assert driver.quit_calls == 1
+
+    pool.end_batch()
+    assert edge.quit_calls == 1
+    pool.end_batch()
+    assert edge.quit_calls == 1
+
+
+def test_batch_replaces_a_driver_that_cannot_be_reset(make_pool):
+    pool, launch = make_pool(), Launcher()
+    driver, _ = pool.acquire_batched("chrome", "batch", launch)
+    driver.state = "dead"
+    replacement, started = pool.acquire_batched("chrome", "batch", launch)
+    assert started and replacement is not driver
+    assert driver.quit_calls == 1
+
+
+def test_ending_a_batch_returns_its_driver_to_the_pool(make_pool):
+    pool, launch = make_pool(), Launcher()
+    driver, _ = pool.acquire_batched("chrome", "batch", launch)
+    pool.end_batch()
+    assert pool.acquire("chrome", launch) is driver
+
+
+def test_shutdown_quits_idle_batched_and_prelaunched_drivers(make_pool):
+    pool, launch = make_pool(), Launcher()
+    idle = pool.acquire("chrome", launch)
+    pool.release("chrome", idle)
+    batched, _ = pool.acquire_batched("edge", "batch", launch)
+    pool.shutdown()
+    assert idle.quit_calls == 1 and batched.quit_calls == 1
+    assert idle.cleaned == [True] and batched.cleaned == [True]
+
+    strict, strict_launch = make_pool(reuse=False), Launcher()
+    strict.prelaunch("chrome", strict_launch)
+    strict.shutdown()
+    prelaunched, = strict_launch.drivers
+    assert prelaunched.quit_calls == 1
+
+
+
+def test_reset_clears_storage_for_every_origin_the_test_visited(make_pool):
+    pool, driver = make_pool(), FakeCdpDriver("d")
+    driver.switch_to.new_window("tab")
+    driver.history[driver.current_window_handle] = ["https://checkout.razorpay.com/v1/pay", "chrome://newtab/"]
+    pool.reset(driver)
+
+    assert sorted(driver.cleared_origins) == [
+        "http://supertails.com", "https://checkout.razorpay.com", "https://supertails.com",
+    ]
+    assert driver.cookies == {} and driver.url == "about:blank" and len(driver.window_handles) == 1
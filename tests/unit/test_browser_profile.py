@@ -0,0 +1,100 @@
+# tests/unit/test_browser_profile.py
+"""Checks how the golden profile is built, published, reused and rebuilt, and how clones are managed."""
+import json
+import os
+import subprocess
+import sys
+import threading
+
+from utils.browser_profile import (GOLDEN_POINTER, KEPT_GOLDEN_VERSIONS, BrowserProfile, build_golden_profile,
+                                   current_golden_profile, ensure_golden_profile, sweep_stale_profiles)
+
+
+def make_source(path, mtime=None):
+    prefs_file = path / "Default" / "Preferences"
+    prefs_file.parent.mkdir(parents=True, exist_ok=True)
+    prefs_file.write_text(json.dumps({"intl": {"accept_languages": "en-IN"}, "history": {"big": True}}))
+    if mtime is not None:
+        os.utime(prefs_file, (mtime, mtime))
+    return path
+
+
+def test_build_publishes_a_version_with_only_kept_preferences(tmp_path):
+    source = make_source(tmp_path / "source")
+    golden = build_golden_profile(source, tmp_path / "golden")
+    assert golden.parent == tmp_path / "golden"
+    assert (tmp_path / "golden" / GOLDEN_POINTER).read_text() == golden.name
+    prefs = json.loads((golden / "Default" / "Preferences").read_text())
+    assert prefs["intl"] == {"accept_languages": "en-IN"}
+    assert "history" not in prefs
+    assert prefs["credentials_enable_service"] is False
+
+
+def test_rebuild_never_deletes_the_version_in_use(tmp_path):
+    source = make_source(tmp_path / "source")
+    output = tmp_path / "golden"
+    versions = [build_golden_profile(source, output) for _ in range(KEPT_GOLDEN_VERSIONS + 2)]
+    assert current_golden_profile(output) == versions[-1]
+    # The previous version may still be being cloned by another worker.
+    assert all(version.is_dir() for version in versions[-KEPT_GOLDEN_VERSIONS:])
+    assert not any(version.exists() for version in versions[:-KEPT_GOLDEN_VERSIONS])
+
+
+def test_ensure_reuses_an_up_to_date_profile_and_rebuilds_a_stale_one(tmp_path):
+    source = make_source(tmp_path / "source", mtime=1_000_000)
+    output = tmp_path / "golden"
+    first = ensure_golden_profile(source, output)
+    assert ensure_golden_profile(source, output) == first
+    make_source(source)
+    os.utime(source / "Default" / "Preferences")
+    os.utime(first / "Default" / "Preferences", (1_000_000, 1_000_000))
+    second = ensure_golden_profile(source, output)
+    assert second != first and first.is_dir()
+    assert current_golden_profile(output) == second
+
+
+def test_concurrent_ensure_builds_once(tmp_path):
+    source = make_source(tmp_path / "source")
+    output = tmp_path / "golden"
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(ensure_golden_profile(source, output)))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(set(results)) == 1
+    assert [path.name for path in output.glob("v*")] == [results[0].name]
+
+
+def test_missing_source_still_builds_required_preferences(tmp_path):
+    golden = ensure_golden_profile(tmp_path / "missing", tmp_path / "golden")
+    prefs = json.loads((golden / "Default" / "Preferences").read_text())
+    assert prefs["profile"]["exited_cleanly"] is True
+    assert (golden / "First Run").is_file()
+
+
+def test_sweep_removes_only_clones_of_exited_processes(tmp_path):
+    finished = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"],
+                              capture_output=True, text=True, check=True)
+    dead_pid = int(finished.stdout)
+    parent = tmp_path / "automation_profiles"
+    stale = parent / f"gw0_{dead_pid}_a1b2"
+    live = parent / f"gw1_{os.getpid()}_c3d4"
+    unrelated = parent / "notes"
+    for path in (stale / "profile", live / "profile", unrelated):
+        path.mkdir(parents=True)
+    assert sweep_stale_profiles(tmp_path) == 1
+    assert not stale.exists() and live.is_dir() and unrelated.is_dir()
+
+
+def test_debugging_port_is_read_from_the_port_the_browser_picked(tmp_path):
+    template = make_source(tmp_path / "template")
+    (template / "DevToolsActivePort").write_text("9222\n/devtools/browser/old\n")
+    profile = BrowserProfile.create(template, base_dir=tmp_path)
+    # The template's stale port file is not cloned, so nothing is known before launch.
+    assert profile.debugging_port is None
+    (profile.path / "DevToolsActivePort").write_text("41234\n/devtools/browser/abc\n")
+    assert profile.debugging_port == 41234
+    profile.cleanup()
+    assert not profile.path.parent.exists()
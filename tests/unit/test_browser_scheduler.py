@@ -0,0 +1,115 @@
+# tests/unit/test_browser_scheduler.py
+"""Drives BrowserScheduling with fake xdist nodes and checks who runs what."""
+from types import SimpleNamespace
+
+import pytest
+
+from utils.browser_scheduler import BrowserScheduling, parse_browser_slots
+
+
+class FakeNode:
+    """Stands in for an xdist WorkerController."""
+
+    def __init__(self, name):
+        self.gateway = SimpleNamespace(id=name)
+        self.shutting_down = False
+        self.sent = []
+
+    def send_runtest_some(self, indices):
+        self.sent.extend(indices)
+
+    def shutdown(self):
+        self.shutting_down = True
+
+
+COLLECTION = [
+    "t.py::test_batch[chrome-0]@t.py::test_batch:chrome",
+    "t.py::test_batch[chrome-1]@t.py::test_batch:chrome",
+    "t.py::test_batch[chrome-2]@t.py::test_batch:chrome",
+    "t.py::test_a[chrome]",
+    "t.py::test_b[chrome]",
+    "t.py::test_a[edge]",
+    "t.py::test_b[edge]",
+    "t.py::test_plain",
+]
+
+
+def run(worker_count, slots=None, durations=None):
+    """
+    Schedules COLLECTION on fake nodes and completes tests until the run is over.
+    Every test is expected to take 1s unless `durations` says otherwise.
+    """
+    durations = {**{test.split("@")[0]: 1.0 for test in COLLECTION}, **(durations or {})}
+    options = {"tx": ["popen"] * worker_count, "maxschedchunk": None}
+    config = SimpleNamespace(getoption=options.get, getvalue=options.get, hook=None)
+    scheduler = BrowserScheduling(config, log=None, slots=slots, durations=durations)
+    scheduler.log = lambda *args: None
+    nodes = [FakeNode(f"gw{index}") for index in range(worker_count)]
+    for node in nodes:
+        scheduler.add_node(node)
+        scheduler.add_node_collection(node, COLLECTION)
+    scheduler.schedule()
+    homes = {node.gateway.id: scheduler.node2browser[node] for node in nodes}
+    while not scheduler.tests_finished:
+        for node in nodes:
+            if scheduler.node2pending[node]:
+                scheduler.mark_test_complete(node, scheduler.node2pending[node][0])
+    ran = {node.gateway.id: [COLLECTION[index] for index in node.sent] for node in nodes}
+    return scheduler, homes, ran
+
+
+def worker_of(ran, nodeid):
+    return next(worker for worker, tests in ran.items() if nodeid in tests)
+
+
+def test_every_test_runs_exactly_once():
+    _, _, ran = run(3)
+    sent = sorted(test for tests in ran.values() for test in tests)
+    assert sent == sorted(COLLECTION)
+
+
+def test_group_stays_on_one_worker_in_order():
+    _, _, ran = run(3)
+    batch = [test for test in COLLECTION if "@" in test]
+    worker = worker_of(ran, batch[0])
+    assert [test for test in ran[worker] if "@" in test] == batch
+
+
+def test_workers_keep_to_their_browser_while_it_has_work():
+    # 6s of edge work against 5s of chrome work: one home each.
+    _, homes, ran = run(2, durations={"t.py::test_a[edge]": 3.0, "t.py::test_b[edge]": 3.0})
+    assert sorted(homes.values()) == ["chrome", "edge"]
+    for worker, home in homes.items():
+        browsers = [test.split("[")[1].split("]")[0].split("-")[0] for test in ran[worker] if "[" in test]
+        # A worker only moves to another browser once its own queue is empty.
+        assert browsers[0] == home
+        assert browsers == sorted(browsers, key=lambda browser: browser != home)
+
+
+def test_homes_follow_expected_work_per_worker():
+    # 5s of chrome work against 2s of edge: the second worker is better used on chrome too.
+    _, homes, _ = run(2)
+    assert sorted(homes.values()) == ["chrome", "chrome"]
+
+
+def test_browser_slots_cap_concurrent_workers():
+    _, homes, ran = run(4, slots={"edge": 1})
+    assert list(homes.values()).count("edge") == 1
+    edge_workers = {worker_of(ran, test) for test in COLLECTION if "[edge]" in test}
+    assert len(edge_workers) == 1
+
+
+def test_longest_expected_test_goes_first():
+    _, homes, ran = run(2, durations={"t.py::test_b[edge]": 30.0})
+    edge_worker = next(worker for worker, home in homes.items() if home == "edge")
+    edge_tests = [test for test in ran[edge_worker] if "[edge]" in test]
+    assert edge_tests == ["t.py::test_b[edge]", "t.py::test_a[edge]"]
+
+
+def test_parse_browser_slots():
+    assert parse_browser_slots("chrome=3, edge=1") == {"chrome": 3, "edge": 1}
+    assert parse_browser_slots(None) == {}
+    with pytest.raises(ValueError):
+        parse_browser_slots("safari=2")
+    with pytest.raises(ValueError):
+        parse_browser_slots("chrome=0")
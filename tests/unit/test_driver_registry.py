@@ -0,0 +1,115 @@
+# tests/unit/test_driver_registry.py
+"""Checks the driver registry's lookups, persistence and invalidation, and the factory's retry on a stale driver."""
+import json
+import os
+import stat
+
+import pytest
+from selenium.common.exceptions import SessionNotCreatedException
+
+import utils.driver_factory as driver_factory
+import utils.driver_registry as driver_registry
+from config.environment import Environment
+from utils.driver_factory import DriverFactory
+from utils.driver_registry import DriverRegistry
+
+
+@pytest.fixture
+def fake_driver(tmp_path):
+    """An executable stand-in for a driver binary."""
+    path = tmp_path / "bin" / "chromedriver"
+    path.parent.mkdir()
+    path.write_text("#!/bin/sh\n")
+    path.chmod(path.stat().st_mode | stat.S_IXUSR)
+    return path
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch, fake_driver):
+    """A registry in tmp_path whose Selenium Manager calls are counted instead of run."""
+    monkeypatch.setattr(driver_registry, "detect_browser_version", lambda browser: "120.0.1")
+    registry = DriverRegistry(tmp_path / "registry")
+    registry.resolved = []
+
+    def resolve(browser):
+        registry.resolved.append(browser)
+        return {"driver_path": str(fake_driver), "browser_path": None, "resolved_at": "now"}
+
+    monkeypatch.setattr(registry, "_resolve", resolve)
+    return registry
+
+
+def stored(registry):
+    return json.loads(registry.registry_file.read_text()) if registry.registry_file.exists() else {}
+
+
+def test_resolves_once_and_persists_by_version(registry, fake_driver):
+    assert registry.get_driver_path("Chrome") == str(fake_driver)
+    assert registry.get_driver_path("chrome") == str(fake_driver)
+    assert registry.resolved == ["chrome"]
+    assert stored(registry)["chrome:120.0.1"]["driver_path"] == str(fake_driver)
+
+
+def test_another_process_reads_the_persisted_entry(registry, tmp_path, fake_driver):
+    registry.get_driver_path("chrome")
+    other = DriverRegistry(tmp_path / "registry")
+    other._resolve = lambda browser: pytest.fail("should have been served from the registry file")
+    assert other.get_driver_path("chrome") == str(fake_driver)
+
+
+def test_missing_binary_is_resolved_again(registry, fake_driver):
+    registry.get_driver_path("chrome")
+    registry._memo.clear()
+    os.remove(fake_driver)
+    fake_driver.write_text("#!/bin/sh\n")
+    fake_driver.chmod(0o644)
+    registry.get_driver_path("chrome")
+    assert registry.resolved == ["chrome", "chrome"]
+
+
+def test_unknown_version_is_never_persisted(registry, monkeypatch, fake_driver):
+    monkeypatch.setattr(driver_registry, "detect_browser_version", lambda browser: "unknown")
+    assert registry.get_driver_path("chrome") == str(fake_driver)
+    assert registry.get_driver_path("chrome") == str(fake_driver)
+    assert registry.resolved == ["chrome"]
+    assert stored(registry) == {}
+
+
+def test_invalidate_forgets_only_that_browser(registry):
+    registry.get_driver_path("chrome")
+    registry.get_driver_path("edge")
+    registry.invalidate("chrome")
+    assert list(stored(registry)) == ["edge:120.0.1"]
+    registry.get_driver_path("edge")
+    registry.get_driver_path("chrome")
+    assert registry.resolved == ["chrome", "edge", "chrome"]
+
+
+def test_factory_invalidates_and_retries_once_on_session_not_created(monkeypatch):
+    factory = DriverFactory(Environment("supertails"))
+    invalidated, attempts = [], []
+
+    def launch():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise SessionNotCreatedException("This version of ChromeDriver only supports Chrome version 119")
+        return "driver"
+
+    monkeypatch.setattr(driver_factory.driver_registry, "invalidate", invalidated.append)
+    monkeypatch.setattr(factory, "_create_chrome", launch)
+    assert factory.create("chrome") == "driver"
+    assert invalidated == ["chrome"] and len(attempts) == 2
+
+
+def test_factory_gives_up_after_one_retry(monkeypatch):
+    factory = DriverFactory(Environment("supertails"))
+    invalidated = []
+
+    def launch():
+        raise SessionNotCreatedException("still broken")
+
+    monkeypatch.setattr(driver_factory.driver_registry, "invalidate", invalidated.append)
+    monkeypatch.setattr(factory, "_create_edge", launch)
+    with pytest.raises(SessionNotCreatedException):
+        factory.create("edge")
+    assert invalidated == ["edge"]
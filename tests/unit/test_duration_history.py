@@ -0,0 +1,69 @@
+# tests/unit/test_duration_history.py
+"""Checks the duration history round trip and the pure ordering and sharding helpers."""
+import pytest
+
+from utils.duration_history import DurationHistory, order_longest_first, parse_shard, plan_shards
+
+DURATIONS = {"t::slow": 10.0, "t::mid": 4.0, "t::fast": 1.0, "t::row[0]": 2.0, "t::row[1]": 2.0}
+
+
+def test_order_longest_first_sums_groups_and_is_stable():
+    groups = [["t::fast"], ["t::row[0]", "t::row[1]"], ["t::slow"], ["t::mid"], ["t::other"]]
+    ordered = order_longest_first(groups, {**DURATIONS, "t::other": 4.0})
+    assert [group for _, group in ordered] == [["t::slow"], ["t::row[0]", "t::row[1]"], ["t::mid"],
+                                               ["t::other"], ["t::fast"]]
+    assert ordered[1][0] == 4.0
+
+
+def test_order_longest_first_estimates_unknown_tests_with_the_median():
+    ordered = order_longest_first([["t::new"], ["t::fast"]], DURATIONS)
+    assert ordered[0] == (2.0, ["t::new"])
+    assert order_longest_first([["a"], ["b"]], {}) == [(1.0, ["a"]), (1.0, ["b"])]
+
+
+def test_order_longest_first_uses_the_key():
+    ordered = order_longest_first([[("t::fast",)], [("t::slow",)]], DURATIONS, key=lambda test: test[0])
+    assert ordered[0][1] == [("t::slow",)]
+
+
+def test_plan_shards_balances_and_keeps_groups_together():
+    groups = [["t::slow"], ["t::mid"], ["t::fast"], ["t::row[0]", "t::row[1]"]]
+    plan = plan_shards(groups, DURATIONS, 2)
+    assert [shard["index"] for shard in plan] == [1, 2]
+    assert plan[0] == {"index": 1, "expected_seconds": 10.0, "tests": ["t::slow"]}
+    assert plan[1]["tests"] == ["t::mid", "t::row[0]", "t::row[1]", "t::fast"]
+    assert plan[1]["expected_seconds"] == 9.0
+
+
+def test_plan_shards_covers_every_test_once_and_allows_empty_shards():
+    groups = [[test] for test in DURATIONS]
+    plan = plan_shards(groups, DURATIONS, 7)
+    assert sorted(test for shard in plan for test in shard["tests"]) == sorted(DURATIONS)
+    assert sum(1 for shard in plan if not shard["tests"]) == 2
+
+
+def test_plan_shards_is_deterministic():
+    groups = [[test] for test in DURATIONS]
+    assert plan_shards(groups, DURATIONS, 3) == plan_shards(groups, dict(DURATIONS), 3)
+
+
+@pytest.mark.parametrize("value, expected", [("1/1", (1, 1)), ("2/4", (2, 4)), ("4/4", (4, 4))])
+def test_parse_shard(value, expected):
+    assert parse_shard(value) == expected
+
+
+@pytest.mark.parametrize("value", ["", None, "0/4", "5/4", "2", "2/", "a/b", "-1/4", "2/4/1"])
+def test_parse_shard_rejects_invalid_values(value):
+    with pytest.raises(ValueError):
+        parse_shard(value)
+
+
+def test_history_expected_durations_are_recent_medians(tmp_path):
+    history = DurationHistory(tmp_path / "durations.sqlite")
+    assert history.expected_durations() == {}
+    for started, call in enumerate([1.0, 9.0, 2.0]):
+        history.record_run({"t::a[chrome]": {"setup": 0.5, "call": call, "teardown": 0.5},
+                            "t::b[edge]": {"call": 6.0, "outcome": "skipped"}}, started=started)
+    assert history.expected_durations() == {"t::a[chrome]": 3.0}
+    assert history.expected_durations(recent=1) == {"t::a[chrome]": 3.0}
+    assert history.slowest()[0][:3] == ("t::b[edge]", "edge", 3)
@@ -0,0 +1,146 @@
+# tests/unit/test_excel_provider.py
+"""Checks the compiled sidecars, the process-wide sheet cache and indexed queries on workbooks written to tmp_path."""
+import os
+
+import pytest
+from openpyxl import Workbook
+
+import utils.excel_provider as excel_provider
+from utils.excel_provider import (ExcelDataProvider, Range, clear_sheet_cache, get_indexed_sheet,
+                                  load_compiled_workbook)
+
+HEADERS = ["TC_ID", "CATEGORY", "PRICE", "EXECUTION_FLAG"]
+ROWS = [
+    ("TC_01", "Dog", 499, "Yes"),
+    ("TC_02", "Cat", 299, "No"),
+    (None, None, None, None),
+    ("TC_03", "Dog", "1,299", "Yes"),
+    ("TC_04", "Bird", 99.5, "yes "),
+    ("TC_05", "Cat", "150", "Yes"),
+]
+
+
+def write_workbook(path, rows=ROWS):
+    book = Workbook()
+    sheet = book.active
+    sheet.title = "Products"
+    sheet.append(HEADERS)
+    for row in rows:
+        sheet.append(row)
+    book.save(path)
+    return path
+
+
+@pytest.fixture
+def compiles(tmp_path, monkeypatch):
+    """Points the sidecar cache at tmp_path and records every real workbook parse."""
+    monkeypatch.setattr(excel_provider, "SIDECAR_DIR", tmp_path / "cache")
+    calls = []
+    compile_workbook = excel_provider._compile_workbook
+    monkeypatch.setattr(excel_provider, "_compile_workbook", lambda path: calls.append(path) or compile_workbook(path))
+    clear_sheet_cache()
+    yield calls
+    clear_sheet_cache()
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    (tmp_path / "data").mkdir()
+    return write_workbook(tmp_path / "data" / "Products.xlsx")
+
+
+def test_sidecar_is_written_once_and_reused(workbook, compiles, tmp_path):
+    first = load_compiled_workbook(workbook)
+    assert first["Products"] == (HEADERS, [row for row in ROWS if any(row)])
+    assert len(list((tmp_path / "cache").glob("Products.*.pickle"))) == 1
+    assert load_compiled_workbook(workbook) == first
+    assert len(compiles) == 1
+
+
+def test_edited_workbook_misses_the_sidecar_and_replaces_it(workbook, compiles, tmp_path):
+    load_compiled_workbook(workbook)
+    old_sidecar, = (tmp_path / "cache").glob("Products.*.pickle")
+    write_workbook(workbook, ROWS[:2])
+    assert load_compiled_workbook(workbook)["Products"][1] == ROWS[:2]
+    assert len(compiles) == 2
+    new_sidecar, = (tmp_path / "cache").glob("Products.*.pickle")
+    assert new_sidecar != old_sidecar
+
+
+def test_corrupt_sidecar_is_ignored(workbook, compiles, tmp_path):
+    load_compiled_workbook(workbook)
+    sidecar, = (tmp_path / "cache").glob("Products.*.pickle")
+    sidecar.write_bytes(b"not a pickle")
+    assert load_compiled_workbook(workbook)["Products"][0] == HEADERS
+    assert len(compiles) == 2
+
+
+def test_sheet_cache_hits_until_the_mtime_changes(workbook, compiles):
+    sheet = get_indexed_sheet(workbook, "Products")
+    assert get_indexed_sheet(workbook, "Products") is sheet
+    stat = workbook.stat()
+    os.utime(workbook, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    reread = get_indexed_sheet(workbook, "Products")
+    assert reread is not sheet
+    assert reread.rows == sheet.rows
+    # Same content, so the new mtime is served from the sidecar without parsing again.
+    assert len(compiles) == 1
+
+
+def test_provider_reads_rows_as_dicts(workbook, compiles):
+    provider = ExcelDataProvider("Products.xlsx", data_folder=workbook.parent)
+    rows = provider.get_all_data("Products")
+    assert len(rows) == 5
+    assert rows[0] == {"TC_ID": "TC_01", "CATEGORY": "Dog", "PRICE": 499, "EXECUTION_FLAG": "Yes"}
+    with pytest.raises(ValueError, match="Sheet 'Missing' not found"):
+        provider.get_all_data("Missing")
+
+
+@pytest.fixture
+def provider(workbook, compiles):
+    return ExcelDataProvider("Products.xlsx", data_folder=workbook.parent)
+
+
+def ids(rows):
+    return [row["TC_ID"] for row in rows]
+
+
+@pytest.mark.parametrize("column, value", [("CATEGORY", "Dog"), ("CATEGORY", "Fish"), ("PRICE", 499),
+                                           ("PRICE", "150"), ("EXECUTION_FLAG", "yes")])
+def test_query_equality_matches_get_data_by_key_value(provider, column, value):
+    assert provider.query("Products", {column: value}) == provider.get_data_by_key_value("Products", column, value)
+
+
+def test_query_combines_conditions_in_sheet_order(provider):
+    assert ids(provider.query("Products", {"CATEGORY": ["Cat", "Dog"], "EXECUTION_FLAG": "Yes"})) == \
+        ["TC_01", "TC_03", "TC_05"]
+    assert ids(provider.get_data_with_filters("Products", {"CATEGORY": "Cat", "EXECUTION_FLAG": "Yes"})) == ["TC_05"]
+    assert ids(provider.query("Products", {})) == ["TC_01", "TC_02", "TC_03", "TC_04", "TC_05"]
+
+
+@pytest.mark.parametrize("condition, expected", [
+    (Range(150, 499), ["TC_01", "TC_02", "TC_05"]),  # inclusive bounds; "150" is numeric
+    (Range(low=300), ["TC_01"]),                      # "1,299" is not a number
+    (Range(high=150), ["TC_04", "TC_05"]),
+    (Range(), ["TC_01", "TC_02", "TC_04", "TC_05"]),
+    (Range(500, 400), []),
+])
+def test_query_range(provider, condition, expected):
+    assert ids(provider.query("Products", {"PRICE": condition})) == expected
+
+
+def test_indexes_are_built_lazily_per_column_and_reused(provider, workbook):
+    sheet = get_indexed_sheet(workbook, "Products")
+    assert sheet._value_indexes == {} and sheet._numeric_indexes == {}
+    provider.query("Products", {"CATEGORY": "Dog"})
+    assert list(sheet._value_indexes) == ["CATEGORY"] and sheet._numeric_indexes == {}
+    index = sheet._value_indexes["CATEGORY"]
+    provider.get_data_by_key_value("Products", "CATEGORY", "Cat")
+    provider.query("Products", {"PRICE": Range(100, 200)})
+    assert sheet._value_indexes["CATEGORY"] is index
+    assert list(sheet._numeric_indexes) == ["PRICE"]
+
+
+def test_streamed_rows_match_the_indexed_query(provider):
+    conditions = {"CATEGORY": ["Dog", "Bird"], "PRICE": Range(high=500)}
+    assert [dict(row) for row in provider.iter_rows("Products", conditions)] == provider.query("Products", conditions)
@@ -0,0 +1,77 @@
+# tests/unit/test_network_replay.py
+"""Records a local HTTP server through NetworkStandIn, then replays it with the server gone."""
+import json
+import threading
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from utils.network_replay import NetworkStandIn
+
+
+class CartHandler(BaseHTTPRequestHandler):
+    """Answers /cart.js with a counter that goes up on every request, like a cart that fills up."""
+
+    calls = 0
+
+    def do_GET(self):
+        type(self).calls += 1
+        body = json.dumps({"item_count": type(self).calls}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def upstream():
+    CartHandler.calls = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), CartHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/"
+    server.shutdown()
+    server.server_close()
+
+
+def get_count(stand_in, path="cart.js"):
+    with urllib.request.urlopen(stand_in.base_url + path, timeout=10) as response:
+        return json.loads(response.read())["item_count"]
+
+
+def test_replay_serves_each_test_what_it_recorded(upstream, tmp_path):
+    recorder = NetworkStandIn(upstream, "record", tmp_path).start()
+    recorder.set_current_test("test_a")
+    recorded_a = [get_count(recorder), get_count(recorder)]
+    recorder.set_current_test("test_b")
+    recorded_b = [get_count(recorder)]
+    recorder.stop()
+    assert (recorded_a, recorded_b) == ([1, 2], [3])
+
+    # Replay in a different order, with the upstream no longer reachable.
+    replayer = NetworkStandIn(upstream, "replay", tmp_path).start()
+    try:
+        replayer.set_current_test("test_b")
+        assert get_count(replayer) == 3
+        replayer.set_current_test("test_a")
+        assert [get_count(replayer), get_count(replayer), get_count(replayer)] == [1, 2, 2]
+        # A test that recorded nothing falls back to the exchanges of any test.
+        replayer.set_current_test("test_new")
+        assert get_count(replayer) == 1
+        with pytest.raises(urllib.error.HTTPError) as error:
+            get_count(replayer, "missing.js")
+        assert error.value.code == 404
+        assert replayer.misses == 1
+    finally:
+        replayer.stop()
+
+
+def test_replay_without_archive_fails(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        NetworkStandIn("http://127.0.0.1:9/", "replay", tmp_path).start()
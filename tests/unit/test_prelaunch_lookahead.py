@@ -0,0 +1,65 @@
+# tests/unit/test_prelaunch_lookahead.py
+"""
+Runs the project conftest through pytester and checks which tests are told that
+another test (outside their batch) follows on the same browser.
+"""
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+
+LOOKAHEAD_TEST = """
+import pytest
+
+LOG = {log!r}
+
+@pytest.fixture(autouse=True)
+def record(request):
+    with open(LOG, "a") as log:
+        log.write(f"{{request.node.name}} {{getattr(request.node, 'has_later_test_on_browser', None)}}\\n")
+
+def test_first(browser):
+    pass
+
+@pytest.mark.batch_rows
+@pytest.mark.parametrize("row", range(2))
+def test_rows(browser, row):
+    pass
+
+def test_chrome_only(browser):
+    if browser != "chrome":
+        pytest.skip("chrome only")
+"""
+
+
+def run_lookahead(pytester, monkeypatch, *args, passed=7):
+    monkeypatch.setenv("PYTHONPATH", str(PROJECT_ROOT))
+    monkeypatch.setenv("TEST_HISTORY_DB", str(pytester.path / "history.sqlite"))
+    pytester.makeini("[pytest]\nmarkers =\n    batch_rows: rows share one browser session\n")
+    pytester.makeconftest((PROJECT_ROOT / "conftest.py").read_text())
+    log = pytester.path / "lookahead.log"
+    pytester.makepyfile(test_lookahead=LOOKAHEAD_TEST.format(log=str(log)))
+    result = pytester.runpytest_subprocess("-p", "no:cacheprovider", *args)
+    result.assert_outcomes(passed=passed, skipped=1)
+    return dict(line.split() for line in log.read_text().splitlines())
+
+
+def test_only_the_last_test_per_browser_has_nothing_after_it(pytester, monkeypatch):
+    later = run_lookahead(pytester, monkeypatch)
+    assert later == {
+        "test_first[chrome]": "True", "test_first[edge]": "True",
+        "test_rows[chrome-0]": "True", "test_rows[chrome-1]": "True",
+        "test_rows[edge-0]": "True", "test_rows[edge-1]": "True",
+        "test_chrome_only[chrome]": "False", "test_chrome_only[edge]": "False",
+    }
+
+
+def test_a_trailing_batch_does_not_look_ahead_at_itself(pytester, monkeypatch):
+    # Only the batch is left on chrome.
+    later = run_lookahead(pytester, monkeypatch, "-k", "test_rows or edge", passed=5)
+    assert later["test_rows[chrome-0]"] == later["test_rows[chrome-1]"] == "False"
+    assert later["test_rows[edge-0]"] == "True"
+
+
+def test_xdist_workers_never_prelaunch(pytester, monkeypatch):
+    later = run_lookahead(pytester, monkeypatch, "-n", "2")
+    assert set(later.values()) == {"None"}
@@ -0,0 +1,46 @@
+# tests/unit/test_product_catalog.py
+"""Checks that add_to_cart retries only a click that did not happen, with the page's waits stubbed out."""
+import pytest
+from selenium.common import ElementClickInterceptedException
+
+from pages.product_catalog import ProductCatalog
+
+
+class FakeDriver:
+    """Records the JS clicks add_to_cart falls back to."""
+
+    capabilities = {"browserName": "chrome"}
+
+    def __init__(self):
+        self.js_clicks = 0
+
+    def execute_script(self, script, *args):
+        if script == "arguments[0].click();":
+            self.js_clicks += 1
+        return 0
+
+
+@pytest.fixture
+def catalog(monkeypatch):
+    page = ProductCatalog(FakeDriver())
+    page.calls = []
+    monkeypatch.setattr(page, "wait_for_element", lambda locator: "button")
+    monkeypatch.setattr(page, "wait_for_network_idle", lambda: page.calls.append("idle") or False)
+    return page
+
+
+def test_a_network_idle_timeout_does_not_add_the_product_again(catalog, monkeypatch):
+    monkeypatch.setattr(catalog, "click", lambda locator: catalog.calls.append("click"))
+    catalog.add_to_cart()
+    assert catalog.calls == ["click", "idle"]
+    assert catalog.driver.js_clicks == 0
+
+
+def test_an_intercepted_click_is_retried_once_with_js(catalog, monkeypatch):
+    def intercepted(locator):
+        raise ElementClickInterceptedException("overlay")
+
+    monkeypatch.setattr(catalog, "click", intercepted)
+    catalog.add_to_cart()
+    assert catalog.calls == ["idle"]
+    assert catalog.driver.js_clicks == 1
@@ -0,0 +1,65 @@
+# tests/unit/test_shard_selection.py
+"""
+Runs the project conftest through pytester and checks that --shard splits the
+tests left after -m/-k deselection, not the whole collection.
+"""
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+
+SHARD_TEST = """
+import pytest
+
+LOG = {log!r}
+
+@pytest.fixture(autouse=True)
+def record(request):
+    with open(LOG, "a") as log:
+        log.write(f"{{request.node.name}}\\n")
+
+@pytest.mark.integration
+def test_checkout():
+    pass
+
+def test_login():
+    pass
+
+@pytest.mark.integration
+def test_search():
+    pass
+
+def test_logout():
+    pass
+
+def test_profile():
+    pass
+"""
+
+
+def run_shard(pytester, monkeypatch, *args):
+    monkeypatch.setenv("PYTHONPATH", str(PROJECT_ROOT))
+    monkeypatch.setenv("TEST_HISTORY_DB", str(pytester.path / "history.sqlite"))
+    pytester.makeini("[pytest]\nmarkers =\n    integration: integration tests\n    batch_rows: rows share one browser session\n")
+    pytester.makeconftest((PROJECT_ROOT / "conftest.py").read_text())
+    log = pytester.path / "shard.log"
+    log.unlink(missing_ok=True)
+    pytester.makepyfile(test_shard=SHARD_TEST.format(log=str(log)))
+    result = pytester.runpytest_subprocess("-p", "no:cacheprovider", *args)
+    return result, log.read_text().split() if log.exists() else []
+
+
+def test_shards_split_the_tests_selected_by_a_mark(pytester, monkeypatch):
+    first, first_ran = run_shard(pytester, monkeypatch, "-m", "integration", "--shard", "1/2")
+    second, second_ran = run_shard(pytester, monkeypatch, "-m", "integration", "--shard", "2/2")
+    first.assert_outcomes(passed=1)
+    second.assert_outcomes(passed=1)
+    assert sorted(first_ran + second_ran) == ["test_checkout", "test_search"]
+
+
+def test_shards_split_the_tests_selected_by_a_keyword(pytester, monkeypatch):
+    ran = []
+    for shard in ("1/3", "2/3", "3/3"):
+        result, shard_ran = run_shard(pytester, monkeypatch, "-k", "log", "--shard", shard)
+        result.assert_outcomes(passed=len(shard_ran))
+        ran += shard_ran
+    assert sorted(ran) == ["test_login", "test_logout"]
@@ -0,0 +1,85 @@
+# tests/unit/test_shared_test_data.py
+"""Builds a shared test data store from a workbook in tmp_path and reads it back the way a worker does."""
+import os
+
+import pytest
+from openpyxl import Workbook
+
+import utils.excel_provider as excel_provider
+import utils.shared_test_data as shared_test_data
+from utils.excel_provider import IndexedSheet, SheetRow
+from utils.shared_test_data import SharedTestDataStore, StoreFile, build_store, publish_store, unpublish_store
+
+ROWS = [("TC_01", "Dog food", 499), ("TC_02", "Cat litter", 299), ("TC_03", "Bird seed", 99)]
+
+
+@pytest.fixture
+def workbook(tmp_path, monkeypatch):
+    monkeypatch.setattr(excel_provider, "SIDECAR_DIR", tmp_path / "cache")
+    path = tmp_path / "Products.xlsx"
+    book = Workbook()
+    sheet = book.active
+    sheet.title = "Products"
+    sheet.append(["TC_ID", "NAME", "PRICE"])
+    for row in ROWS:
+        sheet.append(row)
+    book.save(path)
+    return path
+
+
+def test_worker_reads_rows_from_the_store(workbook, tmp_path):
+    store = StoreFile(build_store([workbook], tmp_path / "store.bin"))
+    sheet = store.get_sheet(workbook, "Products")
+    assert len(sheet) == 3
+    assert sheet[1] == {"TC_ID": "TC_02", "NAME": "Cat litter", "PRICE": 299}
+    assert sheet[-1]["NAME"] == "Bird seed"
+    assert [row["TC_ID"] for row in sheet[:2]] == ["TC_01", "TC_02"]
+    with pytest.raises(IndexError):
+        sheet[3]
+
+
+def test_rows_are_not_kept_and_share_their_headers(workbook, tmp_path):
+    sheet = StoreFile(build_store([workbook], tmp_path / "store.bin")).get_sheet(workbook, "Products")
+    first, again = sheet[0], sheet[0]
+    assert isinstance(first, SheetRow) and first is not again and first == again
+    assert first._columns is sheet[2]._columns
+
+
+def test_queries_use_the_prebuilt_indexes(workbook, tmp_path, monkeypatch):
+    sheet = IndexedSheet(StoreFile(build_store([workbook], tmp_path / "store.bin")).get_sheet(workbook, "Products"))
+    monkeypatch.setattr(excel_provider, "build_value_index", lambda rows, column: pytest.fail("scanned the rows"))
+    monkeypatch.setattr(excel_provider, "build_numeric_index", lambda rows, column: pytest.fail("scanned the rows"))
+    assert sheet.positions_equal("NAME", "Cat litter") == [1]
+    assert sheet.positions_between("PRICE", 100, 500) == [0, 1]
+
+
+def test_modified_workbook_is_not_served_from_the_store(workbook, tmp_path):
+    store = StoreFile(build_store([workbook], tmp_path / "store.bin"))
+    stat = workbook.stat()
+    os.utime(workbook, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert store.get_sheet(workbook, "Products") is None
+
+
+def test_unknown_sheet_is_an_error(workbook, tmp_path):
+    store = StoreFile(build_store([workbook], tmp_path / "store.bin"))
+    with pytest.raises(ValueError, match="Sheet 'Missing' not found"):
+        store.get_sheet(workbook, "Missing")
+
+
+def test_workbooks_are_compiled_only_when_first_read(workbook, tmp_path, monkeypatch):
+    monkeypatch.setattr(shared_test_data, "SIDECAR_DIR", tmp_path / "cache")
+    monkeypatch.delenv(shared_test_data.STORE_ENV_VAR, raising=False)
+    directory = publish_store()
+    try:
+        assert list(directory.glob("*.store")) == []
+        store = SharedTestDataStore(directory)
+        assert store.get_sheet(workbook, "Products")[0]["TC_ID"] == "TC_01"
+        compiled, = directory.glob("*.store")
+        # A second worker maps the same file instead of compiling again.
+        monkeypatch.setattr(shared_test_data, "build_store", lambda *args: pytest.fail("compiled again"))
+        other = SharedTestDataStore(directory)
+        assert other.get_sheet(workbook, "Products")[2]["TC_ID"] == "TC_03"
+        assert list(directory.glob("*.store")) == [compiled]
+    finally:
+        unpublish_store(directory)
+    assert not directory.exists()
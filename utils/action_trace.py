@@ -0,0 +1,245 @@
+"""
+Structured action trace.
+Every BasePage primitive records one JSON-lines event (page, locator, action,
+time spent waiting vs acting, outcome, browser) to a per-run trace file, and
+`python -m utils.action_trace` aggregates p50/p95/p99 latencies per locator
+and per page object across any number of runs.
+"""
+
+import argparse
+import json
+import math
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+
+from utils.browser_profile import get_worker_id
+
+PROJECT_ROOT = Path(__file__).parent.parent
+DEFAULT_TRACE_DIR = PROJECT_ROOT / "reports" / "traces"
+
+_writer = None
+_writer_lock = threading.Lock()
+_context = {"test": None}
+
+
+class _TraceWriter:
+    """Appends events to one JSON-lines file; shared by every thread of the process."""
+
+    def __init__(self, path, run_id):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.run_id = run_id
+        self.worker = get_worker_id()
+        self._file = open(self.path, "a", encoding="utf-8", buffering=1024 * 1024)
+        self._lock = threading.Lock()
+
+    def write(self, event):
+        event["run"] = self.run_id
+        event["worker"] = self.worker
+        line = json.dumps(event, separators=(",", ":"), default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class ActionSpan:
+    """Timing of one traced action; call `waited()` once the element wait is over."""
+
+    __slots__ = ("start", "wait_end", "result")
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.wait_end = None
+        self.result = None
+
+    def waited(self):
+        """Marks the end of the wait phase; the remaining time counts as action time."""
+        self.wait_end = time.perf_counter()
+
+
+def start_trace(trace_dir=DEFAULT_TRACE_DIR, run_id=None):
+    """
+    Starts writing trace events for this process.
+
+    Under pytest-xdist every worker writes its own file. Every event carries the
+    run id shared by the whole run (PYTEST_XDIST_TESTRUNUID), so the workers'
+    files count as one run; the start time only goes into the file name.
+
+    Args:
+        trace_dir (str | Path): Directory for trace files.
+        run_id (str): Identifies the run; generated when not given.
+
+    Returns:
+        Path: The trace file.
+    """
+    global _writer
+    run_id = run_id or os.getenv("PYTEST_XDIST_TESTRUNUID") or uuid.uuid4().hex[:12]
+    file_name = f"trace_{time.strftime('%Y%m%d_%H%M%S')}_{run_id[:12]}_{get_worker_id()}.jsonl"
+    with _writer_lock:
+        if _writer is not None:
+            _writer.close()
+        _writer = _TraceWriter(Path(trace_dir) / file_name, run_id)
+        return _writer.path
+
+
+def stop_trace():
+    """Flushes and closes the trace file."""
+    global _writer
+    with _writer_lock:
+        if _writer is not None:
+            _writer.close()
+            _writer = None
+
+
+def set_current_test(name):
+    """Sets the test name recorded with every following event (None between tests)."""
+    _context["test"] = name
+
+
+def format_locator(locator):
+    """Returns a (By, value) locator as 'by=value', the form used in trace events."""
+    if isinstance(locator, tuple) and len(locator) == 2:
+        return f"{locator[0]}={locator[1]}"
+    return str(locator) if locator is not None else None
+
+
+@contextmanager
+def traced_action(page, action, locator=None, browser=None):
+    """
+    Times a page-object action and writes its trace event when it ends.
+
+    Exceptions are recorded as the outcome and re-raised. When tracing is not
+    started this costs two perf_counter calls.
+
+    Args:
+        page: The page object performing the action.
+        action (str): Primitive name, e.g. "click".
+        locator (tuple): (By, value) locator the action targets, if any.
+        browser (str): Browser name recorded with the event.
+
+    Yields:
+        ActionSpan: Call `span.waited()` after the wait; set `span.result` for boolean checks.
+    """
+    span = ActionSpan()
+    outcome = "ok"
+    try:
+        yield span
+    except BaseException as e:
+        outcome = type(e).__name__
+        if span.wait_end is None:
+            span.waited()  # Failed while still waiting (e.g. a timeout): it was all wait time.
+        raise
+    finally:
+        writer = _writer
+        if writer is not None:
+            end = time.perf_counter()
+            wait_end = span.wait_end or span.start
+            event = {
+                "ts": time.time(),
+                "test": _context["test"],
+                "browser": browser,
+                "page": type(page).__name__,
+                "action": action,
+                "locator": format_locator(locator),
+                "wait_ms": round((wait_end - span.start) * 1000, 2),
+                "action_ms": round((end - wait_end) * 1000, 2),
+                "total_ms": round((end - span.start) * 1000, 2),
+                "outcome": outcome,
+            }
+            if span.result is not None:
+                event["result"] = span.result
+            writer.write(event)
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def load_events(paths):
+    """Reads every event from trace files and directories of trace files."""
+    files = []
+    for path in map(Path, paths):
+        files.extend(sorted(path.glob("trace_*.jsonl")) if path.is_dir() else [path])
+    for file in files:
+        with open(file, encoding="utf-8") as handle:
+            for line in handle:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def summarize(events, key_fields):
+    """
+    Aggregates events into latency statistics grouped by the given fields.
+
+    Args:
+        events (iterable): Trace events.
+        key_fields (tuple): Event fields to group by, e.g. ("page", "locator").
+
+    Returns:
+        list[dict]: One row per group, sorted by total time spent, highest first.
+    """
+    groups = defaultdict(lambda: {"total": [], "wait": [], "failures": 0, "runs": set()})
+    for event in events:
+        group = groups[tuple(event.get(field) for field in key_fields)]
+        group["total"].append(event["total_ms"])
+        group["wait"].append(event["wait_ms"])
+        group["runs"].add(event.get("run"))
+        if event.get("outcome") != "ok":
+            group["failures"] += 1
+
+    rows = []
+    for key, group in groups.items():
+        total, wait = sorted(group["total"]), sorted(group["wait"])
+        rows.append({
+            **dict(zip(key_fields, key)),
+            "count": len(total),
+            "runs": len(group["runs"]),
+            "failures": group["failures"],
+            "sum_ms": round(sum(total), 1),
+            "p50_ms": percentile(total, 0.50),
+            "p95_ms": percentile(total, 0.95),
+            "p99_ms": percentile(total, 0.99),
+            "wait_p95_ms": percentile(wait, 0.95),
+        })
+    return sorted(rows, key=lambda row: row["sum_ms"], reverse=True)
+
+
+def main():
+    """Command-line entry point: prints latency percentiles from trace files."""
+    parser = argparse.ArgumentParser(description="Summarise BasePage action traces (p50/p95/p99).")
+    parser.add_argument("paths", nargs="*", default=[str(DEFAULT_TRACE_DIR)],
+                        help="Trace files or directories of trace files (default: reports/traces).")
+    parser.add_argument("--by", choices=("locator", "page", "action"), default="locator",
+                        help="Group by page + locator, page object, or page + action.")
+    parser.add_argument("--top", type=int, default=25, help="Show only the N most expensive groups.")
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON.")
+    args = parser.parse_args()
+
+    key_fields = {"locator": ("page", "locator"), "page": ("page",), "action": ("page", "action")}[args.by]
+    rows = summarize(load_events(args.paths), key_fields)[:args.top]
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+    header = f"{'count':>6} {'fail':>5} {'sum s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'wait p95':>9}  group"
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        group = " | ".join(str(row[field]) for field in key_fields)
+        print(f"{row['count']:>6} {row['failures']:>5} {row['sum_ms'] / 1000:>8.2f} {row['p50_ms']:>8.1f} "
+              f"{row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f} {row['wait_p95_ms']:>9.1f}  {group}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""
+Content-addressed artifact store.
+Failure screenshots and page sources are stored once per distinct content under
+reports/artifacts/objects/<sha[:2]>/<sha256>.<ext>[.zst|.gz], however many tests,
+browsers or retries produce them. Images (already compressed) are stored as-is;
+page sources and other text artifacts are compressed (zstd when the `zstandard`
+package is installed, gzip otherwise). A report that links to a compressed
+artifact gets a plain copy under reports/artifacts/view/ written on request.
+A JSON-lines index per worker maps tests to artifacts, and
+`python -m utils.artifact_store` lists or extracts them.
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from utils.browser_profile import get_worker_id
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+PROJECT_ROOT = Path(__file__).parent.parent
+DEFAULT_STORE_DIR = PROJECT_ROOT / "reports" / "artifacts"
+
+# Stored uncompressed: already-compressed formats gain nothing from another pass.
+RAW_EXTENSIONS = frozenset({"png", "jpg", "jpeg", "gif", "webp", "mp4", "webm"})
+CODEC_SUFFIXES = (".zst", ".gz")
+
+
+@dataclass(frozen=True)
+class StoredArtifact:
+    """One object in the store."""
+    sha256: str
+    path: Path
+    size: int
+
+
+def _compress(data, suffix):
+    if suffix == ".zst":
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    if suffix == ".gz":
+        return gzip.compress(data, compresslevel=6, mtime=0)
+    return data
+
+
+def _decompress(data, suffix):
+    if suffix == ".zst":
+        if zstandard is None:
+            raise RuntimeError("Reading .zst artifacts requires the zstandard package.")
+        return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+    if suffix == ".gz":
+        return gzip.decompress(data)
+    return data
+
+
+class ArtifactStore:
+    """
+    Stores artifacts by the SHA-256 of their content and indexes which test produced them.
+
+    `plan()` only hashes, so the caller knows an artifact's final path right away;
+    `write()` does the compression and the (atomic) write and can run on another thread.
+    Identical content maps to the same object, which is written once.
+    """
+
+    def __init__(self, root=DEFAULT_STORE_DIR):
+        self.root = Path(root)
+        self.objects_dir = self.root / "objects"
+        self.view_dir = self.root / "view"
+        self.index_path = self.root / f"index_{get_worker_id()}.jsonl"
+        self.codec = ".zst" if zstandard is not None else ".gz"
+        self._lock = threading.Lock()
+
+    def plan(self, data, extension):
+        """
+        Hashes content and returns the object it is (or will be) stored as.
+
+        Args:
+            data (bytes): Artifact content.
+            extension (str): File extension without the dot, e.g. "png" or "html".
+
+        Returns:
+            StoredArtifact: The object's digest, path and uncompressed size.
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        base = self.objects_dir / digest[:2] / f"{digest}.{extension}"
+        if extension.lower() in RAW_EXTENSIONS:
+            return StoredArtifact(digest, base, len(data))
+        # Reuse an object another process already wrote with a different codec.
+        for suffix in CODEC_SUFFIXES:
+            existing = base.with_name(base.name + suffix)
+            if existing.exists():
+                return StoredArtifact(digest, existing, len(data))
+        return StoredArtifact(digest, base.with_name(base.name + self.codec), len(data))
+
+    def write(self, data, artifact):
+        """
+        Writes a planned artifact unless the object already exists.
+
+        Returns:
+            bool: True when the object was written, False when it was a duplicate.
+        """
+        if artifact.path.exists():
+            return False
+        suffix = artifact.path.suffix if artifact.path.suffix in CODEC_SUFFIXES else ""
+        return self._publish(artifact.path, _compress(data, suffix))
+
+    def view_path(self, artifact):
+        """Returns where a report can open an artifact directly: the object itself, or its plain copy under view/."""
+        if artifact.path.suffix not in CODEC_SUFFIXES:
+            return artifact.path
+        return self.view_dir / artifact.path.stem
+
+    def write_view(self, data, artifact):
+        """
+        Writes the plain copy of a compressed artifact that a report links to, unless it exists.
+
+        Args:
+            data (bytes): The artifact's original (uncompressed) content.
+            artifact (StoredArtifact): The stored object the copy belongs to.
+
+        Returns:
+            Path: The copy's path.
+        """
+        path = self.view_path(artifact)
+        if path != artifact.path and not path.exists():
+            self._publish(path, data)
+        return path
+
+    def _publish(self, path, payload):
+        """Atomically writes a file; returns False if another writer created it first."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        temp_path.write_bytes(payload)
+        try:
+            # Linking fails if another thread or worker stored the same object meanwhile,
+            # so exactly one writer reports it as new.
+            os.link(temp_path, path)
+        except FileExistsError:
+            return False
+        except OSError:
+            # No hard links on this filesystem; fall back to an atomic replace.
+            os.replace(temp_path, path)
+            return True
+        finally:
+            if temp_path.exists():
+                temp_path.unlink()
+        return True
+
+    def put(self, data, extension):
+        """Hashes and writes an artifact in one step; returns the StoredArtifact."""
+        artifact = self.plan(data, extension)
+        self.write(data, artifact)
+        return artifact
+
+    def record(self, test, name, artifact, media_type, written):
+        """Appends a test -> artifact entry to this worker's index."""
+        entry = {
+            "ts": time.time(),
+            "test": test,
+            "name": name,
+            "sha256": artifact.sha256,
+            "path": artifact.path.relative_to(self.root).as_posix(),
+            "media_type": media_type,
+            "size": artifact.size,
+            "stored_size": artifact.path.stat().st_size,
+            "new": written,
+        }
+        with self._lock:
+            self.root.mkdir(parents=True, exist_ok=True)
+            with open(self.index_path, "a", encoding="utf-8") as handle:
+                handle.write(json.dumps(entry, separators=(",", ":")) + "\n")
+
+    def read(self, relative_path):
+        """Returns an object's original (decompressed) content."""
+        path = self.root / relative_path
+        suffix = path.suffix if path.suffix in CODEC_SUFFIXES else ""
+        return _decompress(path.read_bytes(), suffix)
+
+
+def load_index(root=DEFAULT_STORE_DIR):
+    """Reads the index entries written by every worker, oldest first."""
+    entries = []
+    for path in sorted(Path(root).glob("index_*.jsonl")):
+        with open(path, encoding="utf-8") as handle:
+            entries.extend(json.loads(line) for line in handle if line.strip())
+    return sorted(entries, key=lambda entry: entry["ts"])
+
+
+def main():
+    """Command-line entry point: lists the artifacts of each test, or extracts one."""
+    parser = argparse.ArgumentParser(description="Inspect the content-addressed failure artifact store.")
+    parser.add_argument("--root", default=str(DEFAULT_STORE_DIR), help="Store directory (default: reports/artifacts).")
+    parser.add_argument("--test", help="Only list artifacts of tests whose node id contains this text.")
+    parser.add_argument("--extract", metavar="SHA256", help="Write the decompressed artifact to stdout.")
+    args = parser.parse_args()
+
+    store = ArtifactStore(args.root)
+    entries = load_index(args.root)
+    if args.extract:
+        match = next((entry for entry in entries if entry["sha256"].startswith(args.extract)), None)
+        if match is None:
+            parser.error(f"No artifact {args.extract} in {args.root}")
+        sys.stdout.buffer.write(store.read(match["path"]))
+        return
+
+    if args.test:
+        entries = [entry for entry in entries if args.test in entry["test"]]
+    objects = {entry["sha256"]: entry for entry in entries}
+    for entry in entries:
+        print(f"{entry['test']}  {entry['name']:<12} {entry['sha256'][:12]}  {entry['path']}")
+    referenced = sum(entry["size"] for entry in entries)
+    stored = sum(entry["stored_size"] for entry in objects.values())
+    print(f"\n{len(entries)} reference(s), {len(objects)} object(s): "
+          f"{referenced / 1024:.1f} KiB referenced, {stored / 1024:.1f} KiB stored.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,400 @@
+"""
+Browser pool utility.
+Keeps warm WebDriver sessions alive for the whole test session (one pool per
+pytest-xdist worker) and resets their state between tests, so the cost of a
+cold browser launch is paid once instead of once per test.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from selenium.common.exceptions import WebDriverException
+
+from utils.logger import get_logger
+
+
+def run_with_timeout(func, timeout):
+    """
+    Runs a callable on a daemon thread and waits at most `timeout` seconds for it.
+
+    A wedged browser can block a WebDriver HTTP call forever, so anything that
+    talks to a driver of unknown health goes through this helper.
+
+    Args:
+        func: Zero-argument callable to run.
+        timeout (float): Seconds to wait before giving up.
+
+    Returns:
+        tuple: (finished, result, error). `finished` is False if the call timed out.
+    """
+    outcome = {}
+
+    def target():
+        try:
+            outcome["result"] = func()
+        except Exception as e:
+            outcome["error"] = e
+
+    worker = threading.Thread(target=target, daemon=True)
+    worker.start()
+    worker.join(timeout)
+    if worker.is_alive():
+        return False, None, None
+    return True, outcome.get("result"), outcome.get("error")
+
+
+def quit_driver(driver, timeout=30):
+    """
+    Quits a WebDriver and runs any cleanup callbacks registered on it.
+
+    Cleanup callbacks are stored in `driver.cleanup_callbacks` (a list of
+    zero-argument callables) by whoever created the driver, e.g. to remove a
+    temporary browser profile once the browser process is gone.
+
+    Args:
+        driver: WebDriver instance to quit.
+        timeout (float): Seconds to wait for `driver.quit()` before abandoning it.
+    """
+    logger = get_logger()
+    finished, _, error = run_with_timeout(driver.quit, timeout)
+    if not finished:
+        logger.warning(f"driver.quit() did not return within {timeout}s; abandoning the session.")
+    elif error:
+        logger.warning(f"Error while quitting driver: {error}")
+
+    for callback in getattr(driver, "cleanup_callbacks", []):
+        try:
+            callback()
+        except Exception as e:
+            logger.warning(f"Driver cleanup callback failed: {e}")
+
+
+def _origin(url):
+    """Returns the scheme://host[:port] origin of an http(s) URL, or None for anything else."""
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        return None
+    return f"{parts.scheme}://{parts.netloc.rsplit('@', 1)[-1]}"
+
+
+def visited_origins(driver):
+    """
+    Returns the http(s) origins a Chromium driver has touched: every entry in the
+    navigation history of each open tab, plus the hosts it holds cookies for.
+
+    Args:
+        driver: A Chromium WebDriver (one that has `execute_cdp_cmd`).
+
+    Returns:
+        set: Origins such as "https://supertails.com".
+    """
+    origins = set()
+    for handle in driver.window_handles:
+        driver.switch_to.window(handle)
+        history = driver.execute_cdp_cmd("Page.getNavigationHistory", {})
+        origins.update(_origin(entry.get("url", "")) for entry in history.get("entries", []))
+    for cookie in driver.execute_cdp_cmd("Network.getAllCookies", {}).get("cookies", []):
+        host = cookie.get("domain", "").lstrip(".")
+        if host:
+            origins.update({f"https://{host}", f"http://{host}"})
+    origins.discard(None)
+    return origins
+
+
+class BrowserPool:
+    """
+    A pool of warm WebDriver instances keyed by browser name.
+
+    Drivers are handed out with `acquire()` and given back with `release()`.
+    On release the driver's cookies, storage and cache are wiped and its tabs
+    are replaced by a single blank tab, so the next test starts from the same
+    clean state a freshly launched browser would have. A health check runs on
+    every acquire and replaces drivers that crashed or stopped responding.
+
+    With reuse disabled (strict isolation) every test still gets a brand-new
+    browser, but launching and quitting are taken off the critical path: the
+    next test's browser is prelaunched in the background while the current
+    test runs, and released drivers are quit on a background thread.
+
+    Batched tests (the parametrized rows of one test function) share a single
+    driver through `acquire_batched()`, even with reuse disabled; it is reset
+    between rows and released when a test outside the batch starts.
+    """
+
+    HEALTH_CHECK_TIMEOUT = 5
+    RESET_TIMEOUT = 15
+
+    def __init__(self, reuse=True, prelaunch=True):
+        """
+        Initializes an empty pool.
+
+        Args:
+            reuse (bool): If False, every released driver is quit instead of being
+                reset and kept, i.e. the old fresh-browser-per-test behaviour.
+            prelaunch (bool): If True and reuse is off, `prelaunch()` starts the
+                next browser in the background and released drivers are quit
+                in the background.
+        """
+        self.reuse = reuse
+        self.prelaunch_enabled = prelaunch and not reuse
+        self.logger = get_logger()
+        self._idle = {}
+        self._prelaunched = {}
+        self._teardowns = []
+        self._batch = None
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="browser-pool")
+        self.hidden_launch_seconds = 0.0
+        self.hidden_teardown_seconds = 0.0
+
+    def acquire(self, browser, factory):
+        """
+        Returns a healthy driver for the browser, launching one only if needed.
+
+        Args:
+            browser (str): Browser name used as the pool key (e.g. "chrome").
+            factory: Zero-argument callable that launches a new driver.
+
+        Returns:
+            WebDriver: A ready-to-use driver.
+        """
+        browser = browser.lower()
+        driver = self._take_prelaunched(browser)
+        if driver is not None:
+            return driver
+
+        while True:
+            with self._lock:
+                idle_drivers = self._idle.get(browser, [])
+                driver = idle_drivers.pop() if idle_drivers else None
+            if driver is None:
+                break
+            if self.is_healthy(driver):
+                self.logger.info(f"Reusing warm '{browser}' driver from the pool.")
+                return driver
+            self.logger.warning(f"Pooled '{browser}' driver failed its health check; replacing it.")
+            self._discard(driver)
+
+        self.logger.info(f"No warm '{browser}' driver available; launching a new one.")
+        return factory()
+
+    def release(self, browser, driver):
+        """
+        Gives a driver back to the pool after resetting its state.
+
+        Drivers that cannot be reset cleanly are quit rather than pooled, so a
+        broken session never leaks into the next test.
+
+        Args:
+            browser (str): Browser name the driver was acquired for.
+            driver: The WebDriver instance to give back.
+        """
+        if driver is None:
+            return
+        if not self.reuse:
+            if self.prelaunch_enabled:
+                self._teardowns = [future for future in self._teardowns if not future.done()]
+                self._teardowns.append(self._executor.submit(self._timed_teardown, browser, driver))
+            else:
+                quit_driver(driver)
+            return
+
+        finished, _, error = run_with_timeout(lambda: self.reset(driver), self.RESET_TIMEOUT)
+        if not finished or error:
+            reason = error or f"timed out after {self.RESET_TIMEOUT}s"
+            self.logger.warning(f"Could not reset '{browser}' driver ({reason}); discarding it.")
+            self._discard(driver)
+            return
+
+        with self._lock:
+            self._idle.setdefault(browser.lower(), []).append(driver)
+
+    def acquire_batched(self, browser, batch_key, factory):
+        """
+        Returns the driver shared by a batch of tests, starting the batch if needed.
+
+        The first test of a batch acquires a driver as usual; later tests get the
+        same driver back after a state reset. A driver that cannot be reset or
+        fails its health check is replaced and the batch carries on with the new one.
+
+        Args:
+            browser (str): Browser name used as the pool key.
+            batch_key (str): Identifies the batch; tests with the same key share a driver.
+            factory: Zero-argument callable that launches a new driver.
+
+        Returns:
+            tuple: (driver, started) where `started` is True if the batch got a new driver.
+        """
+        browser = browser.lower()
+        if self._batch is not None and self._batch[:2] == (batch_key, browser):
+            driver = self._batch[2]
+            finished, _, error = run_with_timeout(lambda: self.reset(driver), self.RESET_TIMEOUT)
+            if finished and not error and self.is_healthy(driver):
+                self.logger.info(f"Continuing batch '{batch_key}' on the same '{browser}' driver.")
+                return driver, False
+            self.logger.warning(f"Batch driver for '{batch_key}' could not be reset; replacing it.")
+            self._batch = None
+            self._discard(driver)
+        else:
+            self.end_batch()
+
+        driver = self.acquire(browser, factory)
+        self._batch = (batch_key, browser, driver)
+        return driver, True
+
+    def end_batch(self):
+        """Releases the driver held by the current batch, if any."""
+        if self._batch is None:
+            return
+        _, browser, driver = self._batch
+        self._batch = None
+        self.release(browser, driver)
+
+    def prelaunch(self, browser, factory):
+        """
+        Starts launching the next driver for a browser in the background.
+
+        Does nothing when drivers are being reused (the warm driver is the
+        "next" driver) or when a launch for that browser is already pending.
+
+        Args:
+            browser (str): Browser name used as the pool key.
+            factory: Zero-argument callable that launches a new driver.
+        """
+        if not self.prelaunch_enabled:
+            return
+        browser = browser.lower()
+        with self._lock:
+            if browser in self._prelaunched:
+                return
+            self._prelaunched[browser] = self._executor.submit(self._timed_launch, browser, factory)
+        self.logger.debug(f"Prelaunching next '{browser}' driver in the background.")
+
+    def reset(self, driver):
+        """
+        Wipes cookies, storage and cache and leaves the driver on a single blank tab.
+
+        On Chromium storage is cleared over DevTools for every origin the test
+        visited in any tab (from each tab's navigation history) or holds cookies
+        for. Other browsers can only clear the storage of each tab's current origin.
+
+        Args:
+            driver: The WebDriver instance to reset.
+        """
+        if hasattr(driver, "execute_cdp_cmd"):
+            # Chromium-based browsers: clear everything browser-wide over DevTools.
+            for origin in sorted(visited_origins(driver)):
+                driver.execute_cdp_cmd("Storage.clearDataForOrigin",
+                                       {"origin": origin, "storageTypes": "all"})
+            driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            driver.execute_cdp_cmd("Network.clearBrowserCache", {})
+        else:
+            for handle in driver.window_handles:
+                driver.switch_to.window(handle)
+                driver.delete_all_cookies()
+                driver.execute_script(
+                    "try { window.localStorage.clear(); window.sessionStorage.clear(); } catch (e) {}"
+                )
+
+        # sessionStorage lives per tab, so swapping in a brand-new tab drops it for every origin.
+        old_handles = driver.window_handles
+        driver.switch_to.new_window("tab")
+        fresh_handle = driver.current_window_handle
+        for handle in old_handles:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(fresh_handle)
+        driver.get("about:blank")
+
+    def is_healthy(self, driver):
+        """
+        Checks that a driver's browser is alive and answering commands.
+
+        Args:
+            driver: The WebDriver instance to check.
+
+        Returns:
+            bool: True if the browser answered within HEALTH_CHECK_TIMEOUT seconds.
+        """
+        finished, result, error = run_with_timeout(
+            lambda: driver.execute_script("return document.readyState;"),
+            self.HEALTH_CHECK_TIMEOUT
+        )
+        if not finished:
+            self.logger.warning(f"Driver did not respond within {self.HEALTH_CHECK_TIMEOUT}s.")
+            return False
+        if isinstance(error, WebDriverException):
+            self.logger.warning(f"Driver health check failed: {error.msg}")
+            return False
+        return error is None and result is not None
+
+    def shutdown(self):
+        """
+        Quits every pooled and prelaunched driver and waits for background
+        teardowns. Called once at the end of the session.
+        """
+        self.end_batch()
+        with self._lock:
+            drivers = [driver for idle in self._idle.values() for driver in idle]
+            self._idle.clear()
+            pending_launches = list(self._prelaunched.values())
+            self._prelaunched.clear()
+        for future in pending_launches:
+            if future.exception() is None:
+                drivers.append(future.result()[0])
+        for future in self._teardowns:
+            future.exception()
+        self._executor.shutdown(wait=True)
+        for driver in drivers:
+            quit_driver(driver)
+        if drivers:
+            self.logger.info(f"Browser pool shut down; quit {len(drivers)} driver(s).")
+        if self.prelaunch_enabled:
+            self.logger.info(
+                f"Browser overlap summary: {self.hidden_launch_seconds:.1f}s of launch time and "
+                f"{self.hidden_teardown_seconds:.1f}s of teardown time hidden behind running tests."
+            )
+
+    def _take_prelaunched(self, browser):
+        """Returns the prelaunched driver for a browser, waiting for it if it is still starting."""
+        with self._lock:
+            future = self._prelaunched.pop(browser, None)
+        if future is None:
+            return None
+
+        wait_start = time.perf_counter()
+        error = future.exception()
+        waited = time.perf_counter() - wait_start
+        if error is not None:
+            self.logger.warning(f"Prelaunched '{browser}' driver failed to start ({error}); launching inline.")
+            return None
+
+        driver, launch_seconds = future.result()
+        hidden = max(launch_seconds - waited, 0.0)
+        self.hidden_launch_seconds += hidden
+        self.logger.info(
+            f"Using prelaunched '{browser}' driver: launch took {launch_seconds:.2f}s, "
+            f"waited {waited:.2f}s ({hidden:.2f}s hidden)."
+        )
+        return driver
+
+    def _timed_launch(self, browser, factory):
+        """Launches a driver and returns it together with the launch duration."""
+        start = time.perf_counter()
+        driver = factory()
+        return driver, time.perf_counter() - start
+
+    def _timed_teardown(self, browser, driver):
+        """Quits a driver on a background thread and records how long it took."""
+        start = time.perf_counter()
+        quit_driver(driver)
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.hidden_teardown_seconds += elapsed
+        self.logger.info(f"Background teardown of '{browser}' driver took {elapsed:.2f}s (off the critical path).")
+
+    def _discard(self, driver):
+        """Quits a driver that is no longer trusted, ignoring any errors."""
+        quit_driver(driver, timeout=self.HEALTH_CHECK_TIMEOUT)
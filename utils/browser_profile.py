@@ -0,0 +1,406 @@
+"""
+Browser profile utility.
+Gives every launched browser its own private copy of a profile template, in
+which the browser records the remote-debugging port it picked, so several
+browsers (pooled sessions, pytest-xdist workers, parallel Jenkins stages) can
+run side by side on one machine.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from utils.file_lock import FileLock
+from utils.logger import get_logger
+
+PROJECT_ROOT = Path(__file__).parent.parent
+DEFAULT_TEMPLATE = PROJECT_ROOT / "automation_chrome_profile"
+DEFAULT_GOLDEN_PROFILE = PROJECT_ROOT / ".browser_profiles" / "golden"
+# Inside the golden profile directory: the file naming the published version,
+# the build lock, and how many versions are kept for browsers still cloning one.
+GOLDEN_POINTER = "CURRENT"
+GOLDEN_LOCK = ".lock"
+KEPT_GOLDEN_VERSIONS = 2
+
+# Preference paths copied from the source profile into the golden profile.
+# Everything else in the source (history, caches, service workers, leveldb
+# stores, sync and sign-in state) is dropped.
+KEPT_PREFERENCES = (
+    "credentials_enable_service",
+    "profile.password_manager_enabled",
+    "profile.password_manager_leak_detection",
+    "profile.default_content_setting_values",
+    "intl",
+)
+
+# Preferences the framework relies on, applied on top of whatever was kept.
+REQUIRED_PREFERENCES = {
+    "credentials_enable_service": False,
+    "profile": {
+        "password_manager_enabled": False,
+        "password_manager_leak_detection": False,
+        "exit_type": "Normal",
+        "exited_cleanly": True,
+    },
+    "browser": {"has_seen_welcome_page": True, "check_default_browser": False},
+    "distribution": {"import_bookmarks": False, "skip_first_run_ui": True},
+}
+
+# Only use /dev/shm for profiles if it has at least this much free space;
+# Docker's default 64 MB /dev/shm is too small for a browser's working set.
+MIN_RAM_DISK_FREE_BYTES = 512 * 1024 * 1024
+
+# Files Chrome uses to mark a profile as "in use". Copying them along with the
+# template would make the clone look locked by a browser that is not running.
+PROFILE_LOCK_FILES = ("SingletonLock", "SingletonSocket", "SingletonCookie", "DevToolsActivePort", "lockfile")
+
+# Written by Chrome into the user-data directory once DevTools listens; first line is the port.
+DEVTOOLS_PORT_FILE = "DevToolsActivePort"
+
+# Clone parents already swept for stale clones by this process.
+_swept_dirs = set()
+
+
+def _process_alive(pid):
+    """Checks whether a process with this pid is still running (an unknown answer counts as alive)."""
+    if sys.platform == "win32":
+        import ctypes
+        kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return ctypes.get_last_error() == 5  # ERROR_ACCESS_DENIED: exists, owned by someone else
+        exit_code = ctypes.c_ulong()
+        kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code))
+        kernel32.CloseHandle(handle)
+        return exit_code.value == 259  # STILL_ACTIVE
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+def sweep_stale_profiles(base_dir=None):
+    """
+    Removes profile clones whose owning process has exited.
+
+    Clones are named <worker>_<pid>_<random>, so a clone left behind by a run that
+    crashed or was killed (or a driver quit without its cleanup callbacks) is
+    recognised by its dead pid. Clones of running processes are never touched.
+
+    Args:
+        base_dir (Path): Parent directory the clones were created under, as for
+            `BrowserProfile.create`. Defaults to the system temp directory.
+
+    Returns:
+        int: Number of clones removed.
+    """
+    parent = Path(base_dir or tempfile.gettempdir()) / "automation_profiles"
+    removed = 0
+    for workspace in parent.glob("*_*_*"):
+        pid = workspace.name.split("_")[1]
+        if not pid.isdigit() or _process_alive(int(pid)):
+            continue
+        shutil.rmtree(workspace, ignore_errors=True)
+        removed += 1
+    if removed:
+        get_logger().info(f"Removed {removed} stale browser profile clone(s) from {parent}")
+    return removed
+
+
+def get_worker_id():
+    """Returns the pytest-xdist worker id (e.g. 'gw0'), or 'master' outside xdist."""
+    return os.getenv("PYTEST_XDIST_WORKER", "master")
+
+
+def ram_backed_temp_dir():
+    """
+    Returns a RAM-backed directory for browser profiles when the OS offers one.
+
+    On Linux this is /dev/shm (tmpfs) if it is writable and has enough free
+    space; everywhere else it falls back to the regular temp directory.
+
+    Returns:
+        Path: Directory to create profile clones in.
+    """
+    shm = Path("/dev/shm")
+    if shm.is_dir() and os.access(shm, os.W_OK):
+        if shutil.disk_usage(shm).free >= MIN_RAM_DISK_FREE_BYTES:
+            return shm
+    return Path(tempfile.gettempdir())
+
+
+def _merge_preferences(target, updates):
+    """Recursively merges `updates` into the `target` preferences dictionary."""
+    for key, value in updates.items():
+        if isinstance(value, dict) and isinstance(target.get(key), dict):
+            _merge_preferences(target[key], value)
+        else:
+            target[key] = value
+
+
+def _copy_preference(source_prefs, target_prefs, dotted_path):
+    """Copies one dotted preference path from `source_prefs` to `target_prefs` if present."""
+    keys = dotted_path.split(".")
+    value = source_prefs
+    for key in keys:
+        if not isinstance(value, dict) or key not in value:
+            return
+        value = value[key]
+    node = target_prefs
+    for key in keys[:-1]:
+        node = node.setdefault(key, {})
+    node[keys[-1]] = value
+
+
+def _golden_preferences(source):
+    """Returns the preferences of a golden profile built from `source`."""
+    preferences = {}
+    source_prefs_file = Path(source) / "Default" / "Preferences"
+    if source_prefs_file.is_file():
+        with open(source_prefs_file, "r", encoding="utf-8") as file:
+            source_prefs = json.load(file)
+        for dotted_path in KEPT_PREFERENCES:
+            _copy_preference(source_prefs, preferences, dotted_path)
+    _merge_preferences(preferences, REQUIRED_PREFERENCES)
+    return preferences
+
+
+def current_golden_profile(output=DEFAULT_GOLDEN_PROFILE):
+    """
+    Returns the published version of a golden profile.
+
+    Args:
+        output (Path): Location of the golden profile.
+
+    Returns:
+        Path: The version directory CURRENT points at, or None if nothing is published yet.
+    """
+    try:
+        name = (Path(output) / GOLDEN_POINTER).read_text(encoding="utf-8").strip()
+    except FileNotFoundError:
+        return None
+    version = Path(output) / name
+    return version if name and version.is_dir() else None
+
+
+def _is_up_to_date(source, golden):
+    """Checks that a published golden profile exists and is not older than its source."""
+    if golden is None:
+        return False
+    source_prefs_file = Path(source) / "Default" / "Preferences"
+    golden_prefs_file = golden / "Default" / "Preferences"
+    if not golden_prefs_file.is_file():
+        return False
+    return not source_prefs_file.is_file() or \
+        source_prefs_file.stat().st_mtime <= golden_prefs_file.stat().st_mtime
+
+
+def _publish_golden_version(source, output):
+    """Writes a new version directory, points CURRENT at it and prunes old versions. Callers hold the lock."""
+    version = output / f"v{time.time_ns()}"
+    (version / "Default").mkdir(parents=True)
+    with open(version / "Default" / "Preferences", "w", encoding="utf-8") as file:
+        json.dump(_golden_preferences(source), file, indent=2, sort_keys=True)
+    with open(version / "Local State", "w", encoding="utf-8") as file:
+        json.dump({"browser": {"enabled_labs_experiments": []}}, file)
+    (version / "First Run").touch()
+
+    pointer = output / GOLDEN_POINTER
+    temp_pointer = pointer.with_name(f"{GOLDEN_POINTER}.{os.getpid()}.tmp")
+    temp_pointer.write_text(version.name, encoding="utf-8")
+    os.replace(temp_pointer, pointer)
+
+    versions = sorted((path for path in output.glob("v*") if path.name[1:].isdigit()),
+                      key=lambda path: int(path.name[1:]))
+    for old in versions[:-KEPT_GOLDEN_VERSIONS]:
+        shutil.rmtree(old, ignore_errors=True)
+    get_logger().info(f"Built golden browser profile at {version}")
+    return version
+
+
+def build_golden_profile(source=DEFAULT_TEMPLATE, output=DEFAULT_GOLDEN_PROFILE):
+    """
+    Builds a minimal "golden" profile containing only the preferences we rely on.
+
+    The result is a few kilobytes instead of the >100 MB of caches and
+    databases a used profile accumulates, so cloning and launching from it is
+    close to free. Each build is written to a new version directory under
+    `output` and published by atomically replacing the `CURRENT` pointer file,
+    all under a file lock; a version that browsers may still be cloning from is
+    never deleted in place.
+
+    Args:
+        source (Path): Existing profile to take preferences from. Optional;
+            if it is missing only REQUIRED_PREFERENCES are written.
+        output (Path): Directory holding the golden profile versions.
+
+    Returns:
+        Path: The new golden profile version directory.
+    """
+    source, output = Path(source), Path(output)
+    with FileLock(output / GOLDEN_LOCK):
+        return _publish_golden_version(source, output)
+
+
+def ensure_golden_profile(source=DEFAULT_TEMPLATE, output=DEFAULT_GOLDEN_PROFILE):
+    """
+    Returns the golden profile, (re)building it if it is missing or older than its source.
+
+    Args:
+        source (Path): Profile the golden profile is derived from.
+        output (Path): Directory holding the golden profile versions.
+
+    Returns:
+        Path: The published golden profile version directory.
+    """
+    source, output = Path(source), Path(output)
+    golden = current_golden_profile(output)
+    if _is_up_to_date(source, golden):
+        return golden
+    with FileLock(output / GOLDEN_LOCK):
+        # Another worker may have rebuilt it while we waited for the lock.
+        golden = current_golden_profile(output)
+        if _is_up_to_date(source, golden):
+            return golden
+        return _publish_golden_version(source, output)
+
+
+def clone_tree(source, destination):
+    """
+    Copies a directory tree as cheaply as the platform allows.
+
+    Uses copy-on-write clones where the filesystem supports them (reflinks on
+    btrfs/XFS, clonefile on APFS) and falls back to a regular copy elsewhere.
+    Hardlinks are deliberately not used: Chrome rewrites its SQLite and
+    leveldb files in place, which would corrupt the shared template.
+
+    Args:
+        source (Path): Directory to copy.
+        destination (Path): Target directory. Must not exist yet.
+    """
+    if sys.platform.startswith("linux"):
+        command = ["cp", "-a", "--reflink=auto", str(source), str(destination)]
+    elif sys.platform == "darwin":
+        command = ["cp", "-c", "-R", str(source), str(destination)]
+    else:
+        command = None
+
+    if command:
+        try:
+            subprocess.run(command, check=True, capture_output=True)
+            return
+        except (OSError, subprocess.CalledProcessError):
+            shutil.rmtree(destination, ignore_errors=True)
+
+    shutil.copytree(source, destination, symlinks=True)
+
+
+class BrowserProfile:
+    """
+    A private, disposable clone of a browser profile template.
+
+    Each instance owns a unique user-data directory. The browser is launched with
+    --remote-debugging-port=0, so the OS picks a free port at bind time (no window
+    for another process to take it) and the browser writes it to the profile;
+    `debugging_port` reads it back. Call `cleanup()` once the browser has quit.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path (Path): The user-data directory of this clone.
+        """
+        self.path = Path(path)
+        self.logger = get_logger()
+
+    @property
+    def debugging_port(self):
+        """The remote-debugging port the browser is listening on, or None before it has started."""
+        try:
+            first_line = (self.path / DEVTOOLS_PORT_FILE).read_text(encoding="utf-8").splitlines()[0]
+        except (OSError, IndexError):
+            return None
+        return int(first_line) if first_line.strip().isdigit() else None
+
+    @classmethod
+    def create(cls, template, base_dir=None):
+        """
+        Clones a profile template into a new temporary directory.
+
+        Args:
+            template (Path): Profile directory to copy. If it does not exist the
+                browser simply starts with an empty profile in the new directory.
+            base_dir (Path): Parent directory for the clone. Defaults to the
+                system temp directory.
+
+        Returns:
+            BrowserProfile: The new profile clone.
+        """
+        parent = Path(base_dir or tempfile.gettempdir()) / "automation_profiles"
+        if parent not in _swept_dirs:
+            # Once per process: reclaim clones (possibly in RAM) from runs that never cleaned up.
+            _swept_dirs.add(parent)
+            sweep_stale_profiles(base_dir)
+        parent.mkdir(parents=True, exist_ok=True)
+        workspace = Path(tempfile.mkdtemp(prefix=f"{get_worker_id()}_{os.getpid()}_", dir=parent))
+        profile_path = workspace / "profile"
+
+        start = time.perf_counter()
+        template = Path(template)
+        if template.is_dir():
+            clone_tree(template, profile_path)
+            for lock_file in PROFILE_LOCK_FILES:
+                lock_path = profile_path / lock_file
+                if lock_path.exists() or lock_path.is_symlink():
+                    lock_path.unlink()
+        else:
+            profile_path.mkdir()
+
+        profile = cls(profile_path)
+        profile.logger.info(f"Cloned browser profile to {profile_path} in {time.perf_counter() - start:.2f}s")
+        return profile
+
+    def cleanup(self, retries=5):
+        """
+        Deletes the profile clone from disk.
+
+        Windows keeps files locked for a moment after the browser exits, so the
+        removal is retried a few times before giving up.
+
+        Args:
+            retries (int): Number of attempts before logging a warning.
+        """
+        workspace = self.path.parent
+        for _ in range(retries):
+            shutil.rmtree(workspace, ignore_errors=True)
+            if not workspace.exists():
+                self.logger.debug(f"Removed browser profile clone: {workspace}")
+                return
+            time.sleep(0.2)
+        self.logger.warning(f"Could not fully remove browser profile clone: {workspace}")
+
+
+def main():
+    """Command-line entry point: builds the golden profile."""
+    parser = argparse.ArgumentParser(description="Build a slim golden Chrome profile for test runs.")
+    parser.add_argument("--source", default=str(DEFAULT_TEMPLATE),
+                        help="Existing profile to take preferences from.")
+    parser.add_argument("--output", default=str(DEFAULT_GOLDEN_PROFILE),
+                        help="Directory to write the golden profile to.")
+    args = parser.parse_args()
+    output = build_golden_profile(args.source, args.output)
+    size = sum(path.stat().st_size for path in output.rglob("*") if path.is_file())
+    print(f"Golden profile written to {output} ({size} bytes)")
+
+
+if __name__ == "__main__":
+    main()
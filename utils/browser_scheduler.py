@@ -0,0 +1,202 @@
+"""
+Browser-aware pytest-xdist scheduler.
+Every worker is given a home browser and only runs that browser's tests, so each
+worker warms a single browser type instead of launching both. Per-browser caps
+limit how many workers run a browser at once (e.g. `--browser-slots chrome=3,edge=1`),
+and within a browser the longest expected tests are handed out first.
+"""
+
+from xdist.scheduler import LoadScheduling
+
+from utils.duration_history import KNOWN_BROWSERS, browser_of, split_nodeid
+
+DEFAULT_ESTIMATE = 1.0
+
+
+def parse_browser_slots(value):
+    """
+    Parses a --browser-slots value such as "chrome=3,edge=1".
+
+    Returns:
+        dict: Browser name -> maximum number of workers running it at once.
+    """
+    slots = {}
+    for part in filter(None, (piece.strip() for piece in (value or "").split(","))):
+        browser, _, count = part.partition("=")
+        browser = browser.strip().lower()
+        if browser not in KNOWN_BROWSERS or not count.strip().isdigit() or int(count) < 1:
+            raise ValueError(f"Invalid browser slot '{part}'; expected e.g. chrome=2,edge=1")
+        slots[browser] = int(count)
+    return slots
+
+
+class _WorkUnit:
+    """Collection indices that must run on one worker in order (a single test or a batch_rows group)."""
+
+    __slots__ = ("indices", "browser", "estimate")
+
+    def __init__(self, indices, browser, estimate):
+        self.indices = indices
+        self.browser = browser
+        self.estimate = estimate
+
+
+class BrowserScheduling(LoadScheduling):
+    """
+    Distributes tests by browser affinity, per-browser caps and expected duration.
+
+    Work units are queued per browser (tests without a browser parameter share
+    a separate queue) in longest-expected-first order. At the start each worker
+    is homed on the browser with the most expected work per worker, within its
+    cap. A worker takes the longest unit from its browser's queue or the shared
+    queue; when both are empty it moves to the browser with the most remaining
+    work that still has a free slot, or shuts down. Items of one xdist_group
+    (batch_rows) stay on one worker, in order; they are recognised by the
+    "@group" suffix workers add to their node ids, which conftest.py switches
+    on through the workers' workerinput.
+    """
+
+    def __init__(self, config, log=None, slots=None, durations=None):
+        """
+        Args:
+            config: The pytest config.
+            log: xdist's log producer.
+            slots (dict): Browser -> maximum concurrent workers; unlisted browsers are unlimited.
+            durations (Mapping): Test node id -> expected seconds; unknown tests get the
+                median of the known ones.
+        """
+        super().__init__(config, log)
+        self.slots = dict(slots or {})
+        self.durations = durations or {}
+        self.queues = {}
+        self.node2browser = {}
+
+    @property
+    def tests_finished(self):
+        if not self.collection_is_completed or self._queued_units():
+            return False
+        return all(len(pending) < 2 for pending in self.node2pending.values())
+
+    @property
+    def has_pending(self):
+        return bool(self._queued_units()) or any(self.node2pending.values())
+
+    def schedule(self):
+        """Builds the per-browser queues, homes every worker and sends the first units."""
+        assert self.collection_is_completed
+        if self.collection is not None:
+            for node in self.nodes:
+                self.check_schedule(node)
+            return
+        if not self._check_nodes_have_same_collection():
+            self.log("**Different tests collected, aborting run**")
+            return
+
+        self.collection = list(self.node2collection.values())[0]
+        for unit in self._build_units(range(len(self.collection))):
+            self.queues.setdefault(unit.browser, []).append(unit)
+        for queue in self.queues.values():
+            queue.sort(key=lambda unit: unit.estimate, reverse=True)
+
+        for node in self.nodes:
+            self.node2browser[node] = self._pick_home(exclude=node)
+        self.log("browser homes:", {node.gateway.id: browser for node, browser in self.node2browser.items()})
+        for node in self.nodes:
+            self.check_schedule(node)
+
+    def check_schedule(self, node, duration=0):
+        """Keeps two units' worth of tests queued on the node, or shuts it down when none are left for it."""
+        if node.shutting_down:
+            return
+        while len(self.node2pending[node]) < 2:
+            unit = self._next_unit(node)
+            if unit is None:
+                break
+            self.node2pending[node].extend(unit.indices)
+            node.send_runtest_some(unit.indices)
+        if len(self.node2pending[node]) < 2 and self._next_unit(node, peek=True) is None:
+            node.shutdown()
+        self.log("num units waiting:", len(self._queued_units()))
+
+    def mark_test_pending(self, item):
+        index = self.collection.index(item)
+        self._requeue(self._build_units([index]))
+        for node in self.nodes:
+            self.check_schedule(node)
+
+    def remove_node(self, node):
+        """Requeues a crashed node's unfinished tests; returns the test it crashed on."""
+        pending = self.node2pending.pop(node)
+        self.node2browser.pop(node, None)
+        if not pending:
+            return None
+        crashitem = self.collection[pending.pop(0)]
+        self._requeue(self._build_units(pending))
+        for other in self.nodes:
+            self.check_schedule(other)
+        return crashitem
+
+    def _build_units(self, indices):
+        """Groups consecutive indices of one xdist_group into units and estimates each unit."""
+        units, groups = [], {}
+        known = sorted(self.durations.values())
+        default = known[len(known) // 2] if known else DEFAULT_ESTIMATE
+        for index in indices:
+            nodeid = self.collection[index]
+            test_id, group = split_nodeid(nodeid)
+            estimate = self.durations.get(test_id, default)
+            if group is not None and group in groups:
+                unit = groups[group]
+                unit.indices.append(index)
+                unit.estimate += estimate
+                continue
+            unit = _WorkUnit([index], browser_of(nodeid), estimate)
+            units.append(unit)
+            if group is not None:
+                groups[group] = unit
+        return units
+
+    def _requeue(self, units):
+        for unit in units:
+            queue = self.queues.setdefault(unit.browser, [])
+            queue.append(unit)
+            queue.sort(key=lambda queued: queued.estimate, reverse=True)
+
+    def _queued_units(self):
+        return [unit for queue in self.queues.values() for unit in queue]
+
+    def _active(self, browser, exclude=None):
+        """Number of live workers homed on a browser."""
+        return sum(1 for node, home in self.node2browser.items()
+                   if home == browser and node is not exclude and not node.shutting_down)
+
+    def _pick_home(self, exclude=None):
+        """Returns the browser with the most queued work per worker among those with a free slot."""
+        best, best_load = None, -1.0
+        for browser, queue in self.queues.items():
+            if browser is None or not queue:
+                continue
+            active = self._active(browser, exclude)
+            if active >= self.slots.get(browser, len(self.node2pending)):
+                continue
+            load = sum(unit.estimate for unit in queue) / (active + 1)
+            if load > best_load:
+                best, best_load = browser, load
+        return best
+
+    def _next_unit(self, node, peek=False):
+        """Takes the longest unit the node may run next, re-homing it when its browser has no work left."""
+        home = self.node2browser.get(node)
+        candidates = [queue for queue in (self.queues.get(home), self.queues.get(None)) if queue]
+        if not candidates:
+            new_home = self._pick_home(exclude=node)
+            if new_home is not None:
+                if peek:
+                    return self.queues[new_home][0]
+                self.log(f"{node.gateway.id}: moving from {home} to {new_home}")
+                self.node2browser[node] = home = new_home
+                candidates = [self.queues[new_home]]
+        if not candidates:
+            return None
+        queue = max(candidates, key=lambda queue: queue[0].estimate)
+        return queue[0] if peek else queue.pop(0)
@@ -30,4 +30,30 @@ def get_filtered_test_data(workbook_name, sheet_name, filter_column, filter_valu
         return provider.get_data_by_key_value(sheet_name, filter_column, filter_value)
     except FileNotFoundError:
         print(f"Warning: Data file not found. Parametrization will be empty.")
-        return []
\ No newline at end of file
+        return []
+
+def get_queried_test_data(workbook_name, sheet_name, conditions):
+    """
+    Uses the ExcelDataProvider's indexed query API to fetch rows matching every
+    condition, e.g. {"EXECUTION_FLAG": "Yes", "TESTCASE_ID": ["TC_001", "TC_003"]}.
+    See ExcelDataProvider.query for the supported conditions.
+    """
+    try:
+        provider = ExcelDataProvider(workbook_name, data_folder="test_data")
+        return provider.query(sheet_name, conditions)
+    except FileNotFoundError:
+        print(f"Warning: Data file not found. Parametrization will be empty.")
+        return []
+
+
+def stream_test_data(workbook_name, sheet_name, conditions=None):
+    """
+    Streams matching rows straight from the workbook without caching the sheet,
+    for data sheets too large to hold in memory. Yields dict-like SheetRow objects.
+    """
+    try:
+        provider = ExcelDataProvider(workbook_name, data_folder="test_data")
+    except FileNotFoundError:
+        print(f"Warning: Data file not found. Parametrization will be empty.")
+        return iter(())
+    return provider.iter_rows(sheet_name, conditions)
@@ -0,0 +1,252 @@
+"""
+WebDriver factory.
+The single place where browsers are configured and launched. Browser flags,
+timeouts and performance presets all come from config/config.yaml, so BaseTest,
+DriverManager and CI runs share one definition of "a test browser".
+"""
+
+import os
+from pathlib import Path
+
+from selenium import webdriver
+from selenium.common.exceptions import SessionNotCreatedException
+from selenium.webdriver.chrome.options import Options as ChromeOptions
+from selenium.webdriver.chrome.service import Service as ChromeService
+from selenium.webdriver.edge.options import Options as EdgeOptions
+from selenium.webdriver.edge.service import Service as EdgeService
+from selenium.webdriver.firefox.options import Options as FirefoxOptions
+from selenium.webdriver.firefox.service import Service as FirefoxService
+
+from utils.browser_profile import BrowserProfile, ensure_golden_profile, ram_backed_temp_dir
+from utils.driver_registry import driver_registry, get_driver_path
+from utils.logger import get_logger
+from utils.network_tracker import install_network_tracker
+from utils.request_blocker import apply_blocklist, collect_blocking_stats, drain_performance_log, supports_blocking
+
+PROJECT_ROOT = Path(__file__).parent.parent
+DEFAULT_PRESET = "default"
+
+# Preferences that keep Chrome's password manager and leak-detection popups out of the way.
+CHROMIUM_PREFS = {
+    "credentials_enable_service": False,
+    "profile.password_manager_enabled": False,
+    "profile.password_manager_leak_detection": False,
+}
+BACKGROUND_THROTTLING_ARGS = (
+    "--disable-background-timer-throttling",
+    "--disable-renderer-backgrounding",
+    "--disable-backgrounding-occluded-windows",
+)
+
+
+class DriverFactory:
+    """
+    Builds WebDriver instances from the `browser` section of config.yaml.
+
+    A preset (browser.presets.<name>) layers performance settings on top of the
+    per-browser option lists:
+
+        headless                       run in the new headless mode
+        window_size                    "width,height" of the browser window
+        maximize                       maximize the window at the start of each test
+        page_load_strategy             normal, eager or none
+        disable_images                 do not download or render images
+        disable_fonts                  do not download web fonts
+        disable_background_throttling  keep timers and renderers running at full speed
+        block_third_party              apply the environment's blocked_urls (default true)
+        args                           extra command-line switches
+    """
+
+    def __init__(self, env, preset=None):
+        """
+        Args:
+            env (Environment): Environment whose browser configuration is used.
+            preset (str): Preset name. Falls back to the BROWSER_PRESET environment
+                variable, then browser.preset in config.yaml, then "default".
+        """
+        self.logger = get_logger()
+        self.env = env
+        self.browser_config = env.get_browser_config()
+        presets = self.browser_config.get('presets', {})
+        self.preset_name = preset or os.getenv('BROWSER_PRESET') or self.browser_config.get('preset', DEFAULT_PRESET)
+        if self.preset_name not in presets:
+            raise ValueError(f"Unknown browser preset '{self.preset_name}'. Available: {sorted(presets)}")
+        self.preset = presets[self.preset_name]
+
+    @property
+    def blocked_urls(self):
+        """URL patterns blocked on Chrome and Edge: the environment's blocked_urls, unless the preset opts out."""
+        if not self.preset.get('block_third_party', True):
+            return []
+        return self.env.current_env.get('blocked_urls', [])
+
+    @property
+    def headless(self):
+        """Whether browsers are started headless; the preset wins over browser.headless."""
+        return self.preset.get('headless', self.browser_config.get('headless', False))
+
+    def create(self, browser):
+        """
+        Launches a new browser configured from config.yaml and the active preset.
+
+        Args:
+            browser (str): chrome, edge or firefox.
+
+        Returns:
+            WebDriver: The new driver.
+        """
+        browser = browser.lower()
+        self.logger.info(f"Setting up '{browser}' browser (Preset: {self.preset_name}, Headless: {self.headless})")
+        if browser == 'chrome':
+            launch = self._create_chrome
+        elif browser == 'edge':
+            launch = self._create_edge
+        elif browser == 'firefox':
+            launch = self._create_firefox
+        else:
+            self.logger.error(f"Unsupported browser: {browser}")
+            raise ValueError(f"Unsupported browser: {browser}")
+        try:
+            return launch()
+        except SessionNotCreatedException as e:
+            # Usually a cached driver that no longer matches an updated browser:
+            # forget it and resolve a fresh one, once.
+            self.logger.warning(f"Could not start '{browser}' ({e.msg}); re-resolving its driver and retrying.")
+            driver_registry.invalidate(browser)
+            return launch()
+
+    def configure(self, driver):
+        """
+        Applies window and timeout settings. Called at the start of every test,
+        since pooled drivers outlive a single test (and may have been resized by it).
+
+        Args:
+            driver: WebDriver instance to configure.
+        """
+        if self.preset.get('maximize', False) and not self.headless:
+            driver.maximize_window()
+        elif self.preset.get('window_size'):
+            width, height = self.preset['window_size'].split(',')
+            driver.set_window_size(int(width), int(height))
+        driver.implicitly_wait(self.browser_config.get('implicit_wait', 0))
+        driver.set_page_load_timeout(self.browser_config['page_load_timeout'])
+        driver.set_script_timeout(self.browser_config.get('script_timeout', 60))
+        # Pooled drivers get a fresh tab per test, and DevTools scripts are per tab.
+        install_network_tracker(driver)
+        if self.blocked_urls and supports_blocking(driver):
+            try:
+                apply_blocklist(driver, self.blocked_urls)
+                # Drop events left over from the previous test or the pool reset.
+                drain_performance_log(driver)
+            except Exception as e:
+                self.logger.warning(f"Could not apply the request blocklist over DevTools: {e}")
+
+    def collect_blocking_stats(self, driver):
+        """
+        Reports what the blocklist stopped since `configure()` ran.
+
+        Args:
+            driver: WebDriver instance configured by this factory.
+
+        Returns:
+            dict: Blocking statistics, or None when nothing is blocked for this driver.
+        """
+        if not self.blocked_urls or not supports_blocking(driver):
+            return None
+        return collect_blocking_stats(driver, self.blocked_urls)
+
+    def _chromium_options(self, options, browser):
+        """Fills in the options shared by Chrome and Edge."""
+        for arg in self.browser_config.get('options', {}).get(browser, {}).get('args', []):
+            options.add_argument(arg)
+
+        prefs = dict(CHROMIUM_PREFS)
+        if self.headless:
+            options.add_argument('--headless=new')
+        if self.preset.get('window_size'):
+            options.add_argument(f"--window-size={self.preset['window_size']}")
+        if self.preset.get('disable_images'):
+            prefs["profile.managed_default_content_settings.images"] = 2
+            options.add_argument('--blink-settings=imagesEnabled=false')
+        if self.preset.get('disable_fonts'):
+            options.add_argument('--disable-remote-fonts')
+        if self.preset.get('disable_background_throttling'):
+            for arg in BACKGROUND_THROTTLING_ARGS:
+                options.add_argument(arg)
+        for arg in self.preset.get('args', []):
+            options.add_argument(arg)
+        if os.getenv('NETWORK_MODE') == 'replay':
+            # Replays must be offline: only the local stand-in resolves.
+            options.add_argument('--host-resolver-rules=MAP * ~NOTFOUND, EXCLUDE 127.0.0.1')
+
+        options.add_experimental_option("excludeSwitches", ["enable-automation"])
+        options.add_experimental_option("prefs", prefs)
+        if self.blocked_urls:
+            # Performance logging is how blocked requests are counted (goog:/ms:loggingPrefs).
+            vendor = options.KEY.split(':')[0]
+            options.set_capability(f"{vendor}:loggingPrefs", {"performance": "ALL"})
+            # Only Network events are counted; Page and tracing events would just fill the log.
+            options.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
+        options.page_load_strategy = self.preset.get('page_load_strategy', 'normal')
+        return options
+
+    def _create_chrome(self):
+        """Launches Chrome on a private clone of the (golden) profile template."""
+        options = self._chromium_options(ChromeOptions(), 'chrome')
+
+        # Every Chrome gets a private clone of the profile template and lets the OS
+        # pick its debugging port, so pooled browsers and xdist workers never collide.
+        profile_config = self.browser_config.get('profile', {})
+        template = PROJECT_ROOT / profile_config.get('template', 'automation_chrome_profile')
+        if profile_config.get('golden', True):
+            template = ensure_golden_profile(template)
+        base_dir = ram_backed_temp_dir() if profile_config.get('ram_disk', True) else None
+        profile = BrowserProfile.create(template, base_dir=base_dir)
+        options.add_argument(f"--user-data-dir={profile.path}")
+        options.add_argument("--remote-debugging-port=0")
+        self.logger.info(f"Using dedicated Chrome profile: {profile.path}")
+
+        service = ChromeService(executable_path=get_driver_path('chrome'))
+        try:
+            driver = webdriver.Chrome(service=service, options=options)
+        except Exception:
+            profile.cleanup()
+            raise
+        driver.cleanup_callbacks = [profile.cleanup]
+        self.logger.info(
+            f"Chrome WebDriver initialized with dedicated profile and popup suppression "
+            f"(debugging port {profile.debugging_port})."
+        )
+        return driver
+
+    def _create_edge(self):
+        """Launches Edge."""
+        options = self._chromium_options(EdgeOptions(), 'edge')
+        service = EdgeService(executable_path=get_driver_path('edge'))
+        driver = webdriver.Edge(service=service, options=options)
+        self.logger.info("Edge WebDriver initialized successfully.")
+        return driver
+
+    def _create_firefox(self):
+        """Launches Firefox."""
+        options = FirefoxOptions()
+        for arg in self.browser_config.get('options', {}).get('firefox', {}).get('args', []):
+            options.add_argument(arg)
+        if self.headless:
+            options.add_argument('-headless')
+        if self.preset.get('window_size'):
+            width, height = self.preset['window_size'].split(',')
+            options.add_argument(f'--width={width}')
+            options.add_argument(f'--height={height}')
+        if self.preset.get('disable_images'):
+            options.set_preference('permissions.default.image', 2)
+        if self.preset.get('disable_fonts'):
+            options.set_preference('gfx.downloadable_fonts.enabled', False)
+        for arg in self.preset.get('args', []):
+            options.add_argument(arg)
+        options.page_load_strategy = self.preset.get('page_load_strategy', 'normal')
+
+        service = FirefoxService(executable_path=get_driver_path('firefox'))
+        driver = webdriver.Firefox(service=service, options=options)
+        self.logger.info("Firefox WebDriver initialized successfully.")
+        return driver
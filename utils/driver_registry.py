@@ -0,0 +1,214 @@
+"""
+Driver binary registry.
+Resolves chromedriver / msedgedriver / geckodriver once per browser version and
+remembers the result on disk, so launching a browser never has to run Selenium
+Manager or webdriver-manager (and never needs the network) after the first run.
+"""
+
+import json
+import os
+import plistlib
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from selenium.webdriver.common.selenium_manager import SeleniumManager
+
+from utils.file_lock import FileLock
+from utils.logger import get_logger
+
+REGISTRY_DIR = Path(os.getenv("DRIVER_REGISTRY_DIR", Path.home() / ".cache" / "automation_drivers"))
+
+# Browser names as Selenium Manager expects them.
+SELENIUM_MANAGER_NAMES = {"chrome": "chrome", "edge": "MicrosoftEdge", "firefox": "firefox"}
+
+# Where to look for the installed browser version without starting the browser.
+VERSION_COMMANDS = {
+    "chrome": ["google-chrome", "google-chrome-stable", "chromium", "chromium-browser"],
+    "edge": ["microsoft-edge", "microsoft-edge-stable"],
+    "firefox": ["firefox"],
+}
+WINDOWS_VERSION_KEYS = {
+    "chrome": [r"HKCU\Software\Google\Chrome\BLBeacon", r"HKLM\Software\Google\Chrome\BLBeacon"],
+    "edge": [r"HKCU\Software\Microsoft\Edge\BLBeacon", r"HKLM\Software\Microsoft\Edge\BLBeacon"],
+    "firefox": [r"HKLM\Software\Mozilla\Mozilla Firefox"],
+}
+MAC_APP_BUNDLES = {
+    "chrome": "/Applications/Google Chrome.app",
+    "edge": "/Applications/Microsoft Edge.app",
+    "firefox": "/Applications/Firefox.app",
+}
+VERSION_PATTERN = re.compile(r"\d+(\.\d+)+")
+
+
+def detect_browser_version(browser):
+    """
+    Finds the installed browser version without launching the browser.
+
+    Args:
+        browser (str): chrome, edge or firefox.
+
+    Returns:
+        str: The version (e.g. "120.0.6099.109"), or "unknown" if it cannot be determined.
+    """
+    try:
+        if sys.platform == "win32":
+            for key in WINDOWS_VERSION_KEYS.get(browser, []):
+                value_name = "CurrentVersion" if browser == "firefox" else "version"
+                result = subprocess.run(["reg", "query", key, "/v", value_name],
+                                        capture_output=True, text=True, timeout=10)
+                match = VERSION_PATTERN.search(result.stdout)
+                if result.returncode == 0 and match:
+                    return match.group(0)
+        elif sys.platform == "darwin":
+            info_plist = Path(MAC_APP_BUNDLES.get(browser, "")) / "Contents" / "Info.plist"
+            if info_plist.is_file():
+                with open(info_plist, "rb") as file:
+                    return plistlib.load(file)["CFBundleShortVersionString"]
+        else:
+            for command in VERSION_COMMANDS.get(browser, []):
+                try:
+                    result = subprocess.run([command, "--version"], capture_output=True, text=True, timeout=10)
+                except FileNotFoundError:
+                    continue
+                match = VERSION_PATTERN.search(result.stdout)
+                if match:
+                    return match.group(0)
+    except (OSError, subprocess.SubprocessError, KeyError, ValueError):
+        pass
+    return "unknown"
+
+
+class DriverRegistry:
+    """
+    Persistent registry of driver binaries, keyed by browser name and browser version.
+
+    Lookups are answered from an in-process memo first, then from the registry
+    file, and only as a last resort by running Selenium Manager. Writes are done
+    under a file lock and replaced atomically, so any number of xdist workers
+    can share one registry. Drivers for a browser whose version cannot be
+    detected are resolved every run and never written to the registry.
+    """
+
+    def __init__(self, registry_dir=REGISTRY_DIR):
+        """
+        Args:
+            registry_dir (Path): Directory holding registry.json and its lock file.
+        """
+        self.registry_file = Path(registry_dir) / "registry.json"
+        self.lock_file = Path(registry_dir) / "registry.lock"
+        self.logger = get_logger()
+        self._memo = {}
+        self._memo_lock = threading.Lock()
+
+    def get_driver_path(self, browser):
+        """
+        Returns the path of a driver binary matching the installed browser.
+
+        Args:
+            browser (str): chrome, edge or firefox.
+
+        Returns:
+            str: Absolute path to the driver executable.
+        """
+        browser = browser.lower()
+        with self._memo_lock:
+            if browser in self._memo:
+                return self._memo[browser]
+
+            version = detect_browser_version(browser)
+            if version == "unknown":
+                # Without a version there is no key that would notice a browser
+                # upgrade, so the driver is only remembered for this process.
+                entry = self._resolve(browser)
+                self._memo[browser] = entry["driver_path"]
+                return entry["driver_path"]
+
+            key = f"{browser}:{version}"
+            entry = self._read().get(key)
+            if not self._is_valid(entry):
+                with FileLock(self.lock_file):
+                    # Another worker may have resolved it while we waited for the lock.
+                    registry = self._read()
+                    entry = registry.get(key)
+                    if not self._is_valid(entry):
+                        entry = self._resolve(browser)
+                        registry[key] = entry
+                        self._write(registry)
+            else:
+                self.logger.debug(f"Driver for {key} found in registry: {entry['driver_path']}")
+
+            self._memo[browser] = entry["driver_path"]
+            return entry["driver_path"]
+
+    def invalidate(self, browser):
+        """
+        Forgets every cached driver for a browser, e.g. after a version mismatch.
+
+        Args:
+            browser (str): chrome, edge or firefox.
+        """
+        browser = browser.lower()
+        with self._memo_lock:
+            self._memo.pop(browser, None)
+            with FileLock(self.lock_file):
+                registry = self._read()
+                stale_keys = [key for key in registry if key.split(":", 1)[0] == browser]
+                for key in stale_keys:
+                    del registry[key]
+                self._write(registry)
+        self.logger.info(f"Invalidated cached '{browser}' driver(s): {stale_keys}")
+
+    def _resolve(self, browser):
+        """Runs Selenium Manager once to find or download the driver for a browser."""
+        if browser not in SELENIUM_MANAGER_NAMES:
+            raise ValueError(f"Unsupported browser: {browser}")
+        start = time.perf_counter()
+        args = [str(SeleniumManager.get_binary()), "--browser", SELENIUM_MANAGER_NAMES[browser]]
+        output = SeleniumManager.run(args)
+        self.logger.info(
+            f"Resolved '{browser}' driver via Selenium Manager in {time.perf_counter() - start:.2f}s: "
+            f"{output['driver_path']}"
+        )
+        return {
+            "driver_path": output["driver_path"],
+            "browser_path": output.get("browser_path"),
+            "resolved_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+
+    def _read(self):
+        """Reads the registry file, treating a missing or corrupt file as empty."""
+        try:
+            with open(self.registry_file, "r", encoding="utf-8") as file:
+                return json.load(file)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _write(self, registry):
+        """Atomically replaces the registry file. Callers must hold the file lock."""
+        self.registry_file.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.registry_file.parent, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            json.dump(registry, file, indent=2)
+        os.replace(temp_path, self.registry_file)
+
+    @staticmethod
+    def _is_valid(entry):
+        """Checks that a registry entry still points at an executable driver binary."""
+        if not entry:
+            return False
+        path = Path(entry.get("driver_path", ""))
+        return path.is_file() and (sys.platform == "win32" or os.access(path, os.X_OK))
+
+
+# One registry per process, shared by BaseTest and DriverManager.
+driver_registry = DriverRegistry()
+
+
+def get_driver_path(browser):
+    """Shortcut for `driver_registry.get_driver_path(browser)`."""
+    return driver_registry.get_driver_path(browser)
@@ -0,0 +1,262 @@
+"""
+Test duration history.
+Records the setup/call/teardown duration and outcome of every test, per browser,
+in a small local SQLite database after each run. The history orders the suite
+longest-expected first, feeds expected durations to the browser-aware xdist
+scheduler, and splits the suite into balanced shards for a CI matrix:
+
+    pytest --shard 2/4
+
+`--shard` plans from the tests pytest actually collected. The `plan` command
+only knows the tests in the history and cannot see batch_rows groups, so its
+output is an estimate of the shard sizes, not the exact split:
+
+    python -m utils.duration_history plan --shards 4 --json
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import statistics
+import time
+import uuid
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+DEFAULT_DB_PATH = Path(os.getenv("TEST_HISTORY_DB", PROJECT_ROOT / ".test_history" / "durations.sqlite"))
+
+KNOWN_BROWSERS = ("chrome", "edge", "firefox")
+# Expected durations are the median of this many most recent runs of a test.
+RECENT_RUNS = 5
+# Runs older than the most recent KEPT_RUNS are pruned after each run.
+KEPT_RUNS = 50
+
+_PARAMS = re.compile(r"\[(.*)\]$")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    started REAL NOT NULL,
+    finished REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id TEXT NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    test TEXT NOT NULL,
+    browser TEXT,
+    setup REAL NOT NULL DEFAULT 0,
+    call REAL NOT NULL DEFAULT 0,
+    teardown REAL NOT NULL DEFAULT 0,
+    outcome TEXT NOT NULL,
+    PRIMARY KEY (run_id, test)
+);
+CREATE INDEX IF NOT EXISTS results_test ON results (test);
+"""
+
+
+def split_nodeid(nodeid):
+    """
+    Splits an xdist node id into (test node id, group).
+    With --dist loadgroup, xdist appends "@<xdist_group name>" to grouped items; like
+    xdist, an "@" followed by a "]" is part of a parameter id, not a group.
+    """
+    at = nodeid.rfind("@")
+    if at > nodeid.rfind("]"):
+        return nodeid[:at], nodeid[at + 1:]
+    return nodeid, None
+
+
+def browser_of(nodeid):
+    """Returns the browser a test id is parametrized with (e.g. test_x[chrome]), or None."""
+    match = _PARAMS.search(split_nodeid(nodeid)[0])
+    if not match:
+        return None
+    for param in match.group(1).split("-"):
+        if param in KNOWN_BROWSERS:
+            return param
+    return None
+
+
+class DurationHistory:
+    """The history database. Each call opens its own short-lived connection."""
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = Path(path)
+
+    def _connect(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.execute("PRAGMA foreign_keys = ON")
+        connection.executescript(_SCHEMA)
+        return connection
+
+    def record_run(self, results, started, finished=None, run_id=None):
+        """
+        Stores one run's results in a single transaction and prunes old runs.
+
+        Args:
+            results (dict): Test node id -> {"setup", "call", "teardown" (seconds), "outcome"}.
+            started (float): Run start time (epoch seconds).
+            finished (float): Run end time; defaults to now.
+            run_id (str): Identifies the run; generated when not given.
+        """
+        if not results:
+            return
+        run_id = run_id or uuid.uuid4().hex
+        rows = [(run_id, test, browser_of(test), result.get("setup", 0.0), result.get("call", 0.0),
+                 result.get("teardown", 0.0), result.get("outcome", "passed"))
+                for test, result in results.items()]
+        connection = self._connect()
+        try:
+            with connection:
+                connection.execute("INSERT INTO runs VALUES (?, ?, ?)", (run_id, started, finished or time.time()))
+                connection.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+                connection.execute("DELETE FROM runs WHERE run_id NOT IN "
+                                   "(SELECT run_id FROM runs ORDER BY started DESC LIMIT ?)", (KEPT_RUNS,))
+        finally:
+            connection.close()
+
+    def expected_durations(self, recent=RECENT_RUNS):
+        """
+        Returns the expected total (setup + call + teardown) seconds of every known test:
+        the median over its most recent runs. Skipped runs are ignored.
+
+        Returns:
+            dict: Test node id -> expected seconds.
+        """
+        if not self.path.exists():
+            return {}
+        connection = self._connect()
+        try:
+            rows = connection.execute(
+                "SELECT r.test, r.setup + r.call + r.teardown FROM results r JOIN runs USING (run_id) "
+                "WHERE r.outcome != 'skipped' ORDER BY runs.started DESC").fetchall()
+        finally:
+            connection.close()
+        samples = {}
+        for test, total in rows:
+            recent_samples = samples.setdefault(test, [])
+            if len(recent_samples) < recent:
+                recent_samples.append(total)
+        return {test: statistics.median(values) for test, values in samples.items()}
+
+    def slowest(self, limit=25):
+        """Returns (test, browser, runs, mean setup, mean call, mean teardown, failures) rows, slowest first."""
+        if not self.path.exists():
+            return []
+        connection = self._connect()
+        try:
+            return connection.execute(
+                "SELECT test, browser, COUNT(*), AVG(setup), AVG(call), AVG(teardown), "
+                "SUM(outcome IN ('failed', 'error')) FROM results GROUP BY test "
+                "ORDER BY AVG(setup + call + teardown) DESC LIMIT ?", (limit,)).fetchall()
+        finally:
+            connection.close()
+
+
+class DurationRecorder:
+    """
+    pytest plugin that collects per-phase durations from the test reports and
+    writes them to the history when the session ends. Registered on the process
+    that sees every report: the only process, or the xdist controller.
+    """
+
+    def __init__(self, history):
+        self.history = history
+        self.started = time.time()
+        self.results = {}
+
+    def pytest_runtest_logreport(self, report):
+        test = split_nodeid(report.nodeid)[0]
+        result = self.results.setdefault(test, {"outcome": "passed"})
+        result[report.when] = report.duration
+        if report.failed:
+            result["outcome"] = "failed" if report.when == "call" else "error"
+        elif report.skipped and result["outcome"] == "passed":
+            result["outcome"] = "skipped"
+
+    def pytest_sessionfinish(self, session):
+        self.history.record_run(self.results, self.started)
+
+
+def order_longest_first(groups, durations, key=None):
+    """
+    Sorts groups of tests longest-expected first (stable for equal estimates).
+    Tests without history get the median of the known estimates.
+
+    Args:
+        groups (list[list]): Tests that must stay together, in order.
+        durations (dict): Test node id -> expected seconds.
+        key (callable): Maps a group member to its test node id; defaults to the member itself.
+
+    Returns:
+        list[tuple[float, list]]: (expected seconds, group) pairs.
+    """
+    key = key or (lambda test: test)
+    default = statistics.median(durations.values()) if durations else 1.0
+    estimated = [(sum(durations.get(key(test), default) for test in group), group) for group in groups]
+    return sorted(estimated, key=lambda pair: pair[0], reverse=True)
+
+
+def plan_shards(groups, durations, shards, key=None):
+    """
+    Splits groups of tests into balanced shards with the longest-processing-time-first
+    rule: each group, longest first, goes to the shard with the least expected time.
+    The plan only depends on its inputs, so every CI job computes the same one.
+
+    Returns:
+        list[dict]: One {"index", "expected_seconds", "tests"} entry per shard, 1-based.
+    """
+    plan = [{"index": index + 1, "expected_seconds": 0.0, "tests": []} for index in range(shards)]
+    for estimate, group in order_longest_first(groups, durations, key):
+        shard = min(plan, key=lambda entry: (entry["expected_seconds"], entry["index"]))
+        shard["expected_seconds"] += estimate
+        shard["tests"].extend(group)
+    for shard in plan:
+        shard["expected_seconds"] = round(shard["expected_seconds"], 2)
+    return plan
+
+
+def parse_shard(value):
+    """Parses a --shard value "I/N" (1-based) into (I, N)."""
+    index, _, total = (value or "").partition("/")
+    if not (index.isdigit() and total.isdigit()) or not 1 <= int(index) <= int(total):
+        raise ValueError(f"Invalid shard '{value}'; expected I/N with 1 <= I <= N, e.g. 2/4")
+    return int(index), int(total)
+
+
+def main():
+    """Command-line entry point: shows the slowest tests or prints an estimated N-way shard plan."""
+    parser = argparse.ArgumentParser(description="Inspect the test duration history and plan CI shards.")
+    parser.add_argument("--db", default=str(DEFAULT_DB_PATH), help="History database (default: .test_history/durations.sqlite).")
+    commands = parser.add_subparsers(dest="command", required=True)
+    show = commands.add_parser("show", help="List the slowest tests.")
+    show.add_argument("--top", type=int, default=25)
+    plan = commands.add_parser("plan", help="Estimate balanced shards from the tests in the history "
+                                             "(pytest --shard plans from the real collection).")
+    plan.add_argument("--shards", type=int, required=True)
+    plan.add_argument("--json", action="store_true", help="Print the plan as JSON for a CI matrix.")
+    args = parser.parse_args()
+
+    history = DurationHistory(args.db)
+    if args.command == "show":
+        print(f"{'runs':>5} {'fail':>5} {'setup s':>8} {'call s':>8} {'teardown':>9}  test")
+        for test, _, runs, setup, call, teardown, failures in history.slowest(args.top):
+            print(f"{runs:>5} {failures:>5} {setup:>8.2f} {call:>8.2f} {teardown:>9.2f}  {test}")
+        return
+
+    # An estimate: only tests with history, each planned on its own (no batch_rows groups).
+    durations = history.expected_durations()
+    shards = plan_shards([[test] for test in sorted(durations)], durations, args.shards)
+    if args.json:
+        print(json.dumps({"estimate": True, "total_seconds": round(sum(durations.values()), 2),
+                          "shards": shards}, indent=2))
+        return
+    print(f"Estimate from {len(durations)} tests in the history; `pytest --shard I/N` plans from the real collection.")
+    for shard in shards:
+        print(f"shard {shard['index']}/{args.shards}: {len(shard['tests'])} tests, ~{shard['expected_seconds']:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
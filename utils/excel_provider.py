@@ -1,13 +1,350 @@
 # utils/excel_provider.py
+import hashlib
 import os
+import pickle
+import threading
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from collections.abc import Mapping
+from dataclasses import dataclass
 from pathlib import Path
 from openpyxl import load_workbook
-from functools import lru_cache
+
+from utils.logger import get_logger
 
 # utils/excel_provider.py (The Engine)
 # Purpose: This is the core, reusable library. It does all the heavy lifting: finding the file, reading the data, caching it for performance, and performing the filtering.
 # Analogy: Think of this as the powerful engine of a car.
 
+# Parsed sheets are cached for the whole process, shared by every provider instance.
+# Keys are (absolute path, mtime, sheet), so an edited workbook is re-read automatically.
+SHEET_CACHE_SIZE = 32
+_sheet_cache = OrderedDict()
+_sheet_cache_lock = threading.Lock()
+
+# Compiled sidecars: every sheet of a workbook as headers + row tuples, pickled and
+# validated by the workbook's content hash. Loading one skips openpyxl entirely,
+# which matters most for xdist workers and fresh pytest processes.
+SIDECAR_DIR = Path(os.getenv("TEST_DATA_CACHE_DIR", Path(__file__).parent.parent / ".test_data_cache"))
+SIDECAR_FORMAT = 1
+
+
+def _compile_workbook(file_path):
+    """
+    Parses every sheet of a workbook into its compact compiled form.
+
+    Returns:
+        dict: {sheet name: (headers list, list of row tuples)}; completely empty rows are dropped.
+    """
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        sheets = {}
+        for worksheet in workbook.worksheets:
+            rows = worksheet.iter_rows(values_only=True)
+            header_row = next(rows, None)
+            if header_row is None:
+                sheets[worksheet.title] = ([], [])
+                continue
+            headers = [str(cell).strip() for cell in header_row]
+            # Skip completely empty rows
+            sheets[worksheet.title] = (headers, [tuple(row) for row in rows if any(cell is not None for cell in row)])
+        return sheets
+    finally:
+        workbook.close()
+
+
+def _hash_file(file_path):
+    """Returns the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def workbook_tag(path):
+    """A file-name-safe tag for a workbook: its stem plus a hash of its path, which tells apart same-named workbooks in different folders."""
+    return f"{path.stem}.{hashlib.sha256(str(path).encode()).hexdigest()[:8]}"
+
+
+def load_compiled_workbook(file_path):
+    """
+    Returns a workbook's compiled sheets, reusing the sidecar in SIDECAR_DIR when
+    one exists for the workbook's current contents and compiling (and saving) one otherwise.
+
+    Sidecars are named <stem>.<path tag>.<content hash>.v<format>.pickle, so an edited
+    workbook never matches an old sidecar. They are only ever read from our own
+    cache directory.
+
+    Args:
+        file_path (str | Path): Path to the workbook.
+
+    Returns:
+        dict: {sheet name: (headers list, list of row tuples)}.
+    """
+    path = Path(file_path).resolve()
+    content_hash = _hash_file(path)
+    prefix = workbook_tag(path)
+    sidecar = SIDECAR_DIR / f"{prefix}.{content_hash[:32]}.v{SIDECAR_FORMAT}.pickle"
+    try:
+        with open(sidecar, "rb") as file:
+            compiled = pickle.load(file)
+        if compiled.get("source_hash") == content_hash:
+            return compiled["sheets"]
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        get_logger().warning(f"Ignoring unreadable test data sidecar {sidecar}: {e}")
+
+    sheets = _compile_workbook(path)
+    try:
+        SIDECAR_DIR.mkdir(parents=True, exist_ok=True)
+        for stale in SIDECAR_DIR.glob(f"{prefix}.*.pickle"):
+            if stale != sidecar:
+                stale.unlink(missing_ok=True)
+        # Write then rename, so parallel workers never read a half-written sidecar.
+        temp_path = sidecar.with_name(f"{sidecar.name}.{os.getpid()}.tmp")
+        with open(temp_path, "wb") as file:
+            pickle.dump({"source_hash": content_hash, "sheets": sheets}, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, sidecar)
+    except OSError as e:
+        get_logger().warning(f"Could not write test data sidecar {sidecar}: {e}")
+    return sheets
+
+
+def _read_sheet(file_path, sheet_name):
+    """
+    Returns one sheet's rows as dictionaries (first row = headers): from the shared
+    memory-mapped store when this process is attached to one, else from the compiled workbook.
+    """
+    from utils.shared_test_data import attached_store  # imported here: that module builds on this one
+    store = attached_store()
+    if store is not None:
+        rows = store.get_sheet(file_path, sheet_name)
+        if rows is not None:
+            return rows
+
+    sheets = load_compiled_workbook(file_path)
+    if sheet_name not in sheets:
+        raise ValueError(f"Sheet '{sheet_name}' not found in workbook '{Path(file_path).name}'")
+    headers, rows = sheets[sheet_name]
+    return [{header: value for header, value in zip(headers, row)} for row in rows]
+
+
+def _normalize(value):
+    """The comparison form of a cell or filter value, as filters have always used it."""
+    return str(value).strip()
+
+
+def _as_number(value):
+    """Returns a cell value as a float, or None if it is not numeric."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(str(value).strip())
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass(frozen=True)
+class Range:
+    """An inclusive numeric range condition for `ExcelDataProvider.query`; either bound may be None."""
+    low: float = None
+    high: float = None
+
+
+class IndexedSheet:
+    """
+    The rows of one sheet plus column indexes built lazily on first use (or, for
+    rows from the shared test data store, loaded from the store's prebuilt ones).
+
+    Equality indexes map the normalized value of a column to the positions of the
+    rows holding it; numeric indexes keep (value, position) pairs sorted so ranges
+    are answered with bisect. Results always come back in sheet order.
+    """
+
+    def __init__(self, rows):
+        self.rows = rows
+        self._value_indexes = {}
+        self._numeric_indexes = {}
+        self._lock = threading.Lock()
+
+    def positions_equal(self, column, normalized_value):
+        """Positions of the rows whose normalized `column` equals `normalized_value`."""
+        return self._value_index(column).get(normalized_value, ())
+
+    def positions_in(self, column, normalized_values):
+        """Positions of the rows whose normalized `column` is one of `normalized_values`."""
+        index = self._value_index(column)
+        return sorted(position for value in set(normalized_values) for position in index.get(value, ()))
+
+    def positions_between(self, column, low=None, high=None):
+        """Positions of the rows whose numeric `column` lies in [low, high]."""
+        values, positions = self._numeric_index(column)
+        start = 0 if low is None else bisect_left(values, low)
+        end = len(values) if high is None else bisect_right(values, high)
+        return sorted(positions[start:end])
+
+    def select(self, position_lists):
+        """Intersects position lists (AND) and returns the matching rows in sheet order."""
+        if not position_lists:
+            return list(self.rows)
+        position_lists = sorted(position_lists, key=len)
+        matches = set(position_lists[0])
+        for positions in position_lists[1:]:
+            if not matches:
+                break
+            matches.intersection_update(positions)
+        return [self.rows[position] for position in sorted(matches)]
+
+    def _value_index(self, column):
+        index = self._value_indexes.get(column)
+        if index is None:
+            index = self._stored_index("stored_value_index", column)
+            if index is None:
+                index = build_value_index(self.rows, column)
+            with self._lock:
+                index = self._value_indexes.setdefault(column, index)
+        return index
+
+    def _numeric_index(self, column):
+        index = self._numeric_indexes.get(column)
+        if index is None:
+            index = self._stored_index("stored_numeric_index", column)
+            if index is None:
+                index = build_numeric_index(self.rows, column)
+            with self._lock:
+                index = self._numeric_indexes.setdefault(column, index)
+        return index
+
+    def _stored_index(self, kind, column):
+        """The index prebuilt by the shared test data store, if the rows come from one."""
+        load = getattr(self.rows, kind, None)
+        return load(column) if load else None
+
+
+def build_value_index(rows, column):
+    """Maps the normalized value of `column` to the positions of the rows holding it."""
+    index = {}
+    for position, row in enumerate(rows):
+        index.setdefault(_normalize(row.get(column)), []).append(position)
+    return index
+
+
+def build_numeric_index(rows, column):
+    """Returns (sorted numeric values of `column`, the positions of their rows)."""
+    pairs = sorted(
+        (number, position) for position, row in enumerate(rows)
+        if (number := _as_number(row.get(column))) is not None
+    )
+    return [number for number, _ in pairs], [position for _, position in pairs]
+
+
+def _condition_matcher(condition):
+    """Returns a predicate on a cell value implementing one `query` condition."""
+    if isinstance(condition, Range):
+        def matches(value):
+            number = _as_number(value)
+            return (number is not None
+                    and (condition.low is None or number >= condition.low)
+                    and (condition.high is None or number <= condition.high))
+        return matches
+    if isinstance(condition, (list, tuple, set, frozenset)):
+        wanted = {_normalize(value) for value in condition}
+        return lambda value: _normalize(value) in wanted
+    wanted = _normalize(condition)
+    return lambda value: _normalize(value) == wanted
+
+
+class SheetRow(Mapping):
+    """
+    A read-only, dict-like row produced by streaming or read from the shared store.
+
+    Holds only the row's value tuple and a reference to the header -> column
+    mapping shared by every row of the sheet, instead of a dict per row.
+    """
+
+    __slots__ = ("_columns", "_values")
+
+    def __init__(self, columns, values):
+        self._columns = columns
+        self._values = values
+
+    def __getitem__(self, header):
+        index = self._columns[header]
+        if index >= len(self._values):
+            raise KeyError(header)
+        return self._values[index]
+
+    def __iter__(self):
+        for header, index in self._columns.items():
+            if index < len(self._values):
+                yield header
+
+    def __len__(self):
+        return min(len(self._columns), len(self._values))
+
+    def __repr__(self):
+        return f"SheetRow({dict(self)!r})"
+
+
+def get_cached_sheet(file_path, sheet_name):
+    """
+    Returns the rows of a sheet, parsing the workbook only on the first request
+    for this (path, mtime, sheet) in the process.
+
+    Args:
+        file_path (str | Path): Path to the workbook.
+        sheet_name (str): The name of the sheet to read.
+
+    Returns:
+        list[dict]: A list of dictionaries representing the rows (from the shared
+            store, a read-only sequence of read-only SheetRow mappings). Shared; do not modify.
+    """
+    return get_indexed_sheet(file_path, sheet_name).rows
+
+
+def get_indexed_sheet(file_path, sheet_name):
+    """
+    Returns the cached IndexedSheet for a sheet, reading it on first use.
+
+    The cache holds at most SHEET_CACHE_SIZE sheets and evicts the least recently used.
+
+    Args:
+        file_path (str | Path): Path to the workbook.
+        sheet_name (str): The name of the sheet to read.
+
+    Returns:
+        IndexedSheet: The sheet's rows and indexes. Shared; do not modify.
+    """
+    path = Path(file_path).resolve()
+    key = (str(path), path.stat().st_mtime_ns, sheet_name)
+    with _sheet_cache_lock:
+        if key in _sheet_cache:
+            _sheet_cache.move_to_end(key)
+            return _sheet_cache[key]
+
+    data = IndexedSheet(_read_sheet(path, sheet_name))
+
+    with _sheet_cache_lock:
+        # Drop versions of this sheet read before the workbook last changed.
+        for stale in [k for k in _sheet_cache if k[0] == key[0] and k[2] == sheet_name and k != key]:
+            del _sheet_cache[stale]
+        _sheet_cache[key] = data
+        _sheet_cache.move_to_end(key)
+        while len(_sheet_cache) > SHEET_CACHE_SIZE:
+            _sheet_cache.popitem(last=False)
+    return data
+
+
+def clear_sheet_cache():
+    """Empties the process-wide sheet cache."""
+    with _sheet_cache_lock:
+        _sheet_cache.clear()
+
+
 class ExcelDataProvider:
     """
     A reusable utility for reading and filtering data from Excel files.
@@ -29,10 +366,9 @@ class ExcelDataProvider:
         if not self.file_path.exists():
             raise FileNotFoundError(f"Excel workbook not found at the expected path: {self.file_path}")
 
-    @lru_cache(maxsize=None)  # This is a simple and powerful caching decorator
     def get_sheet_data(self, sheet_name):
         """
-        Reads all data from a specific sheet and caches the result.
+        Reads all data from a specific sheet through the process-wide sheet cache.
         The first row is treated as headers.
 
         Args:
@@ -41,26 +377,47 @@ class ExcelDataProvider:
         Returns:
             list[dict]: A list of dictionaries representing the rows.
         """
-        try:
-            workbook = load_workbook(self.file_path, data_only=True)
-            worksheet = workbook[sheet_name]
-        except KeyError:
-            raise ValueError(f"Sheet '{sheet_name}' not found in workbook '{self.file_path.name}'")
+        return get_cached_sheet(self.file_path, sheet_name)
 
-        rows = list(worksheet.iter_rows(values_only=True))
-        if not rows:
-            return []
+    def iter_rows(self, sheet_name, conditions=None):
+        """
+        Streams the rows of a sheet in bounded memory, for sheets too large to cache.
 
-        headers = [str(cell).strip() for cell in rows[0]]
-        data = []
+        The workbook is opened in read_only mode and read row by row; nothing is
+        cached. Conditions use the same forms as `query` and are applied as rows
+        are read.
 
-        for row in rows[1:]:
-            if any(cell is not None for cell in row):  # Skip completely empty rows
-                row_dict = {header: value for header, value in zip(headers, row)}
-                data.append(row_dict)
+        Args:
+            sheet_name (str): The name of the sheet.
+            conditions (dict): Optional {column: condition} pairs, all of which must match.
 
-        workbook.close()
-        return data
+        Yields:
+            SheetRow: Matching, non-empty rows in sheet order.
+        """
+        workbook = load_workbook(self.file_path, read_only=True, data_only=True)
+        try:
+            try:
+                worksheet = workbook[sheet_name]
+            except KeyError:
+                raise ValueError(f"Sheet '{sheet_name}' not found in workbook '{self.file_path.name}'")
+
+            rows = worksheet.iter_rows(values_only=True)
+            header_row = next(rows, None)
+            if header_row is None:
+                return
+            # Shared by every row; on duplicate headers the last column wins, as in get_sheet_data.
+            columns = {str(cell).strip(): index for index, cell in enumerate(header_row)}
+            checks = [(columns.get(column), _condition_matcher(condition))
+                      for column, condition in (conditions or {}).items()]
+
+            for row in rows:
+                if not any(cell is not None for cell in row):  # Skip completely empty rows
+                    continue
+                if all(matches(row[index] if index is not None and index < len(row) else None)
+                       for index, matches in checks):
+                    yield SheetRow(columns, row)
+        finally:
+            workbook.close()
 
     def get_all_data(self, sheet_name):
         """
@@ -85,15 +442,12 @@ class ExcelDataProvider:
         Returns:
             list[dict]: A list of matching rows.
         """
-        all_data = self.get_sheet_data(sheet_name)
+        sheet = get_indexed_sheet(self.file_path, sheet_name)
 
         # Convert filter_value to string for consistent comparison, as Excel data is read as mixed types
         filter_value = str(filter_value)
 
-        return [
-            row for row in all_data
-            if str(row.get(filter_key)).strip() == filter_value
-        ]
+        return sheet.select([sheet.positions_equal(filter_key, filter_value)])
 
     def get_data_with_filters(self, sheet_name, filters):
         """
@@ -106,19 +460,36 @@ class ExcelDataProvider:
         Returns:
             list[dict]: A list of matching rows.
         """
-        all_data = self.get_sheet_data(sheet_name)
-
         if not filters:
-            return all_data
-
-        filtered_data = []
-        for row in all_data:
-            match = True
-            for key, value in filters.items():
-                if str(row.get(key)).strip() != str(value).strip():
-                    match = False
-                    break  # Mismatch found, no need to check other filters for this row
-            if match:
-                filtered_data.append(row)
-
-        return filtered_data
\ No newline at end of file
+            return self.get_sheet_data(sheet_name)
+        return self.query(sheet_name, {key: _normalize(value) for key, value in filters.items()})
+
+    def query(self, sheet_name, conditions):
+        """
+        Returns the rows matching every condition (AND), answered from column indexes.
+
+        Conditions map a column header to:
+            a single value          equality (cell and value compared as str(...).strip())
+            a list, tuple or set    IN: equal to any of the values
+            Range(low, high)        numeric cell value within the inclusive bounds
+
+        Example:
+            provider.query("Test_Flow", {"EXECUTION_FLAG": "Yes", "PRIORITY": Range(1, 2)})
+
+        Args:
+            sheet_name (str): The name of the sheet.
+            conditions (dict): {column: condition} pairs.
+
+        Returns:
+            list[dict]: Matching rows in sheet order.
+        """
+        sheet = get_indexed_sheet(self.file_path, sheet_name)
+        position_lists = []
+        for column, condition in conditions.items():
+            if isinstance(condition, Range):
+                position_lists.append(sheet.positions_between(column, condition.low, condition.high))
+            elif isinstance(condition, (list, tuple, set, frozenset)):
+                position_lists.append(sheet.positions_in(column, [_normalize(value) for value in condition]))
+            else:
+                position_lists.append(sheet.positions_equal(column, _normalize(condition)))
+        return sheet.select(position_lists)
@@ -0,0 +1,146 @@
+"""
+Failure artifact pipeline.
+Captures the screenshot and page source of a failed test exactly once, right
+when the failure is reported, and stores them in the content-addressed artifact
+store that pytest-html and Allure link to. The WebDriver calls and hashing run
+on the test thread; compression and disk writes run on a small thread pool.
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from utils.artifact_store import ArtifactStore
+from utils.logger import get_logger
+
+
+@dataclass
+class FailureCapture:
+    """The artifacts captured for one failed test."""
+    test: str
+    screenshot: bytes = None
+    page_source: str = None
+    capture_seconds: float = 0.0
+    artifacts: dict = field(default_factory=dict)
+    # Set by the pipeline: (capture, kind) -> path a report can open; writes a plain copy if needed.
+    view_writer: object = field(default=None, repr=False, compare=False)
+
+    def content(self, kind):
+        """Returns (bytes, media type) of a captured artifact."""
+        if kind == "screenshot":
+            return self.screenshot, "image/png"
+        return (self.page_source.encode("utf-8") if self.page_source else None), "text/html"
+
+    def link(self, kind, start):
+        """
+        Returns the path of a stored artifact relative to `start`, for report links.
+        Compressed artifacts (page sources) are linked through a plain copy that is
+        written only when a link is asked for.
+
+        Args:
+            kind (str): "screenshot" or "page_source".
+            start (str | Path): Directory the link is resolved from, e.g. the HTML report's.
+        """
+        path = self._viewable(kind)
+        return Path(os.path.relpath(path, start)).as_posix() if path else None
+
+    def uri(self, kind):
+        """Returns the absolute file:// URI of a stored artifact, for reports that are not next to the store."""
+        path = self._viewable(kind)
+        return path.resolve().as_uri() if path else None
+
+    def _viewable(self, kind):
+        artifact = self.artifacts.get(kind)
+        if artifact is None:
+            return None
+        return self.view_writer(self, kind) if self.view_writer else artifact.path
+
+
+class FailureArtifactPipeline:
+    """
+    One capture per failure, processed in the background.
+
+    `capture()` takes the screenshot and page source on the calling thread
+    (a WebDriver session must not be shared between threads) and hashes them,
+    so their store paths are known before it returns; compression and file
+    writes are queued. `shutdown()` waits for them.
+    """
+
+    def __init__(self, store=None, max_workers=2):
+        self.store = store or ArtifactStore()
+        self.logger = get_logger()
+        self._executor = None
+        self._max_workers = max_workers
+        self._pending = []
+
+    def capture(self, test, driver):
+        """
+        Captures a failed test's screenshot and page source and queues them for writing.
+
+        Args:
+            test (str): Test node id.
+            driver: The test's WebDriver.
+
+        Returns:
+            FailureCapture: The captured bytes and their store paths (written in the background).
+        """
+        start = time.perf_counter()
+        capture = FailureCapture(test=test, view_writer=self._request_view)
+        try:
+            capture.screenshot = driver.get_screenshot_as_png()
+        except Exception as e:
+            self.logger.warning(f"Could not capture failure screenshot for {test}: {e}")
+        try:
+            capture.page_source = driver.page_source
+        except Exception as e:
+            self.logger.warning(f"Could not capture page source for {test}: {e}")
+        if capture.screenshot:
+            capture.artifacts["screenshot"] = self.store.plan(capture.screenshot, "png")
+        if capture.page_source:
+            capture.artifacts["page_source"] = self.store.plan(capture.page_source.encode("utf-8"), "html")
+        capture.capture_seconds = time.perf_counter() - start
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="failure-artifacts")
+        self._pending = [future for future in self._pending if not future.done()]
+        self._pending.append(self._executor.submit(self._write, capture))
+        self.logger.info(f"Captured failure artifacts for {test} in {capture.capture_seconds:.2f}s.")
+        return capture
+
+    def shutdown(self):
+        """Waits for every queued write. Called once at the end of the session."""
+        for future in self._pending:
+            error = future.exception()
+            if error:
+                self.logger.warning(f"Writing failure artifacts failed: {error}")
+        self._pending = []
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def _write(self, capture):
+        """Compresses, writes and indexes one capture (runs on the pool)."""
+        for kind, artifact in capture.artifacts.items():
+            data, media_type = capture.content(kind)
+            written = self.store.write(data, artifact)
+            self.store.record(capture.test, kind, artifact, media_type, written)
+        return capture
+
+    def _request_view(self, capture, kind):
+        """Queues the plain copy of a compressed artifact a report links to; returns its path."""
+        artifact = capture.artifacts[kind]
+        path = self.store.view_path(artifact)
+        if path == artifact.path or path.exists():
+            return path
+        data = capture.content(kind)[0]
+        if self._executor is None:
+            self.store.write_view(data, artifact)
+        else:
+            self._pending.append(self._executor.submit(self.store.write_view, data, artifact))
+        return path
+
+
+# Shared by the conftest hooks and BaseTest in each process.
+failure_artifacts = FailureArtifactPipeline()
@@ -0,0 +1,47 @@
+"""
+Cross-process file lock.
+Serialises work that several pytest-xdist workers (or parallel runs) may attempt
+at once on shared files, such as resolving a driver or publishing a profile.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+
+class FileLock:
+    """
+    A small cross-process lock on a file, used to serialise writes to shared
+    caches between xdist workers and parallel runs on one machine.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._file = None
+
+    def __enter__(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a+")
+        if sys.platform == "win32":
+            import msvcrt
+            while True:
+                try:
+                    msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    # LK_LOCK gives up after ~10s; keep waiting for the other worker.
+                    time.sleep(0.1)
+        else:
+            import fcntl
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if sys.platform == "win32":
+            import msvcrt
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        self._file.close()
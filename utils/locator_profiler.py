@@ -0,0 +1,334 @@
+"""
+Locator profiler.
+Finds every locator constant on the BasePage subclasses in pages/, times each
+one against saved DOM snapshots in a local headless browser, reports how many
+nodes it matches and suggests faster CSS/ID selectors that match exactly the
+same nodes. Results are written as JSON keyed by git commit so locator cost can
+be tracked over time.
+
+    python -m utils.locator_profiler --capture https://supertails.com/ --name home
+    python -m utils.locator_profiler --snapshot benchmarks/snapshots/home.html
+"""
+
+import argparse
+import hashlib
+import importlib
+import json
+import pkgutil
+import statistics
+import subprocess
+import time
+from pathlib import Path
+
+from selenium.webdriver.common.by import By
+
+import pages
+from config.environment import Environment
+from pages.base_page import BasePage
+from utils.browser_pool import quit_driver
+from utils.driver_factory import DriverFactory
+
+PROJECT_ROOT = Path(__file__).parent.parent
+SNAPSHOT_DIR = PROJECT_ROOT / "benchmarks" / "snapshots"
+RESULTS_DIR = PROJECT_ROOT / "benchmarks" / "locators"
+LOCATOR_STRATEGIES = {value for name, value in vars(By).items() if not name.startswith("_")}
+
+# Serialises the rendered DOM without scripts, so a snapshot is static and
+# replays the same way on every run.
+CAPTURE_SCRIPT = """
+var root = document.documentElement.cloneNode(true);
+root.querySelectorAll('script, noscript, link[rel="preload"], link[rel="prefetch"]').forEach(function (node) { node.remove(); });
+return '<!DOCTYPE html>\\n' + root.outerHTML;
+"""
+
+# args: [locators, samples, repeat]. Each locator is {strategy: 'css'|'xpath', selector}.
+# Times `repeat` evaluations per sample in the page (no WebDriver round trip) and
+# returns per-locator match counts, per-evaluation timings in microseconds and
+# verified CSS alternatives with their own timings.
+BENCHMARK_SCRIPT = """
+var locators = arguments[0], samples = arguments[1], repeat = arguments[2];
+
+function run(strategy, selector) {
+    if (strategy === 'xpath') {
+        var snapshot = document.evaluate(selector, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        var nodes = [];
+        for (var i = 0; i < snapshot.snapshotLength; i++) { nodes.push(snapshot.snapshotItem(i)); }
+        return nodes;
+    }
+    return Array.prototype.slice.call(document.querySelectorAll(selector));
+}
+
+function time(strategy, selector) {
+    for (var w = 0; w < 3; w++) { run(strategy, selector); }
+    var timings = [];
+    for (var s = 0; s < samples; s++) {
+        var start = performance.now();
+        for (var r = 0; r < repeat; r++) { run(strategy, selector); }
+        timings.push((performance.now() - start) * 1000 / repeat);
+    }
+    timings.sort(function (a, b) { return a - b; });
+    return {median_us: timings[Math.floor(timings.length / 2)], min_us: timings[0],
+            p95_us: timings[Math.min(timings.length - 1, Math.ceil(timings.length * 0.95) - 1)]};
+}
+
+function classes(node) {
+    return Array.prototype.filter.call(node.classList, function (name) {
+        return /^[A-Za-z_-][\\w-]*$/.test(name);
+    }).map(function (name) { return '.' + CSS.escape(name); }).join('');
+}
+
+function nearestIdAncestor(node) {
+    for (var current = node.parentElement; current; current = current.parentElement) {
+        if (current.id && document.querySelectorAll('#' + CSS.escape(current.id)).length === 1) { return current; }
+    }
+    return null;
+}
+
+function nthPath(node, ancestor) {
+    var parts = [];
+    for (var current = node; current && current !== ancestor && current !== document.documentElement;
+         current = current.parentElement) {
+        var tag = current.tagName.toLowerCase(), index = 1;
+        for (var sibling = current.previousElementSibling; sibling; sibling = sibling.previousElementSibling) {
+            if (sibling.tagName === current.tagName) { index++; }
+        }
+        parts.unshift(tag + ':nth-of-type(' + index + ')');
+    }
+    return (ancestor ? '#' + CSS.escape(ancestor.id) + ' > ' : ':root > ') + parts.join(' > ');
+}
+
+function commonAncestor(nodes) {
+    var ancestor = nodes[0].parentElement;
+    while (ancestor && !nodes.every(function (node) { return ancestor.contains(node); })) {
+        ancestor = ancestor.parentElement;
+    }
+    return ancestor;
+}
+
+function candidatesFor(nodes) {
+    var candidates = [], first = nodes[0], tag = first.tagName.toLowerCase();
+    if (nodes.length === 1) {
+        if (first.id) { candidates.push('#' + CSS.escape(first.id)); }
+        ['data-testid', 'data-test', 'name', 'aria-label', 'for', 'type', 'href', 'data-action'].forEach(function (attribute) {
+            var value = first.getAttribute(attribute);
+            if (value && value.length < 120) { candidates.push(tag + '[' + attribute + '="' + value.replace(/"/g, '\\\\"') + '"]'); }
+        });
+        if (classes(first)) { candidates.push(tag + classes(first)); }
+        var anchor = nearestIdAncestor(first);
+        if (anchor) {
+            candidates.push('#' + CSS.escape(anchor.id) + ' ' + tag + classes(first));
+            candidates.push(nthPath(first, anchor));
+        } else {
+            candidates.push(nthPath(first, null));
+        }
+    } else {
+        var shared = Array.prototype.filter.call(first.classList, function (name) {
+            return /^[A-Za-z_-][\\w-]*$/.test(name) && nodes.every(function (node) { return node.classList.contains(name); });
+        }).map(function (name) { return '.' + CSS.escape(name); }).join('');
+        var sameTag = nodes.every(function (node) { return node.tagName === first.tagName; });
+        var base = (sameTag ? tag : '') + shared;
+        if (base) {
+            candidates.push(base);
+            var container = commonAncestor(nodes);
+            var scope = container && (container.id ? container : nearestIdAncestor(container));
+            if (scope && scope.id) { candidates.push('#' + CSS.escape(scope.id) + ' ' + base); }
+        }
+    }
+    return candidates;
+}
+
+function sameNodes(selector, nodes) {
+    var found;
+    try { found = run('css', selector); } catch (e) { return false; }
+    if (nodes.length === 1) { return found[0] === nodes[0]; }
+    return found.length === nodes.length && found.every(function (node, i) { return node === nodes[i]; });
+}
+
+return locators.map(function (locator) {
+    var nodes;
+    try { nodes = run(locator.strategy, locator.selector); }
+    catch (e) { return {error: String(e)}; }
+    var result = {matches: nodes.length, timing: time(locator.strategy, locator.selector), alternatives: []};
+    if (!nodes.length) { return result; }
+    var seen = {};
+    candidatesFor(nodes).forEach(function (selector) {
+        if (seen[selector] || selector === locator.selector || !sameNodes(selector, nodes)) { return; }
+        seen[selector] = true;
+        result.alternatives.push({selector: selector, unique: run('css', selector).length === nodes.length,
+                                  timing: time('css', selector)});
+    });
+    result.alternatives.sort(function (a, b) { return a.timing.median_us - b.timing.median_us; });
+    return result;
+});
+"""
+
+
+def discover_locators():
+    """
+    Imports every module in pages/ and collects the (By, value) class attributes
+    of BasePage subclasses.
+
+    Returns:
+        list[dict]: {"page", "name", "by", "value"} for each locator constant.
+    """
+    for module in pkgutil.iter_modules(pages.__path__):
+        importlib.import_module(f"pages.{module.name}")
+
+    locators, seen = [], set()
+    pending = list(BasePage.__subclasses__())
+    while pending:
+        page_class = pending.pop(0)
+        pending.extend(page_class.__subclasses__())
+        for name, value in vars(page_class).items():
+            if (name.isupper() and isinstance(value, tuple) and len(value) == 2
+                    and value[0] in LOCATOR_STRATEGIES and isinstance(value[1], str)):
+                key = (page_class.__name__, name)
+                if key not in seen:
+                    seen.add(key)
+                    locators.append({"page": page_class.__name__, "name": name, "by": value[0], "value": value[1]})
+    return sorted(locators, key=lambda locator: (locator["page"], locator["name"]))
+
+
+def current_commit():
+    """Returns the short HEAD commit, suffixed with -dirty for uncommitted changes."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=PROJECT_ROOT,
+                               capture_output=True, text=True).stdout.strip()
+        return f"{commit}-dirty" if dirty else commit
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def launch_browser():
+    """Starts the headless, image-free Chrome of the throughput preset."""
+    factory = DriverFactory(Environment("supertails"), "throughput")
+    driver = factory.create("chrome")
+    factory.configure(driver)
+    return driver
+
+
+def capture_snapshot(driver, url, output):
+    """
+    Opens a live page and saves its rendered DOM, without scripts, as a snapshot.
+
+    Args:
+        driver: WebDriver instance.
+        url (str): Page to capture.
+        output (str | Path): HTML file to write.
+
+    Returns:
+        Path: The written snapshot.
+    """
+    driver.get(url)
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(driver.execute_script(CAPTURE_SCRIPT), encoding="utf-8")
+    return output
+
+
+def profile_snapshot(driver, snapshot, locators, samples=30, repeat=20, roundtrips=10):
+    """
+    Benchmarks every locator against one snapshot.
+
+    Args:
+        driver: WebDriver instance.
+        snapshot (Path): Saved DOM snapshot to load.
+        locators (list): Output of `discover_locators()`.
+        samples (int): Timed samples per locator in the page.
+        repeat (int): Evaluations per sample (keeps samples above timer resolution).
+        roundtrips (int): find_elements calls per locator to time the full WebDriver cost.
+
+    Returns:
+        list[dict]: One result per locator.
+    """
+    driver.get(Path(snapshot).resolve().as_uri())
+    in_page = [BasePage._in_page_locator((locator["by"], locator["value"])) for locator in locators]
+    benchmarked = [{"strategy": strategy, "selector": selector} for strategy, selector in filter(None, in_page)]
+    measurements = iter(driver.execute_script(BENCHMARK_SCRIPT, benchmarked, samples, repeat))
+
+    results = []
+    for locator, translated in zip(locators, in_page):
+        result = dict(locator)
+        if translated is not None:
+            result.update(next(measurements))
+        timings, found = [], None
+        for _ in range(roundtrips):
+            start = time.perf_counter()
+            found = driver.find_elements(locator["by"], locator["value"])
+            timings.append((time.perf_counter() - start) * 1000)
+        result["roundtrip_ms"] = round(statistics.median(timings), 3) if timings else None
+        if "matches" not in result and found is not None:
+            result["matches"] = len(found)
+        best = (result.get("alternatives") or [None])[0]
+        if best and result.get("timing"):
+            result["suggestion"] = best["selector"]
+            result["speedup"] = round(result["timing"]["median_us"] / max(best["timing"]["median_us"], 0.001), 2)
+        results.append(result)
+    return results
+
+
+def print_report(snapshot, results):
+    """Prints one snapshot's results, slowest locators first."""
+    print(f"\n{snapshot}")
+    print(f"{'locator':<40} {'matches':>7} {'median us':>10} {'find ms':>8}  suggestion")
+    ranked = sorted(results, key=lambda result: -(result.get("timing") or {}).get("median_us", 0))
+    for result in ranked:
+        median = (result.get("timing") or {}).get("median_us")
+        suggestion = f"{result['suggestion']}  ({result['speedup']}x)" if result.get("suggestion") else ""
+        print(f"{result['page'] + '.' + result['name']:<40} {result.get('matches', '-'):>7} "
+              f"{median if median is not None else '-':>10} {result['roundtrip_ms']:>8}  {suggestion}")
+
+
+def main():
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Profile page-object locators against saved DOM snapshots.")
+    parser.add_argument("--capture", metavar="URL", help="Save a snapshot of this live page first.")
+    parser.add_argument("--name", help="Snapshot name for --capture (default: derived from the URL).")
+    parser.add_argument("--snapshot", action="append", default=[],
+                        help="Snapshot to profile against; repeatable. Default: every file in benchmarks/snapshots.")
+    parser.add_argument("--samples", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--roundtrips", type=int, default=10)
+    parser.add_argument("--output", help="Result file (default: benchmarks/locators/<commit>.json).")
+    parser.add_argument("--list", action="store_true", help="Only list the discovered locators.")
+    args = parser.parse_args()
+
+    locators = discover_locators()
+    if args.list:
+        for locator in locators:
+            print(f"{locator['page']}.{locator['name']}: ({locator['by']}, {locator['value']!r})")
+        return
+
+    driver = launch_browser()
+    try:
+        snapshots = [Path(path) for path in args.snapshot]
+        if args.capture:
+            name = args.name or hashlib.sha1(args.capture.encode()).hexdigest()[:10]
+            snapshots.append(capture_snapshot(driver, args.capture, SNAPSHOT_DIR / f"{name}.html"))
+        if not snapshots:
+            snapshots = sorted(SNAPSHOT_DIR.glob("*.html"))
+        if not snapshots:
+            parser.error("No snapshots: pass --snapshot or capture one with --capture URL.")
+
+        commit = current_commit()
+        report = {"commit": commit, "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                  "browser_version": driver.capabilities.get("browserVersion"),
+                  "samples": args.samples, "repeat": args.repeat, "snapshots": {}}
+        for snapshot in snapshots:
+            results = profile_snapshot(driver, snapshot, locators, args.samples, args.repeat, args.roundtrips)
+            digest = hashlib.sha256(snapshot.read_bytes()).hexdigest()[:16]
+            report["snapshots"][snapshot.name] = {"sha256": digest, "results": results}
+            print_report(snapshot.name, results)
+    finally:
+        quit_driver(driver)
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{commit}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"\nResults written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,99 @@
 # utils/logger.py
+import atexit
 import logging
+import queue
+import threading
+from collections import deque
+from logging.handlers import QueueHandler, QueueListener
+
+LOGGER_NAME = "MyFrameworkLogger"
+
+_listener = None
+_queue_handler = None
+_lock = threading.Lock()
+
 
 def get_logger():
     """Returns the logger instance configured by the conftest.py session fixture."""
-    return logging.getLogger("MyFrameworkLogger")
\ No newline at end of file
+    return logging.getLogger(LOGGER_NAME)
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    Puts records on the queue untouched. The stock QueueHandler formats every
+    record on the calling thread; here formatting is left to the handlers on
+    the listener's thread.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+class RingBufferHandler(logging.Handler):
+    """
+    Keeps the most recent records in memory, unformatted, for per-test log capture.
+    Formatting happens only when `getvalue()` is called, e.g. once at teardown.
+    """
+
+    def __init__(self, capacity=5000, formatter=None):
+        super().__init__()
+        self.records = deque(maxlen=capacity)
+        self.dropped = 0
+        if formatter:
+            self.setFormatter(formatter)
+
+    def emit(self, record):
+        if len(self.records) == self.records.maxlen:
+            self.dropped += 1
+        self.records.append(record)
+
+    def getvalue(self):
+        """Returns the buffered records formatted as text, oldest first."""
+        lines = [self.format(record) for record in list(self.records)]
+        if self.dropped:
+            lines.insert(0, f"... {self.dropped} earlier record(s) dropped (buffer holds {self.records.maxlen}) ...")
+        return "\n".join(lines) + ("\n" if lines else "")
+
+
+def start_async_logging(handlers, logger=None):
+    """
+    Routes the framework logger through a queue to a background writer thread.
+
+    The test thread only enqueues records; formatting and file/console writes
+    run on the QueueListener's thread. Handler levels are still respected.
+
+    Args:
+        handlers (list): Handlers (file, console, ...) to run on the writer thread.
+        logger (logging.Logger): Logger to route; defaults to the framework logger.
+    """
+    global _listener, _queue_handler
+    logger = logger or get_logger()
+    with _lock:
+        _stop_locked()
+        records = queue.SimpleQueue()
+        _queue_handler = DeferredQueueHandler(records)
+        _listener = QueueListener(records, *handlers, respect_handler_level=True)
+        _listener.start()
+        logger.addHandler(_queue_handler)
+
+
+def stop_async_logging(logger=None):
+    """Flushes every queued record to the handlers, stops the writer thread and closes the handlers."""
+    with _lock:
+        _stop_locked(logger or get_logger())
+
+
+def _stop_locked(logger=None):
+    global _listener, _queue_handler
+    if _listener is None:
+        return
+    (logger or get_logger()).removeHandler(_queue_handler)
+    _listener.stop()  # Processes everything still queued before returning.
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
+    _queue_handler = None
+
+
+# Interrupted runs still get their queued records written out.
+atexit.register(stop_async_logging)
@@ -0,0 +1,356 @@
+"""
+Record/replay stand-in for the site under test.
+A local HTTP server that sits in front of an environment's base URL. In record
+mode it forwards every request upstream and saves the exchanges as HAR files;
+in replay mode it answers from those files without touching the network, so the
+suite runs offline, fast and deterministically.
+"""
+
+import argparse
+import base64
+import http.client
+import json
+import re
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from utils.browser_profile import get_worker_id
+from utils.logger import get_logger
+
+PROJECT_ROOT = Path(__file__).parent.parent
+MODES = ("live", "record", "replay")
+
+# Secondary hosts are served under /__host__/<host>/..., the primary host at the root.
+HOST_PREFIX = "/__host__/"
+
+# Headers that describe one hop or that the stand-in recomputes itself.
+HOP_BY_HOP_HEADERS = {
+    "connection", "keep-alive", "proxy-authenticate", "proxy-authorization", "te",
+    "trailer", "transfer-encoding", "upgrade", "content-length", "content-encoding",
+}
+# Headers that would break a page served over plain HTTP from 127.0.0.1.
+DROPPED_RESPONSE_HEADERS = {
+    "strict-transport-security", "content-security-policy", "content-security-policy-report-only",
+    "alt-svc", "report-to", "nel",
+}
+TEXT_CONTENT_TYPES = ("text/", "javascript", "json", "xml")
+UPSTREAM_TIMEOUT = 30
+
+
+def _is_text(mime_type):
+    """Whether a response body is text whose absolute URLs need rewriting."""
+    return any(marker in (mime_type or "") for marker in TEXT_CONTENT_TYPES)
+
+
+class NetworkStandIn:
+    """
+    Serves an environment's site from http://127.0.0.1:<port>.
+
+    Responses are stored exactly as the upstream sent them; absolute URLs that
+    point at the served hosts are rewritten to the stand-in only when a response
+    is served, so archives do not depend on the port they were recorded on.
+
+    Every exchange is recorded under the test that was running (see
+    `set_current_test`), and replay matches requests on that test, method and
+    URL. When one URL was recorded several times in a test (e.g. /cart.js
+    before and after adding a product) the responses are replayed in the
+    recorded order, and the last one is repeated once they run out. The
+    sequence restarts with every test, so what a test gets does not depend on
+    which tests ran before it or on which worker. Requests the test did not
+    record fall back to what any test recorded for that URL; requests missing
+    from the archive get a 404 and are counted in `misses`.
+    """
+
+    def __init__(self, base_url, mode, archive_dir, hosts=()):
+        """
+        Args:
+            base_url (str): The real base URL of the environment, e.g. https://supertails.com/.
+            mode (str): record or replay.
+            archive_dir (str | Path): Directory holding the HAR files.
+            hosts (iterable): Further hosts (CDNs) to record and replay alongside the base URL.
+        """
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unsupported network mode for the stand-in: {mode}")
+        self.logger = get_logger()
+        self.mode = mode
+        upstream = urlsplit(base_url)
+        self.scheme = upstream.scheme
+        self.primary_host = upstream.netloc
+        self.base_path = upstream.path or "/"
+        self.hosts = [self.primary_host] + [host for host in hosts if host != self.primary_host]
+        self.archive_dir = Path(archive_dir)
+        if not self.archive_dir.is_absolute():
+            self.archive_dir = PROJECT_ROOT / self.archive_dir
+        self.entries = []
+        self.misses = 0
+        self.current_test = None
+        self._responses = defaultdict(list)
+        self._served = defaultdict(int)
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def origin(self):
+        """The stand-in's own origin, e.g. http://127.0.0.1:50123."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def base_url(self):
+        """The URL tests should open instead of the real base URL."""
+        return self.origin + self.base_path
+
+    def start(self):
+        """Loads the archive (replay) and starts serving on a free port."""
+        if self.mode == "replay":
+            self._load_archive()
+        stand_in = self
+
+        class Handler(_StandInHandler):
+            owner = stand_in
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="network-stand-in", daemon=True)
+        self._thread.start()
+        self.logger.info(f"Network stand-in ({self.mode}) for {self.primary_host} serving at {self.base_url}")
+        return self
+
+    def stop(self):
+        """Stops serving and, in record mode, writes this process's HAR file."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self.mode == "record":
+            path = self.save()
+            self.logger.info(f"Recorded {len(self.entries)} exchange(s) to {path}")
+        elif self.misses:
+            self.logger.warning(f"Network stand-in answered {self.misses} request(s) missing from the archive with 404.")
+
+    def set_current_test(self, test):
+        """
+        Sets the test whose exchanges are recorded or replayed next and restarts
+        the replay sequence. Called before every test (None between tests).
+
+        Args:
+            test (str): Test node id.
+        """
+        with self._lock:
+            self.current_test = test
+            self._served.clear()
+
+    def save(self):
+        """Writes the recorded entries to <archive_dir>/<worker>.har and returns its path."""
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        path = self.archive_dir / f"{get_worker_id()}.har"
+        har = {"log": {"version": "1.2", "creator": {"name": "network_replay", "version": "1.0"},
+                       "entries": self.entries}}
+        temp_path = path.with_suffix(".har.tmp")
+        temp_path.write_text(json.dumps(har), encoding="utf-8")
+        temp_path.replace(path)
+        return path
+
+    def handle(self, method, path, headers, body):
+        """
+        Answers one request from the browser.
+
+        Returns:
+            tuple: (status, reason, headers as a list of pairs, body bytes).
+        """
+        url = self._upstream_url(path)
+        if self.mode == "record":
+            response = self._fetch(method, url, headers, body)
+            self._record(method, url, headers, body, response)
+        else:
+            response = self._lookup(method, url)
+        return self._rewrite(response)
+
+    def _upstream_url(self, path):
+        """Maps a stand-in path back to the real URL."""
+        if path.startswith(HOST_PREFIX):
+            host, _, rest = path[len(HOST_PREFIX):].partition("/")
+            return f"{self.scheme}://{host}/{rest}"
+        return f"{self.scheme}://{self.primary_host}{path}"
+
+    def _fetch(self, method, url, headers, body):
+        """Forwards a request upstream without following redirects."""
+        parts = urlsplit(url)
+        forwarded = {name: value for name, value in headers if name.lower() not in HOP_BY_HOP_HEADERS
+                     and name.lower() not in ("host", "accept-encoding", "origin", "referer")}
+        # Plain bodies, so text responses can be rewritten and archived as-is.
+        forwarded["Accept-Encoding"] = "identity"
+        connection_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        connection = connection_class(parts.netloc, timeout=UPSTREAM_TIMEOUT)
+        try:
+            target = parts.path or "/"
+            if parts.query:
+                target += "?" + parts.query
+            connection.request(method, target, body=body or None, headers=forwarded)
+            upstream = connection.getresponse()
+            return {"status": upstream.status, "reason": upstream.reason,
+                    "headers": upstream.getheaders(), "body": upstream.read()}
+        finally:
+            connection.close()
+
+    def _record(self, method, url, headers, body, response):
+        """Appends an exchange to the HAR entries."""
+        mime_type = dict((name.lower(), value) for name, value in response["headers"]).get("content-type", "")
+        content = {"size": len(response["body"]), "mimeType": mime_type}
+        if _is_text(mime_type):
+            content["text"] = response["body"].decode("utf-8", errors="replace")
+        else:
+            content["text"] = base64.b64encode(response["body"]).decode("ascii")
+            content["encoding"] = "base64"
+        request = {"method": method, "url": url, "httpVersion": "HTTP/1.1",
+                   "headers": [{"name": n, "value": v} for n, v in headers],
+                   "queryString": [], "cookies": [], "headersSize": -1, "bodySize": len(body)}
+        if body:
+            request["postData"] = {"mimeType": dict((n.lower(), v) for n, v in headers).get("content-type", ""),
+                                   "text": body.decode("utf-8", errors="replace")}
+        entry = {
+            "_test": self.current_test,
+            "startedDateTime": datetime.now(timezone.utc).isoformat(),
+            "time": 0,
+            "request": request,
+            "response": {"status": response["status"], "statusText": response["reason"],
+                         "httpVersion": "HTTP/1.1",
+                         "headers": [{"name": n, "value": v} for n, v in response["headers"]],
+                         "cookies": [], "content": content, "redirectURL": "",
+                         "headersSize": -1, "bodySize": len(response["body"])},
+            "cache": {},
+            "timings": {"send": 0, "wait": 0, "receive": 0},
+        }
+        with self._lock:
+            self.entries.append(entry)
+
+    def _load_archive(self):
+        """
+        Indexes every *.har file in the archive directory by method and URL, both
+        per recording test and across all tests (in file and recording order).
+        """
+        files = sorted(self.archive_dir.glob("*.har"))
+        if not files:
+            raise FileNotFoundError(
+                f"No HAR files in {self.archive_dir}; run once with --network-mode record first."
+            )
+        for path in files:
+            for entry in json.loads(path.read_text(encoding="utf-8"))["log"]["entries"]:
+                request, response = entry["request"], entry["response"]
+                content = response.get("content", {})
+                text = content.get("text", "")
+                body = base64.b64decode(text) if content.get("encoding") == "base64" else text.encode("utf-8")
+                recorded = {
+                    "status": response["status"], "reason": response.get("statusText", ""),
+                    "headers": [(h["name"], h["value"]) for h in response["headers"]], "body": body,
+                }
+                self._responses[(entry.get("_test"), request["method"], request["url"])].append(recorded)
+                if entry.get("_test") is not None:
+                    self._responses[(None, request["method"], request["url"])].append(recorded)
+        count = sum(len(responses) for (test, _, _), responses in self._responses.items() if test is None)
+        self.logger.info(f"Loaded {count} recorded exchange(s) from {len(files)} HAR file(s) in {self.archive_dir}")
+
+    def _lookup(self, method, url):
+        """Returns the current test's next recorded response for a request, or a 404."""
+        with self._lock:
+            key = (self.current_test, method, url)
+            responses = self._responses.get(key)
+            if not responses:
+                key = (None, method, url)
+                responses = self._responses.get(key)
+            if not responses:
+                self.misses += 1
+                self.logger.debug(f"Network stand-in miss: {method} {url}")
+                return {"status": 404, "reason": "Not Recorded",
+                        "headers": [("Content-Type", "text/plain")], "body": b"Not in the network archive"}
+            index = min(self._served[key], len(responses) - 1)
+            self._served[key] += 1
+            return responses[index]
+
+    def _rewrite(self, response):
+        """Points absolute URLs, redirects and cookies at the stand-in."""
+        headers = []
+        for name, value in response["headers"]:
+            lowered = name.lower()
+            if lowered in HOP_BY_HOP_HEADERS or lowered in DROPPED_RESPONSE_HEADERS:
+                continue
+            if lowered == "location":
+                value = self._rewrite_text(value)
+            elif lowered == "set-cookie":
+                value = re.sub(r";\s*(domain=[^;]*|secure|samesite=none)", "", value, flags=re.IGNORECASE)
+            headers.append((name, value))
+        body = response["body"]
+        content_type = dict((name.lower(), value) for name, value in headers).get("content-type", "")
+        if _is_text(content_type):
+            body = self._rewrite_text(body.decode("utf-8", errors="replace")).encode("utf-8")
+        return response["status"], response["reason"], headers, body
+
+    def _rewrite_text(self, text):
+        """Replaces absolute and protocol-relative URLs of the served hosts."""
+        for host in self.hosts:
+            local = self.origin if host == self.primary_host else f"{self.origin}{HOST_PREFIX}{host}"
+            escaped_local = local.replace("/", "\\/")
+            for prefix in ("https://", "http://"):
+                text = text.replace(prefix + host, local)
+                text = text.replace(prefix.replace("/", "\\/") + host, escaped_local)
+            text = re.sub(r"(?<![\w.:/])//" + re.escape(host) + r"(?![\w.-])", local, text)
+        return text
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    """Passes every request to the owning NetworkStandIn."""
+
+    owner = None
+    protocol_version = "HTTP/1.1"
+
+    def _serve(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        try:
+            status, reason, headers, payload = self.owner.handle(self.command, self.path, self.headers.items(), body)
+        except Exception as e:
+            self.owner.logger.warning(f"Network stand-in failed on {self.command} {self.path}: {e}")
+            status, reason, headers, payload = 502, "Bad Gateway", [("Content-Type", "text/plain")], str(e).encode()
+        self.send_response(status, reason)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(payload)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = do_HEAD = do_OPTIONS = _serve
+
+    def log_message(self, format, *args):
+        """Keeps per-request lines out of the console."""
+
+
+def main():
+    """Command-line entry point: serves an environment from its archive until interrupted."""
+    from config.environment import Environment
+
+    parser = argparse.ArgumentParser(description="Serve an environment through the record/replay stand-in.")
+    parser.add_argument("mode", choices=("record", "replay"))
+    parser.add_argument("--env", default="supertails", help="Environment name from config.yaml.")
+    args = parser.parse_args()
+    env = Environment(args.env)
+    settings = env.current_env.get("stand_in", {})
+    stand_in = NetworkStandIn(env.current_env["base_url"], args.mode,
+                              settings.get("archive_dir", f"test_data/network_archive/{args.env}"),
+                              settings.get("hosts", [])).start()
+    print(f"Serving {env.current_env['base_url']} at {stand_in.base_url} ({args.mode}); Ctrl+C to stop.")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        stand_in.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+In-flight network request tracking.
+Hooks window.fetch and XMLHttpRequest inside the page so tests can wait for the
+moment a page's XHR/fetch traffic settles instead of guessing with sleeps.
+"""
+
+from utils.logger import get_logger
+
+# Installs window.__networkTracker = {inflight, total, lastChange}. Idempotent,
+# so it is safe to run on every document and again on demand.
+NETWORK_TRACKER_SCRIPT = """
+(function () {
+    if (window.__networkTracker) { return; }
+    var tracker = window.__networkTracker = {inflight: 0, total: 0, lastChange: Date.now()};
+    function begin() { tracker.inflight++; tracker.total++; tracker.lastChange = Date.now(); }
+    function end() { tracker.inflight = Math.max(0, tracker.inflight - 1); tracker.lastChange = Date.now(); }
+    if (window.fetch) {
+        var originalFetch = window.fetch;
+        window.fetch = function () {
+            begin();
+            try {
+                return originalFetch.apply(this, arguments).then(
+                    function (response) { end(); return response; },
+                    function (error) { end(); throw error; }
+                );
+            } catch (error) { end(); throw error; }
+        };
+    }
+    if (window.XMLHttpRequest) {
+        var originalSend = XMLHttpRequest.prototype.send;
+        XMLHttpRequest.prototype.send = function () {
+            var finished = false;
+            function done() { if (!finished) { finished = true; end(); } }
+            begin();
+            this.addEventListener('loadend', done);
+            try { return originalSend.apply(this, arguments); } catch (error) { done(); throw error; }
+        };
+    }
+})();
+"""
+
+# Predicate body for BasePage.wait_for_condition. args: [quiet_ms].
+# Installs the tracker on demand (pages opened without it, e.g. in Firefox) and
+# is met once nothing has been in flight for quiet_ms.
+NETWORK_IDLE_PREDICATE = NETWORK_TRACKER_SCRIPT + """
+var tracker = window.__networkTracker;
+if (tracker.inflight > 0 || Date.now() - tracker.lastChange < args[0]) { return false; }
+return {total: tracker.total};
+"""
+
+
+def install_network_tracker(driver):
+    """
+    Registers the tracker to run at the start of every new document in the current tab.
+
+    Only Chromium-based browsers support this (through DevTools); on others the
+    tracker is injected on demand by the first network-idle wait, which cannot
+    see requests that were already in flight at that point.
+
+    Args:
+        driver: WebDriver instance to install the tracker on.
+    """
+    if not hasattr(driver, "execute_cdp_cmd"):
+        return
+    try:
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": NETWORK_TRACKER_SCRIPT})
+    except Exception as e:
+        get_logger().warning(f"Could not install network tracker over DevTools: {e}")
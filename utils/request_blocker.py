@@ -0,0 +1,96 @@
+"""
+Third-party request blocking.
+Stops analytics, ad pixels, chat widgets and web fonts from loading on Chrome and
+Edge through DevTools (Network.setBlockedURLs), and reports from the browser's
+performance log how many requests each test blocked.
+"""
+
+import json
+from collections import Counter
+from fnmatch import fnmatchcase
+
+from utils.logger import get_logger
+
+# DevTools reports requests refused by Network.setBlockedURLs with this reason.
+BLOCKED_REASON = "inspector"
+
+
+def supports_blocking(driver):
+    """Returns True for drivers that can block URLs over DevTools (Chrome and Edge)."""
+    return hasattr(driver, "execute_cdp_cmd")
+
+
+def apply_blocklist(driver, patterns):
+    """
+    Blocks every request whose URL matches one of the patterns in the current tab.
+
+    Args:
+        driver: Chrome or Edge WebDriver instance.
+        patterns (list): URL patterns; '*' matches any run of characters.
+    """
+    if not patterns or not supports_blocking(driver):
+        return
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(patterns)})
+
+
+def drain_performance_log(driver):
+    """
+    Returns and clears the DevTools events buffered in the driver's performance log.
+
+    Args:
+        driver: WebDriver started with performance logging enabled.
+
+    Returns:
+        list[dict]: DevTools messages ({"method": ..., "params": ...}).
+    """
+    try:
+        entries = driver.get_log("performance")
+    except Exception:
+        return []
+    return [json.loads(entry["message"])["message"] for entry in entries]
+
+
+def collect_blocking_stats(driver, patterns):
+    """
+    Summarises the network activity recorded since the last drain.
+
+    The browser never downloads a blocked request, so its size cannot be known;
+    the bytes reported are what the page actually transferred with blocking on.
+
+    Args:
+        driver: WebDriver started with performance logging enabled.
+        patterns (list): The active blocklist, used to attribute blocked requests.
+
+    Returns:
+        dict: blocked_requests, blocked_by_pattern, completed_requests and transferred_bytes.
+    """
+    urls = {}
+    blocked_by_pattern = Counter()
+    blocked = completed = transferred = 0
+    for message in drain_performance_log(driver):
+        method, params = message.get("method"), message.get("params", {})
+        if method == "Network.requestWillBeSent":
+            urls[params["requestId"]] = params["request"]["url"]
+        elif method == "Network.loadingFinished":
+            completed += 1
+            transferred += int(params.get("encodedDataLength", 0))
+        elif method == "Network.loadingFailed" and params.get("blockedReason") == BLOCKED_REASON:
+            blocked += 1
+            url = urls.get(params["requestId"], "")
+            pattern = next((p for p in patterns if fnmatchcase(url, p)), "unknown")
+            blocked_by_pattern[pattern] += 1
+    return {
+        "blocked_requests": blocked,
+        "blocked_by_pattern": dict(blocked_by_pattern.most_common()),
+        "completed_requests": completed,
+        "transferred_bytes": transferred,
+    }
+
+
+def log_blocking_stats(test_name, stats):
+    """Writes a one-line blocking summary for a test to the framework log."""
+    get_logger().info(
+        f"Request blocking for {test_name}: {stats['blocked_requests']} request(s) blocked, "
+        f"{stats['completed_requests']} completed, {stats['transferred_bytes'] / 1024:.0f} KiB transferred"
+    )
@@ -0,0 +1,253 @@
+"""
+Shared, memory-mapped test data store.
+Under pytest-xdist the controller publishes a store directory; the first worker
+to read a workbook compiles it (rows plus every column index) into a read-only
+file there, and every worker memory-maps that file instead of parsing the
+workbook itself. Workbooks nobody reads are never compiled. The encoded rows
+and indexes exist once in the OS page cache; workers decode a row on each read
+without keeping it, and unpickle only the column indexes their queries use.
+"""
+
+import mmap
+import os
+import pickle
+import shutil
+import struct
+from collections.abc import Sequence
+from pathlib import Path
+
+from utils.excel_provider import (SIDECAR_DIR, SheetRow, build_numeric_index, build_value_index,
+                                  load_compiled_workbook, workbook_tag)
+from utils.file_lock import FileLock
+from utils.logger import get_logger
+
+# Environment variable through which the controller hands the store to its workers.
+STORE_ENV_VAR = "TEST_DATA_STORE"
+
+# Layout: MAGIC, then the index's offset and length (two little-endian uint64),
+# then the pickled rows, each sheet followed by its uint64 row-offset table and
+# its pickled column indexes, then the pickled index
+# {workbook path: {"mtime_ns": int, "sheets": {name: (headers, count, table offset, column indexes)}}}
+# where column indexes is {column: ((value index offset, length), (numeric index offset, length))}.
+MAGIC = b"TDSTORE2"
+HEADER = struct.Struct("<8sQQ")
+OFFSET = struct.Struct("<Q")
+
+_attached = None
+
+
+def build_store(workbooks, output):
+    """
+    Writes the store for a set of workbooks.
+
+    Args:
+        workbooks (iterable): Paths of the .xlsx files to include.
+        output (str | Path): File to write.
+
+    Returns:
+        Path: The written store.
+    """
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    index = {}
+    temp_path = output.with_name(f"{output.name}.tmp")
+    with open(temp_path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, 0, 0))
+        for workbook in workbooks:
+            path = Path(workbook).resolve()
+            sheets = {}
+            for sheet_name, (headers, rows) in load_compiled_workbook(path).items():
+                offsets = []
+                for row in rows:
+                    offsets.append(file.tell())
+                    file.write(pickle.dumps(row, protocol=pickle.HIGHEST_PROTOCOL))
+                offsets.append(file.tell())
+                # Keep the offset table 8-byte aligned so workers can cast it in place.
+                file.write(b"\0" * (-file.tell() % OFFSET.size))
+                table_at = file.tell()
+                file.write(b"".join(OFFSET.pack(offset) for offset in offsets))
+                # Built here once, so no worker ever scans the rows to index a column.
+                columns = {header: position for position, header in enumerate(headers)}
+                sheet_rows = [SheetRow(columns, row) for row in rows]
+                indexes = {}
+                for column in columns:
+                    indexes[column] = tuple(
+                        _write_blob(file, build(sheet_rows, column))
+                        for build in (build_value_index, build_numeric_index)
+                    )
+                sheets[sheet_name] = (headers, len(rows), table_at, indexes)
+            index[str(path)] = {"mtime_ns": path.stat().st_mtime_ns, "sheets": sheets}
+        index_at = file.tell()
+        index_bytes = pickle.dumps(index, protocol=pickle.HIGHEST_PROTOCOL)
+        file.write(index_bytes)
+        file.seek(0)
+        file.write(HEADER.pack(MAGIC, index_at, len(index_bytes)))
+    os.replace(temp_path, output)
+    return output
+
+
+def _write_blob(file, value):
+    """Pickles a value into the store being written and returns its (offset, length)."""
+    data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    at = file.tell()
+    file.write(data)
+    return at, len(data)
+
+
+class StoredSheet(Sequence):
+    """
+    The rows of one sheet inside an attached store.
+
+    Rows are decoded on every read into a SheetRow over the sheet's shared
+    header mapping and are not kept, so a worker's memory does not grow with
+    the rows it reads. The row bytes, the offset table and the prebuilt column
+    indexes stay in the shared mapping.
+    """
+
+    def __init__(self, buffer, headers, count, table_at, indexes):
+        self._buffer = buffer
+        self._columns = {header: position for position, header in enumerate(headers)}
+        self._count = count
+        self._offsets = buffer[table_at:table_at + (count + 1) * OFFSET.size].cast("Q")
+        self._indexes = indexes
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(self._count))]
+        if position < 0:
+            position += self._count
+        if not 0 <= position < self._count:
+            raise IndexError("sheet row index out of range")
+        values = pickle.loads(self._buffer[self._offsets[position]:self._offsets[position + 1]])
+        return SheetRow(self._columns, values)
+
+    def stored_value_index(self, column):
+        """The prebuilt equality index of a column (see IndexedSheet), or None if the sheet has no such column."""
+        return self._load_index(column, 0)
+
+    def stored_numeric_index(self, column):
+        """The prebuilt numeric index of a column (see IndexedSheet), or None if the sheet has no such column."""
+        return self._load_index(column, 1)
+
+    def _load_index(self, column, kind):
+        if column not in self._indexes:
+            return None
+        at, length = self._indexes[column][kind]
+        return pickle.loads(self._buffer[at:at + length])
+
+
+class StoreFile:
+    """A read-only, memory-mapped view of a store written by `build_store`."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buffer = memoryview(self._mmap)
+        magic, index_at, index_length = HEADER.unpack_from(self._buffer)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a test data store")
+        self._index = pickle.loads(self._buffer[index_at:index_at + index_length])
+
+    def get_sheet(self, workbook, sheet_name):
+        """
+        Returns a sheet's rows, or None if the store does not hold this workbook
+        as it currently is on disk (missing, or modified since the store was built).
+
+        Args:
+            workbook (str | Path): Path to the workbook.
+            sheet_name (str): The name of the sheet.
+
+        Returns:
+            StoredSheet | None: The sheet's rows.
+        """
+        path = Path(workbook).resolve()
+        entry = self._index.get(str(path))
+        if entry is None or entry["mtime_ns"] != path.stat().st_mtime_ns:
+            return None
+        if sheet_name not in entry["sheets"]:
+            raise ValueError(f"Sheet '{sheet_name}' not found in workbook '{path.name}'")
+        headers, count, table_at, indexes = entry["sheets"][sheet_name]
+        return StoredSheet(self._buffer, headers, count, table_at, indexes)
+
+
+class SharedTestDataStore:
+    """
+    A directory of per-workbook store files shared by the processes of one run.
+
+    The first process to read a workbook builds its store file under a file lock;
+    the others wait for it and map the same file. A workbook edited since its
+    file was built gets a new file.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        if not self.directory.is_dir():
+            raise OSError(f"{self.directory} does not exist")
+        self._files = {}
+
+    def get_sheet(self, workbook, sheet_name):
+        """
+        Returns a sheet's rows, building the workbook's store file on first use;
+        None if the workbook changed while its file was being built.
+
+        Args:
+            workbook (str | Path): Path to the workbook.
+            sheet_name (str): The name of the sheet.
+
+        Returns:
+            StoredSheet | None: The sheet's rows.
+        """
+        path = Path(workbook).resolve()
+        key = (str(path), path.stat().st_mtime_ns)
+        store = self._files.get(key)
+        if store is None:
+            store_path = self.directory / f"{workbook_tag(path)}.{key[1]}.store"
+            if not store_path.exists():
+                with FileLock(store_path.with_name(f"{store_path.name}.lock")):
+                    if not store_path.exists():
+                        build_store([path], store_path)
+                        get_logger().info(f"Compiled {path.name} into the shared test data store")
+            store = self._files[key] = StoreFile(store_path)
+        return store.get_sheet(path, sheet_name)
+
+
+def attached_store():
+    """Returns the store named by TEST_DATA_STORE, attaching on first use; None if there is none."""
+    global _attached
+    path = os.getenv(STORE_ENV_VAR)
+    if not path:
+        return None
+    if _attached is None or _attached.directory != Path(path):
+        try:
+            _attached = SharedTestDataStore(path)
+        except OSError as e:
+            get_logger().warning(f"Could not attach shared test data store {path}: {e}")
+            return None
+    return _attached
+
+
+def publish_store():
+    """
+    Creates an empty store directory and points TEST_DATA_STORE at it, so worker
+    processes started afterwards inherit it. Called by the xdist controller;
+    workbooks are compiled into it only when a worker first reads them.
+
+    Returns:
+        Path: The store directory.
+    """
+    store = SIDECAR_DIR / f"store_{os.getpid()}"
+    store.mkdir(parents=True, exist_ok=True)
+    os.environ[STORE_ENV_VAR] = str(store)
+    get_logger().info(f"Shared test data store published at {store}")
+    return store
+
+
+def unpublish_store(store):
+    """Removes a store directory created by `publish_store`."""
+    os.environ.pop(STORE_ENV_VAR, None)
+    shutil.rmtree(store, onerror=lambda func, path, error: get_logger().warning(
+        f"Could not remove {path} from the shared test data store: {error[1]}"))